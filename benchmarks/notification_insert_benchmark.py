@@ -0,0 +1,73 @@
+#  python -m benchmarks.notification_insert_benchmark --rows 50000
+
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import select
+
+from configs.db.database import AsyncSessionLocal, NotificationEntity, UserEntity, engine
+from configs.db.enums import NotificationTypeEnum
+from repositories.provider.notify_repository_provider import NotifyRepositoryProvider
+
+
+def build_rows(user_ids: list[int], rows: int) -> list[dict]:
+    return [
+        {
+            "user_id": user_ids[i % len(user_ids)],
+            "title": "The user benchmark created a new post!",
+            "content": "The user you follow, benchmark, just created a new post!",
+            "link": None,
+            "type": NotificationTypeEnum.NEW_POST,
+            "entity_id": i,
+        }
+        for i in range(rows)
+    ]
+
+
+async def orm_add_all(repository: NotifyRepositoryProvider, rows: list[dict]) -> None:
+    repository.db.add_all([NotificationEntity(**row) for row in rows])
+    await repository.db.flush()
+
+
+async def core_insert_many(repository: NotifyRepositoryProvider, rows: list[dict]) -> None:
+    await repository.insert_many(rows)
+
+
+async def copy_many(repository: NotifyRepositoryProvider, rows: list[dict]) -> None:
+    await repository.copy_many(rows)
+
+
+async def run(rows: int, repeat: int) -> None:
+    async with AsyncSessionLocal() as db:
+        user_ids = list((await db.execute(select(UserEntity.id).limit(1000))).scalars().all())
+
+    if not user_ids:
+        raise ValueError("The benchmark needs at least one row in users")
+
+    data = build_rows(user_ids, rows)
+
+    for name, writer in (("orm add_all", orm_add_all), ("insert executemany", core_insert_many), ("binary copy", copy_many)):
+        timings = []
+
+        for _ in range(repeat):
+            # every run is rolled back so the benchmark leaves notification_user untouched
+            async with AsyncSessionLocal() as db:
+                started = time.perf_counter()
+                await writer(NotifyRepositoryProvider(db), data)
+                timings.append(time.perf_counter() - started)
+                await db.rollback()
+
+        best = min(timings)
+        print(f"{name:<20} rows={rows} best={best:.3f}s rows/s={rows / best:,.0f}")
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare notification_user bulk insert paths")
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    asyncio.run(run(args.rows, args.repeat))
@@ -9,11 +9,11 @@ from sqlalchemy import (
     DateTime, String,
     func, Text, ForeignKey,
     Boolean, Integer, BigInteger,
-    Enum, Date, JSON, Numeric, UniqueConstraint
+    Enum, Date, JSON, Numeric, UniqueConstraint, Index, text
 )
 from datetime import datetime, date
 from sqlalchemy.pool import NullPool
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import UUID, JSONB
 from configs.db.enums import (
     MediaType, ProficiencyEnum, EmploymentTypeEnum,
     EmploymentStatusEnum, ExperienceLevelEnum,
@@ -28,7 +28,47 @@ DATABASE_URL: Final[str | None] = os.getenv("DATABASE_URL")
 if DATABASE_URL is None:
     raise ValueError("DATABASE_URL is None")
 
-engine: Final[AsyncEngine] = create_async_engine(DATABASE_URL, future=True, poolclass=NullPool)
+# "pool": pooled connections with asyncpg prepared statements cached per connection
+# "pgbouncer": pooled connections without server-side prepared statements (pgbouncer transaction mode)
+# "null": a fresh connection for every session
+DATABASE_POOL_MODE: Final[str] = os.getenv("DATABASE_POOL_MODE", "pool").lower()
+DATABASE_POOL_SIZE: Final[int] = int(os.getenv("DATABASE_POOL_SIZE", "10"))
+DATABASE_MAX_OVERFLOW: Final[int] = int(os.getenv("DATABASE_MAX_OVERFLOW", "20"))
+DATABASE_POOL_TIMEOUT: Final[int] = int(os.getenv("DATABASE_POOL_TIMEOUT", "30"))
+DATABASE_POOL_RECYCLE: Final[int] = int(os.getenv("DATABASE_POOL_RECYCLE", "1800"))
+DATABASE_POOL_PRE_PING: Final[bool] = os.getenv("DATABASE_POOL_PRE_PING", "true").lower() == "true"
+DATABASE_STATEMENT_CACHE_SIZE: Final[int] = int(os.getenv("DATABASE_STATEMENT_CACHE_SIZE", "100"))
+
+def get_engine_options() -> dict:
+    if DATABASE_POOL_MODE == "null":
+        return {"poolclass": NullPool}
+
+    if DATABASE_POOL_MODE not in ("pool", "pgbouncer"):
+        raise ValueError(f"DATABASE_POOL_MODE {DATABASE_POOL_MODE} is invalid")
+
+    options = {
+        "pool_size": DATABASE_POOL_SIZE,
+        "max_overflow": DATABASE_MAX_OVERFLOW,
+        "pool_timeout": DATABASE_POOL_TIMEOUT,
+        "pool_recycle": DATABASE_POOL_RECYCLE,
+        "pool_pre_ping": DATABASE_POOL_PRE_PING,
+    }
+
+    if DATABASE_POOL_MODE == "pgbouncer":
+        options["connect_args"] = {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid.uuid4()}__",
+        }
+    else:
+        options["connect_args"] = {
+            "statement_cache_size": DATABASE_STATEMENT_CACHE_SIZE,
+            "prepared_statement_cache_size": DATABASE_STATEMENT_CACHE_SIZE,
+        }
+
+    return options
+
+engine: Final[AsyncEngine] = create_async_engine(DATABASE_URL, future=True, **get_engine_options())
 
 AsyncSessionLocal: Final[async_sessionmaker[AsyncSession]] = async_sessionmaker(engine, expire_on_commit=False)
 
@@ -172,16 +212,31 @@ class UserEntity(TimestampMixin, Base):
 class NotificationEntity(TimestampMixin, Base):
     __tablename__ = "notification_user"
 
+    __table_args__ = (
+        UniqueConstraint("event_id", "user_id", name="uq_notification_user_event_user"),
+        Index("ix_notification_user_user_view_created", "user_id", "is_view", "created_at"),
+        Index("ix_notification_user_user_created_id", "user_id", "created_at", "id"),
+    )
+
     id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
 
+    # source event of the notification, fan-out replays of the same event are skipped on conflict
+    event_id: Mapped[str | None] = mapped_column(String(64), nullable=True)
+
     user_id: Mapped[int] = mapped_column(
         ForeignKey("users.id", ondelete="CASCADE"),
         nullable=False,
         index=True
     )
 
-    title: Mapped[str] = mapped_column(String(200), nullable=False)
-    content: Mapped[str] = mapped_column(Text, nullable=False)
+    # fan-out rows leave title and content empty and are rendered from the template and the event parameters
+    title: Mapped[str | None] = mapped_column(String(200), nullable=True)
+    content: Mapped[str | None] = mapped_column(Text, nullable=True)
+
+    template: Mapped[str | None] = mapped_column(String(32), nullable=True)
+    params_id: Mapped[int | None] = mapped_column(
+        BigInteger, ForeignKey("notification_params.id"), nullable=True
+    )
 
     link: Mapped[str | None] = mapped_column(Text, nullable=True)
     is_view: Mapped[bool] = mapped_column(Boolean, default=False, index=True)
@@ -241,6 +296,14 @@ class FollowerRelationshipEntity(Base):
 
     __table_args__ = (
         UniqueConstraint('follower_id', 'followed_id', name='_follower_id_followed_id_uc_follower_relationships'),
+        Index(
+            "ix_follower_relationships_followed_post", "followed_id", "follower_id",
+            postgresql_where=text("receive_post"),
+        ),
+        Index(
+            "ix_follower_relationships_followed_comment", "followed_id", "follower_id",
+            postgresql_where=text("receive_comment"),
+        ),
     )
 
     follower_id: Mapped[int] = mapped_column(BigInteger, ForeignKey("users.id"))
@@ -448,6 +511,10 @@ class EnterpriseEntity(TimestampMixin, Base):
 class NotificationEnterpriseEntity(TimestampMixin, Base):
     __tablename__ = "notification_enterprise_user"
 
+    __table_args__ = (
+        Index("ix_notification_enterprise_user_enterprise_created_id", "enterprise_id", "created_at", "id"),
+    )
+
     id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
 
     enterprise_id: Mapped[int] = mapped_column(
@@ -537,6 +604,14 @@ class EnterpriseFollowsUserEntity(Base):
 
     __table_args__ = (
         UniqueConstraint("enterprise_id", "user_id", name="uq_enterprise_user_follow"),
+        Index(
+            "ix_enterprise_follows_user_enterprise_post", "enterprise_id", "user_id",
+            postgresql_where=text("receive_post"),
+        ),
+        Index(
+            "ix_enterprise_follows_user_enterprise_vacancy", "enterprise_id", "user_id",
+            postgresql_where=text("receive_vacancy"),
+        ),
     )
 
     id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
@@ -1346,3 +1421,79 @@ class FavoritePostUserEntity(Base):
         back_populates="favorite_post_user",
         lazy="joined"
     )
+
+class ProcessedEventEntity(Base):
+    __tablename__ = "processed_events"
+
+    topic: Mapped[str] = mapped_column(String(100), primary_key=True)
+    event_id: Mapped[str] = mapped_column(String(64), primary_key=True)
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False, index=True
+    )
+
+class NotificationBroadcastEntity(Base):
+    __tablename__ = "notification_broadcast"
+
+    __table_args__ = (
+        Index("ix_notification_broadcast_actor_created", "is_enterprise", "actor_id", "created_at"),
+    )
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+
+    actor_id: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    is_enterprise: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
+
+    title: Mapped[str] = mapped_column(String(200), nullable=False)
+    content: Mapped[str] = mapped_column(Text, nullable=False)
+
+    link: Mapped[str | None] = mapped_column(Text, nullable=True)
+
+    type: Mapped[NotificationTypeEnum] = mapped_column(
+        Enum(NotificationTypeEnum, name="type_enum"),
+        nullable=False
+    )
+    entity_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+
+class NotificationReadCursorEntity(Base):
+    __tablename__ = "notification_read_cursor"
+
+    user_id: Mapped[int] = mapped_column(
+        BigInteger, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+
+    last_read_broadcast_id: Mapped[int] = mapped_column(BigInteger, default=0, nullable=False)
+
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
+    )
+
+class NotificationUnreadCounterEntity(Base):
+    __tablename__ = "notification_unread_counter"
+
+    # owner_id is a users.id or an enterprises.id depending on is_enterprise
+    is_enterprise: Mapped[bool] = mapped_column(Boolean, primary_key=True)
+    owner_id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+
+    unread: Mapped[int] = mapped_column(BigInteger, default=0, nullable=False)
+
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
+    )
+
+class NotificationParamsEntity(Base):
+    __tablename__ = "notification_params"
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+
+    # one record per source event, shared by every notification the event fanned out to
+    event_id: Mapped[str] = mapped_column(String(64), unique=True, nullable=False)
+    params: Mapped[dict] = mapped_column(JSONB, nullable=False)
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
@@ -1,7 +1,8 @@
+import asyncio
 import os
 from typing import Final
 
-from aiokafka import AIOKafkaConsumer
+from aiokafka import AIOKafkaConsumer, ConsumerRebalanceListener
 from aiokafka import AIOKafkaProducer
 from dotenv import load_dotenv
 
@@ -12,22 +13,111 @@ KAFKA_BOOTSTRAP_SERVERS = os.getenv("KAFKA_BOOTSTRAP_SERVERS", "localhost:29092"
 SUM_RED_METRIC_TOPIC = "sum_red_metric_topic"
 SEND_EMAIL_TOPIC: Final[str] = "send_email_topic"
 NOTIFICATION_TOPIC: Final[str] = "notification_topic"
+NOTIFICATION_FANOUT_TOPIC: Final[str] = "notification_fanout_topic"
+# read by every instance outside any group, the main application publishes follow changes here too
+FOLLOWER_CACHE_INVALIDATION_TOPIC: Final[str] = "follower_cache_invalidation_topic"
 
-async def get_kafka_consumer(topic: str, group_id: str):
+CONSUMER_WORKERS: Final[int] = int(os.getenv("CONSUMER_WORKERS", "8"))
+CONSUMER_MAX_IN_FLIGHT: Final[int] = int(os.getenv("CONSUMER_MAX_IN_FLIGHT", "256"))
+# worker pool consumers commit, at this interval, the offsets whose records and every record before them finished
+CONSUMER_COMMIT_INTERVAL_MS: Final[int] = int(os.getenv("CONSUMER_COMMIT_INTERVAL_MS", "1000"))
+# a worker whose handler raises (its retry topic is unreachable) retries the record in place, doubling the wait up to the max
+CONSUMER_WORKER_RETRY_BACKOFF_MS: Final[int] = int(os.getenv("CONSUMER_WORKER_RETRY_BACKOFF_MS", "1000"))
+CONSUMER_WORKER_RETRY_MAX_BACKOFF_MS: Final[int] = int(os.getenv("CONSUMER_WORKER_RETRY_MAX_BACKOFF_MS", "30000"))
+
+CONSUMER_BATCH_MODE: Final[bool] = os.getenv("CONSUMER_BATCH_MODE", "false").lower() == "true"
+CONSUMER_BATCH_MAX_RECORDS: Final[int] = int(os.getenv("CONSUMER_BATCH_MAX_RECORDS", "500"))
+CONSUMER_BATCH_TIMEOUT_MS: Final[int] = int(os.getenv("CONSUMER_BATCH_TIMEOUT_MS", "1000"))
+CONSUMER_BATCH_RETRY_BACKOFF_MS: Final[int] = int(os.getenv("CONSUMER_BATCH_RETRY_BACKOFF_MS", "1000"))
+
+# tier n delays a failed message by CONSUMER_RETRY_BACKOFF_MS * CONSUMER_RETRY_BACKOFF_MULTIPLIER ** (n - 1)
+CONSUMER_RETRY_TIERS: Final[int] = int(os.getenv("CONSUMER_RETRY_TIERS", "3"))
+CONSUMER_RETRY_BACKOFF_MS: Final[int] = int(os.getenv("CONSUMER_RETRY_BACKOFF_MS", "1000"))
+CONSUMER_RETRY_BACKOFF_MULTIPLIER: Final[int] = int(os.getenv("CONSUMER_RETRY_BACKOFF_MULTIPLIER", "10"))
+
+KAFKA_PRODUCER_LINGER_MS: Final[int] = int(os.getenv("KAFKA_PRODUCER_LINGER_MS", "20"))
+KAFKA_PRODUCER_MAX_BATCH_SIZE: Final[int] = int(os.getenv("KAFKA_PRODUCER_MAX_BATCH_SIZE", "65536"))
+# "zstd", "lz4", "gzip", "snappy" or "none"
+KAFKA_PRODUCER_COMPRESSION: Final[str] = os.getenv("KAFKA_PRODUCER_COMPRESSION", "zstd").lower()
+KAFKA_PRODUCER_ENABLE_IDEMPOTENCE: Final[bool] = os.getenv("KAFKA_PRODUCER_ENABLE_IDEMPOTENCE", "true").lower() == "true"
+
+def retry_topic(topic: str, tier: int) -> str:
+    return f"{topic}.retry.{tier}"
+
+def dlq_topic(topic: str) -> str:
+    return f"{topic}.dlq"
+
+def retry_delay_ms(tier: int) -> int:
+    return CONSUMER_RETRY_BACKOFF_MS * CONSUMER_RETRY_BACKOFF_MULTIPLIER ** (tier - 1)
+
+async def get_kafka_consumer(
+    topic: str,
+    group_id: str | None,
+    enable_auto_commit: bool = True,
+    auto_offset_reset: str = "earliest",
+    listener: ConsumerRebalanceListener | None = None,
+):
     if KAFKA_BOOTSTRAP_SERVERS is None:
         raise ValueError("KAFKA_BOOTSTRAP_SERVERS is None")
 
     consumer = AIOKafkaConsumer(
-        topic,
         bootstrap_servers=KAFKA_BOOTSTRAP_SERVERS,
         group_id=group_id,
-        enable_auto_commit=True,
-        auto_offset_reset="earliest",
+        enable_auto_commit=enable_auto_commit,
+        auto_offset_reset=auto_offset_reset,
     )
+    consumer.subscribe([topic], listener=listener)
     await consumer.start()
     return consumer
 
-async def get_kafka_producer():
-    producer = AIOKafkaProducer(bootstrap_servers=KAFKA_BOOTSTRAP_SERVERS)
-    await producer.start()
-    return producer
\ No newline at end of file
+def get_producer_options() -> dict:
+    if KAFKA_PRODUCER_COMPRESSION not in ("zstd", "lz4", "gzip", "snappy", "none"):
+        raise ValueError(f"KAFKA_PRODUCER_COMPRESSION {KAFKA_PRODUCER_COMPRESSION} is invalid")
+
+    return {
+        "bootstrap_servers": KAFKA_BOOTSTRAP_SERVERS,
+        "linger_ms": KAFKA_PRODUCER_LINGER_MS,
+        "max_batch_size": KAFKA_PRODUCER_MAX_BATCH_SIZE,
+        "compression_type": None if KAFKA_PRODUCER_COMPRESSION == "none" else KAFKA_PRODUCER_COMPRESSION,
+        "enable_idempotence": KAFKA_PRODUCER_ENABLE_IDEMPOTENCE,
+    }
+
+
+class KafkaProducerManager:
+    def __init__(self):
+        self._producer: AIOKafkaProducer | None = None
+        self._lock = asyncio.Lock()
+
+    async def start(self) -> AIOKafkaProducer:
+        async with self._lock:
+            if self._producer is None:
+                producer = AIOKafkaProducer(**get_producer_options())
+                await producer.start()
+                self._producer = producer
+
+        return self._producer
+
+    async def send(self, topic: str, value: bytes, key: bytes | None = None, headers: list | None = None):
+        producer = await self.start()
+        return await producer.send(topic, value, key=key, headers=headers)
+
+    async def send_and_wait(self, topic: str, value: bytes, key: bytes | None = None, headers: list | None = None):
+        producer = await self.start()
+        return await producer.send_and_wait(topic, value, key=key, headers=headers)
+
+    async def flush(self) -> None:
+        if self._producer is not None:
+            await self._producer.flush()
+
+    async def stop(self) -> None:
+        async with self._lock:
+            if self._producer is not None:
+                await self._producer.flush()
+                await self._producer.stop()
+                self._producer = None
+
+
+producer_manager: Final[KafkaProducerManager] = KafkaProducerManager()
+
+async def get_kafka_producer() -> AIOKafkaProducer:
+    return await producer_manager.start()
@@ -0,0 +1,72 @@
+import os
+from typing import Final
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# "insert_select": one INSERT ... SELECT per event, recipients never leave the database
+# "stream": follower ids are streamed to the service and inserted chunk by chunk
+FANOUT_MODE: Final[str] = os.getenv("FANOUT_MODE", "insert_select").lower()
+
+# above this many recipients a single broadcast row is stored and merged into feeds at read time, 0 disables
+FANOUT_BROADCAST_THRESHOLD: Final[int] = int(os.getenv("FANOUT_BROADCAST_THRESHOLD", "10000"))
+
+# follower ids are read through a server-side cursor and notifications written in chunks of this size
+FANOUT_CHUNK_SIZE: Final[int] = int(os.getenv("FANOUT_CHUNK_SIZE", "5000"))
+
+# comma separated NotificationTypeEnum names whose Python-built fan-out rows are written with binary COPY
+FANOUT_COPY_EVENT_TYPES: Final[frozenset[str]] = frozenset(
+    name.strip().upper() for name in os.getenv("FANOUT_COPY_EVENT_TYPES", "").split(",") if name.strip()
+)
+COPY_CHUNK_SIZE: Final[int] = int(os.getenv("COPY_CHUNK_SIZE", "10000"))
+
+# NEW_POST / NEW_COMMENT / NEW_POST_ENTERPRISE / NEW_VACANCY events of one actor are buffered this long
+# and delivered as a single digest notification per recipient, 0 disables
+NOTIFICATION_COALESCE_WINDOW_MS: Final[int] = int(os.getenv("NOTIFICATION_COALESCE_WINDOW_MS", "0"))
+NOTIFICATION_COALESCE_MAX_EVENTS: Final[int] = int(os.getenv("NOTIFICATION_COALESCE_MAX_EVENTS", "10000"))
+
+# fan-outs above this many recipients are split into follower id ranges of FANOUT_JOB_CHUNK_SIZE
+# and processed as independent work items, 0 disables
+FANOUT_JOB_THRESHOLD: Final[int] = int(os.getenv("FANOUT_JOB_THRESHOLD", "5000"))
+FANOUT_JOB_CHUNK_SIZE: Final[int] = int(os.getenv("FANOUT_JOB_CHUNK_SIZE", "1000"))
+# "kafka": chunks go through NOTIFICATION_FANOUT_TOPIC and are shared by every instance of the group
+# "local": chunks go through an in-process queue
+FANOUT_JOB_TRANSPORT: Final[str] = os.getenv("FANOUT_JOB_TRANSPORT", "kafka").lower()
+FANOUT_JOB_WORKERS: Final[int] = int(os.getenv("FANOUT_JOB_WORKERS", "4"))
+
+# follower counts and, for FANOUT_MODE=stream, follower id sets (as int64 arrays) are kept in memory, 0 disables,
+# new follows are invalidated on every instance through FOLLOWER_CACHE_INVALIDATION_TOPIC, the TTL bounds the rest
+FOLLOWER_CACHE_MAX_BYTES: Final[int] = int(os.getenv("FOLLOWER_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+FOLLOWER_CACHE_TTL_SECONDS: Final[int] = int(os.getenv("FOLLOWER_CACHE_TTL_SECONDS", "300"))
+
+# broadcasts are not materialized per follower, so the unread badge counts them on read up to this limit
+UNREAD_BROADCAST_COUNT_LIMIT: Final[int] = int(os.getenv("UNREAD_BROADCAST_COUNT_LIMIT", "100"))
+
+# notifications pushed to connected clients wait in a per-connection buffer of this size,
+# a client that falls further behind gets a single resync event and refetches from the inbox
+PUSH_BUFFER_SIZE: Final[int] = int(os.getenv("PUSH_BUFFER_SIZE", "100"))
+PUSH_KEEPALIVE_SECONDS: Final[int] = int(os.getenv("PUSH_KEEPALIVE_SECONDS", "15"))
+
+# notification events of these types run in the point lane, everything else in the bulk lane
+NOTIFICATION_POINT_EVENT_TYPES: Final[frozenset[str]] = frozenset(
+    name.strip().upper() for name in os.getenv(
+        "NOTIFICATION_POINT_EVENT_TYPES", "NEW_FOLLOWER,NEW_REVIEW_ENTERPRISE,APPLICATION_RECEIVED,SYSTEM"
+    ).split(",") if name.strip()
+)
+# lanes share NOTIFICATION_LANE_SLOTS concurrent handlers, handed out by weight when both lanes are waiting,
+# and each lane never runs more than its own concurrency, keep the bulk one below the slots so point events always find one
+NOTIFICATION_LANE_SLOTS: Final[int] = int(os.getenv("NOTIFICATION_LANE_SLOTS", "8"))
+NOTIFICATION_POINT_LANE_WEIGHT: Final[int] = int(os.getenv("NOTIFICATION_POINT_LANE_WEIGHT", "4"))
+NOTIFICATION_POINT_LANE_CONCURRENCY: Final[int] = int(os.getenv("NOTIFICATION_POINT_LANE_CONCURRENCY", "8"))
+NOTIFICATION_BULK_LANE_WEIGHT: Final[int] = int(os.getenv("NOTIFICATION_BULK_LANE_WEIGHT", "1"))
+NOTIFICATION_BULK_LANE_CONCURRENCY: Final[int] = int(os.getenv("NOTIFICATION_BULK_LANE_CONCURRENCY", "4"))
+# bulk events wait in memory up to this many so the poll loop keeps reading point events behind a burst
+NOTIFICATION_BULK_LANE_BACKLOG: Final[int] = int(os.getenv("NOTIFICATION_BULK_LANE_BACKLOG", "10000"))
+
+# every actor may fan out this many notification rows per window, refilled continuously,
+# events over the budget are stored as a single broadcast row instead, 0 disables,
+# the buckets live in each instance, so an actor whose events spread over N instances gets up to N times the budget
+FANOUT_BUDGET_ROWS: Final[int] = int(os.getenv("FANOUT_BUDGET_ROWS", "100000"))
+FANOUT_BUDGET_WINDOW_SECONDS: Final[int] = int(os.getenv("FANOUT_BUDGET_WINDOW_SECONDS", "3600"))
+FANOUT_BUDGET_MAX_ACTORS: Final[int] = int(os.getenv("FANOUT_BUDGET_MAX_ACTORS", "100000"))
@@ -0,0 +1,40 @@
+import asyncio
+from typing import Awaitable, Callable
+
+import structlog
+from aiokafka import AIOKafkaConsumer, ConsumerRecord
+
+from configs.db.kafka import CONSUMER_BATCH_MAX_RECORDS, CONSUMER_BATCH_TIMEOUT_MS, CONSUMER_BATCH_RETRY_BACKOFF_MS
+
+logger = structlog.get_logger()
+
+
+async def consume_batches(
+    consumer: AIOKafkaConsumer,
+    process_batch: Callable[[list[ConsumerRecord]], Awaitable[None]],
+) -> None:
+    while True:
+        batches = await consumer.getmany(
+            timeout_ms=CONSUMER_BATCH_TIMEOUT_MS,
+            max_records=CONSUMER_BATCH_MAX_RECORDS,
+        )
+
+        if not batches:
+            continue
+
+        records = [record for partition_records in batches.values() for record in partition_records]
+
+        try:
+            await process_batch(records)
+        except Exception as e:
+            logger.error("Failed to process batch, rewinding", error=str(e), records=len(records))
+
+            for tp, partition_records in batches.items():
+                consumer.seek(tp, partition_records[0].offset)
+
+            await asyncio.sleep(CONSUMER_BATCH_RETRY_BACKOFF_MS / 1000)
+            continue
+
+        await consumer.commit({
+            tp: partition_records[-1].offset + 1 for tp, partition_records in batches.items()
+        })
@@ -0,0 +1,73 @@
+import asyncio
+import os
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Final
+
+import structlog
+from dotenv import load_dotenv
+
+from configs.db.database import AsyncSessionLocal
+from repositories.provider.processed_event_repository_provider import ProcessedEventRepositoryProvider
+
+logger = structlog.get_logger()
+
+load_dotenv()
+
+PROCESSED_EVENT_CACHE_SIZE: Final[int] = int(os.getenv("PROCESSED_EVENT_CACHE_SIZE", "100000"))
+PROCESSED_EVENT_TTL_HOURS: Final[int] = int(os.getenv("PROCESSED_EVENT_TTL_HOURS", "168"))
+PROCESSED_EVENT_PURGE_INTERVAL_SECONDS: Final[int] = int(os.getenv("PROCESSED_EVENT_PURGE_INTERVAL_SECONDS", "3600"))
+
+
+class EventDeduplicator:
+    def __init__(self, topic: str, max_size: int = PROCESSED_EVENT_CACHE_SIZE):
+        self.topic = topic
+        self.max_size = max_size
+        self._seen: OrderedDict[str, None] = OrderedDict()
+
+    def is_known(self, event_id: str) -> bool:
+        if event_id in self._seen:
+            self._seen.move_to_end(event_id)
+            return True
+
+        return False
+
+    def remember(self, event_ids: list[str]) -> None:
+        for event_id in event_ids:
+            self._seen[event_id] = None
+            self._seen.move_to_end(event_id)
+
+        while len(self._seen) > self.max_size:
+            self._seen.popitem(last=False)
+
+    async def filter_new(self, repository: ProcessedEventRepositoryProvider, event_ids: list[str]) -> list[str]:
+        unknown = [event_id for event_id in dict.fromkeys(event_ids) if not self.is_known(event_id)]
+
+        if not unknown:
+            return []
+
+        processed = await repository.get_processed_ids(self.topic, unknown)
+        self.remember(list(processed))
+
+        return [event_id for event_id in unknown if event_id not in processed]
+
+    async def mark(self, repository: ProcessedEventRepositoryProvider, event_ids: list[str]) -> list[str]:
+        # claims the ids inside the caller's transaction, only the returned ones may be applied
+        if not event_ids:
+            return []
+
+        return await repository.mark_processed(self.topic, event_ids)
+
+
+async def purge_processed_events() -> None:
+    while True:
+        await asyncio.sleep(PROCESSED_EVENT_PURGE_INTERVAL_SECONDS)
+
+        try:
+            async with AsyncSessionLocal() as db:
+                cutoff = datetime.now(timezone.utc) - timedelta(hours=PROCESSED_EVENT_TTL_HOURS)
+                deleted = await ProcessedEventRepositoryProvider(db).delete_older_than(cutoff)
+
+            logger.info("Processed events purged", deleted=deleted)
+        except Exception as e:
+            logger.error("Failed to purge processed events", error=str(e))
@@ -0,0 +1,156 @@
+import asyncio
+from typing import Final
+
+import structlog
+
+from configs.db.kafka import (
+    get_kafka_consumer, producer_manager, NOTIFICATION_FANOUT_TOPIC,
+    CONSUMER_MAX_IN_FLIGHT
+)
+from configs.notification.notification_config import FANOUT_JOB_TRANSPORT, FANOUT_JOB_WORKERS
+from consumers.event_deduplicator import EventDeduplicator
+from consumers.keyed_worker_pool import KeyedWorkerPool
+from consumers.offset_tracker import get_tracked_consumer
+from consumers.retry_router import RetryRouter
+from consumers.unit_of_work import NotificationUnitOfWork
+from schemas.event_notification import EventNotification
+from schemas.fanout_chunk import FanoutChunk, FanoutAudienceEnum
+
+logger = structlog.get_logger()
+
+# a chunk id is "<job_id>:<chunk_index>", completed chunks are checkpointed like any processed event
+checkpoints: Final[EventDeduplicator] = EventDeduplicator(NOTIFICATION_FANOUT_TOPIC)
+
+async def retry_fanout_chunk(value: bytes, attempt: int):
+    await handle_fanout_chunk(FanoutChunk.model_validate_json(value), attempt)
+
+retry_router: Final[RetryRouter] = RetryRouter(NOTIFICATION_FANOUT_TOPIC, "notification-fanout", retry_fanout_chunk)
+
+local_queue: Final[asyncio.Queue[FanoutChunk]] = asyncio.Queue(maxsize=CONSUMER_MAX_IN_FLIGHT)
+
+
+class FanoutJobPublisher:
+    async def store_params(self, event: EventNotification, is_enterprise: bool) -> int | None:
+        # committed on its own before any chunk is published, so a chunk never points at a record it cannot see
+        async with NotificationUnitOfWork() as uow:
+            params_id = await uow.notification_service.store_params(event, is_enterprise)
+            await uow.commit()
+
+        return params_id
+
+    async def publish(self, chunks: list[FanoutChunk]) -> None:
+        if FANOUT_JOB_TRANSPORT == "local":
+            for chunk in chunks:
+                await local_queue.put(chunk)
+        else:
+            deliveries = [
+                await producer_manager.send(
+                    NOTIFICATION_FANOUT_TOPIC,
+                    chunk.model_dump_json().encode("utf-8"),
+                    key=chunk.chunk_id.encode("utf-8"),
+                )
+                for chunk in chunks
+            ]
+
+            await asyncio.gather(*deliveries)
+
+        if chunks:
+            logger.info("Fan-out job published", job_id=chunks[0].job_id, chunks=len(chunks), transport=FANOUT_JOB_TRANSPORT)
+
+fanout_publisher: Final[FanoutJobPublisher] = FanoutJobPublisher()
+
+async def consume_fanout_jobs():
+    if FANOUT_JOB_TRANSPORT == "local":
+        workers = [asyncio.create_task(consume_local_fanout_jobs()) for _ in range(max(1, FANOUT_JOB_WORKERS))]
+
+        try:
+            await asyncio.gather(*workers)
+        finally:
+            for worker in workers:
+                worker.cancel()
+
+            await asyncio.gather(*workers, return_exceptions=True)
+
+        return
+
+    if FANOUT_JOB_TRANSPORT != "kafka":
+        raise ValueError(f"FANOUT_JOB_TRANSPORT {FANOUT_JOB_TRANSPORT} is invalid")
+
+    retry_task = asyncio.create_task(retry_router.run())
+    # a chunk's offset is committed only after the chunk is handled, so a crash resumes from the last completed one
+    consumer, offsets = await get_tracked_consumer(NOTIFICATION_FANOUT_TOPIC, group_id="notification-fanout")
+    commit_task = asyncio.create_task(offsets.run())
+
+    pool = KeyedWorkerPool("fanout", handle_fanout_chunk, FANOUT_JOB_WORKERS, CONSUMER_MAX_IN_FLIGHT)
+    pool.start()
+
+    try:
+        async for msg in consumer:
+            done = offsets.track(msg)
+
+            try:
+                chunk = FanoutChunk.model_validate_json(msg.value.decode("utf-8"))
+                await pool.submit(chunk.chunk_id, chunk, done)
+            except Exception as e:
+                logger.error("Failed to process fan-out chunk", error=str(e), message_value=msg.value.decode("utf-8"))
+                await retry_router.dead_letter(msg.value, e)
+                done()
+    finally:
+        await pool.stop()
+        commit_task.cancel()
+        await offsets.commit()
+        await consumer.stop()
+        retry_task.cancel()
+        await asyncio.gather(retry_task, return_exceptions=True)
+
+async def consume_local_fanout_jobs():
+    while True:
+        chunk = await local_queue.get()
+
+        try:
+            await handle_fanout_chunk(chunk)
+        finally:
+            local_queue.task_done()
+
+async def handle_fanout_chunk(chunk: FanoutChunk, attempt: int = 0):
+    async with NotificationUnitOfWork() as uow:
+        try:
+            if not await checkpoints.filter_new(uow.processed_event_repository, [chunk.chunk_id]):
+                logger.info("Fan-out chunk already completed", chunk_id=chunk.chunk_id)
+                return
+
+            if not await checkpoints.mark(uow.processed_event_repository, [chunk.chunk_id]):
+                logger.info("Fan-out chunk already completed", chunk_id=chunk.chunk_id)
+                return
+
+            if chunk.audience == FanoutAudienceEnum.FOLLOWERS:
+                recipients = uow.follow_service.follower_ids_select(
+                    followed_id=chunk.event.actor_id,
+                    receive_post=chunk.receive_post,
+                    receive_comment=chunk.receive_comment,
+                    start_id=chunk.start_id,
+                    end_id=chunk.end_id,
+                )
+
+                await uow.notification_service.notify_followers_from_select(recipients, chunk.event, chunk.params_id)
+
+            if chunk.audience == FanoutAudienceEnum.ENTERPRISE_FOLLOWERS:
+                recipients = uow.enterprise_follow_user_service.user_ids_select(
+                    enterprise_id=chunk.event.actor_id,
+                    receive_post=chunk.receive_post,
+                    receive_vacancy=chunk.receive_vacancy,
+                    start_id=chunk.start_id,
+                    end_id=chunk.end_id,
+                )
+
+                await uow.notification_service.notify_followers_from_select_enterprise(recipients, chunk.event, chunk.params_id)
+
+            await uow.commit()
+            checkpoints.remember([chunk.chunk_id])
+
+            logger.info("Fan-out chunk completed", job_id=chunk.job_id, chunk=chunk.chunk_index, chunks=chunk.chunks)
+
+        except Exception as e:
+            await uow.rollback()
+            logger.error("Failed to process fan-out chunk", error=str(e), chunk_id=chunk.chunk_id)
+            await retry_router.publish_failure(chunk.model_dump_json().encode("utf-8"), e, attempt)
@@ -0,0 +1,103 @@
+import asyncio
+import zlib
+from typing import Awaitable, Callable, Generic, Hashable, TypeVar
+
+import structlog
+
+from configs.db.kafka import CONSUMER_WORKER_RETRY_BACKOFF_MS, CONSUMER_WORKER_RETRY_MAX_BACKOFF_MS
+
+logger = structlog.get_logger()
+
+T_Item = TypeVar("T_Item")
+
+
+def partition_for(key: Hashable, partitions: int) -> int:
+    return zlib.crc32(str(key).encode("utf-8")) % partitions
+
+
+async def run_partitioned(
+    items: list[tuple[Hashable, T_Item]],
+    lane_handler: Callable[[list[T_Item]], Awaitable[None]],
+    partitions: int,
+) -> None:
+    lanes: list[list[T_Item]] = [[] for _ in range(max(1, partitions))]
+
+    for key, item in items:
+        lanes[partition_for(key, len(lanes))].append(item)
+
+    await asyncio.gather(*(lane_handler(lane) for lane in lanes if lane))
+
+
+class KeyedWorkerPool(Generic[T_Item]):
+    def __init__(
+        self,
+        name: str,
+        handler: Callable[[T_Item], Awaitable[None]],
+        workers: int,
+        max_in_flight: int,
+        retry_backoff_ms: int = CONSUMER_WORKER_RETRY_BACKOFF_MS,
+        retry_max_backoff_ms: int = CONSUMER_WORKER_RETRY_MAX_BACKOFF_MS,
+    ):
+        self.name = name
+        self._handler = handler
+        self.retry_backoff_seconds = retry_backoff_ms / 1000
+        self.retry_max_backoff_seconds = retry_max_backoff_ms / 1000
+        self._stopping = asyncio.Event()
+        self._queues: list[asyncio.Queue[tuple[T_Item, Callable[[], None] | None]]] = [
+            asyncio.Queue(maxsize=max(1, max_in_flight // workers)) for _ in range(max(1, workers))
+        ]
+        self._tasks: list[asyncio.Task] = []
+
+    def start(self) -> None:
+        self._tasks = [asyncio.create_task(self._work(queue)) for queue in self._queues]
+
+    async def submit(self, key: Hashable, item: T_Item, on_done: Callable[[], None] | None = None) -> None:
+        await self._queues[partition_for(key, len(self._queues))].put((item, on_done))
+
+    async def join(self) -> None:
+        await asyncio.gather(*(queue.join() for queue in self._queues))
+
+    def stop_retrying(self) -> None:
+        self._stopping.set()
+
+    async def stop(self) -> None:
+        self.stop_retrying()
+        await self.join()
+
+        for task in self._tasks:
+            task.cancel()
+
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _work(self, queue: asyncio.Queue[tuple[T_Item, Callable[[], None] | None]]) -> None:
+        while True:
+            item, on_done = await queue.get()
+
+            try:
+                if await self._process(item) and on_done is not None:
+                    on_done()
+            finally:
+                queue.task_done()
+
+    async def _process(self, item: T_Item) -> bool:
+        delay = self.retry_backoff_seconds
+
+        # skipping a failed item would leave a hole no later offset can be committed past,
+        # so it is retried until it succeeds and only given up when the pool stops, uncommitted
+        while True:
+            try:
+                await self._handler(item)
+                return True
+            except Exception as e:
+                logger.error("Worker failed to process item", pool=self.name, error=str(e), retry_in=delay)
+
+            if self._stopping.is_set():
+                return False
+
+            try:
+                await asyncio.wait_for(self._stopping.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+
+            delay = min(delay * 2, self.retry_max_backoff_seconds)
@@ -1,7 +1,20 @@
-import structlog
+import asyncio
+from typing import Final
 
-from configs.db.database import AsyncSessionLocal
-from configs.db.kafka import get_kafka_consumer, SUM_RED_METRIC_TOPIC
+import structlog
+from aiokafka import ConsumerRecord
+
+from configs.db.kafka import (
+    get_kafka_consumer, SUM_RED_METRIC_TOPIC,
+    CONSUMER_WORKERS, CONSUMER_MAX_IN_FLIGHT, CONSUMER_BATCH_MODE
+)
+from consumers.batch_consumer import consume_batches
+from consumers.event_deduplicator import EventDeduplicator
+from consumers.keyed_worker_pool import KeyedWorkerPool
+from consumers.metric_delta_aggregator import MetricDeltaAggregator, METRIC_AGGREGATION_WINDOW_MS
+from consumers.offset_tracker import get_tracked_consumer
+from consumers.retry_router import RetryRouter
+from consumers.unit_of_work import MetricUnitOfWork
 from handlers.comment_post_enterprise_metric_handler import CommentPostEnterpriseMetricHandler
 from handlers.comment_post_user_metric_handler import CommentPostUserMetricHandler
 from handlers.enterprise_metric_handler import EnterpriseMetricHandler
@@ -9,85 +22,140 @@ from handlers.post_enterprise_metric_handler import PostEnterpriseMetricHandler
 from handlers.post_user_metric_handler import PostUserMetricHandler
 from handlers.user_metric_handler import UserMetricHandler
 from handlers.vacancy_metric_handler import VacancyMetricHandler
-from repositories.provider.comment_post_enterprise_metric_repository_provider import \
-    CommentPostEnterpriseMetricRepositoryProvider
-from repositories.provider.comment_post_user_metric_repository_provider import CommentPostUserMetricRepositoryProvider
-from repositories.provider.enterprise_metric_repository_provider import EnterpriseMetricRepositoryProvider
-from repositories.provider.post_enterprise_metric_repository_provider import PostEnterpriseMetricRepositoryProvider
-from repositories.provider.post_user_metric_repository_provider import PostUserMetricRepositoryProvider
-from repositories.provider.user_metric_repository_provider import UserMetricRepositoryProvider
-from repositories.provider.vacancy_metric_repository_provider import VacancyMetricRepositoryProvider
 from schemas.event_message_metric_schemas import EventMessageMetric, EntityEnum
-from services.base.comment_post_enterprise_metric_service_provider import CommentPostEnterpriseMetricServiceProvider
-from services.base.comment_post_user_metric_service_provider import CommentPostUserMetricServiceProvider
-from services.provider.enterprise_metric_service_provider import EnterpriseMetricServiceProvider
-from services.provider.post_enterprise_metric_service_provider import PostEnterpriseMetricServiceProvider
-from services.provider.post_user_metric_service_provider import PostUserMetricServiceProvider
-from services.provider.user_metric_service_provider import UserMetricServiceProvider
-from services.provider.vacancy_metric_service_provider import VacancyMetricServiceProvider
 
 logger = structlog.get_logger()
 
+deduplicator: Final[EventDeduplicator] = EventDeduplicator(SUM_RED_METRIC_TOPIC)
+
+async def retry_metric_event(value: bytes, attempt: int):
+    await handle_metric_event(EventMessageMetric.model_validate_json(value), attempt)
+
+retry_router: Final[RetryRouter] = RetryRouter(SUM_RED_METRIC_TOPIC, "metric-service", retry_metric_event)
+
 async def consume_metric_events():
-    consumer = await get_kafka_consumer(SUM_RED_METRIC_TOPIC, group_id="metric-service")
+    retry_task = asyncio.create_task(retry_router.run())
+
+    try:
+        await consume_metric_topic()
+    finally:
+        retry_task.cancel()
+        await asyncio.gather(retry_task, return_exceptions=True)
+
+async def consume_metric_topic():
+    if CONSUMER_BATCH_MODE:
+        consumer = await get_kafka_consumer(SUM_RED_METRIC_TOPIC, group_id="metric-service", enable_auto_commit=False)
+
+        try:
+            await consume_batches(consumer, process_metric_batch)
+        finally:
+            await consumer.stop()
+
+        return
+
+    consumer, offsets = await get_tracked_consumer(SUM_RED_METRIC_TOPIC, group_id="metric-service")
+    commit_task = asyncio.create_task(offsets.run())
+
+    aggregator = MetricDeltaAggregator(deduplicator=deduplicator) if METRIC_AGGREGATION_WINDOW_MS > 0 else None
+    flush_task = asyncio.create_task(aggregator.run()) if aggregator is not None else None
+
+    pool = KeyedWorkerPool("metric", handle_metric_event, CONSUMER_WORKERS, CONSUMER_MAX_IN_FLIGHT)
+    pool.start()
 
     try:
         async for msg in consumer:
-            async with AsyncSessionLocal() as db:
-                repository_metric_user = UserMetricRepositoryProvider(db)
-                user_metric_service = UserMetricServiceProvider(repository_metric_user)
+            done = offsets.track(msg)
+
+            try:
+                event = EventMessageMetric.model_validate_json(msg.value.decode("utf-8"))
+
+                if aggregator is None:
+                    await pool.submit((event.entity, event.metric_id), event, done)
+                    continue
 
-                repository_metric_vacancy = VacancyMetricRepositoryProvider(db)
-                vacancy_metric_service = VacancyMetricServiceProvider(repository_metric_vacancy)
+                # an aggregated event is only done once the flush that applies it commits
+                if not aggregator.add(event, done):
+                    done()
 
-                repository_metric_enterprise = EnterpriseMetricRepositoryProvider(db)
-                enterprise_metric_service = EnterpriseMetricServiceProvider(repository_metric_enterprise)
+                if aggregator.is_full:
+                    await aggregator.flush()
 
-                repository_metric_enterprise_post = PostEnterpriseMetricRepositoryProvider(db)
-                post_enterprise_metric_service = PostEnterpriseMetricServiceProvider(repository_metric_enterprise_post)
+            except Exception as e:
+                logger.error("Failed to process event", error=str(e), message_value=msg.value.decode("utf-8"))
+                await retry_router.dead_letter(msg.value, e)
+                done()
+    finally:
+        await pool.stop()
 
-                repository_metric_user_post = PostUserMetricRepositoryProvider(db)
-                post_user_metric_service = PostUserMetricServiceProvider(repository_metric_user_post)
+        if flush_task is not None:
+            flush_task.cancel()
+            await aggregator.flush()
 
-                repository_metric_comment_post_enterprise = CommentPostEnterpriseMetricRepositoryProvider(db)
-                comment_post_enterprise_metric_service = CommentPostEnterpriseMetricServiceProvider(repository_metric_comment_post_enterprise)
+        commit_task.cancel()
+        await offsets.commit()
+        await consumer.stop()
 
-                repository_metric_comment_post_user = CommentPostUserMetricRepositoryProvider(db)
-                comment_post_user_metric_service = CommentPostUserMetricServiceProvider(repository_metric_comment_post_user)
+async def process_metric_batch(records: list[ConsumerRecord]):
+    aggregator = MetricDeltaAggregator(max_keys=len(records), deduplicator=deduplicator)
 
-                try:
-                    event = EventMessageMetric.model_validate_json(msg.value.decode("utf-8"))
-                    #logger.info(f"Event received: {event.model_dump_json()}")
+    for record in records:
+        try:
+            aggregator.add(EventMessageMetric.model_validate_json(record.value.decode("utf-8")))
+        except Exception as e:
+            logger.error("Failed to process event", error=str(e), message_value=record.value.decode("utf-8"))
+            await retry_router.dead_letter(record.value, e)
 
-                    if event.entity == EntityEnum.USER_METRIC:
-                        handler = UserMetricHandler(event, user_metric_service)
-                        await handler.handle()
+    async with MetricUnitOfWork() as uow:
+        await aggregator.flush(uow.db, raise_on_error=True)
 
-                    elif event.entity == EntityEnum.VACANCY_METRIC:
-                        handler = VacancyMetricHandler(event, vacancy_metric_service)
-                        await handler.handle()
+async def handle_metric_event(event: EventMessageMetric, attempt: int = 0):
+    async with MetricUnitOfWork() as uow:
+        await dispatch_metric_event(uow, event, attempt)
 
-                    elif event.entity == EntityEnum.ENTERPRISE_METRIC:
-                        handler = EnterpriseMetricHandler(event, enterprise_metric_service)
-                        await handler.handle()
+async def dispatch_metric_event(uow: MetricUnitOfWork, event: EventMessageMetric, attempt: int = 0):
+    try:
+        #logger.info(f"Event received: {event.model_dump_json()}")
 
-                    elif event.entity == EntityEnum.POST_ENTERPRISE_METRIC:
-                        handler = PostEnterpriseMetricHandler(event, post_enterprise_metric_service)
-                        await handler.handle()
+        if not await deduplicator.filter_new(uow.processed_event_repository, [event.event_id]):
+            logger.info("Duplicate event skipped", event_id=event.event_id)
+            return
 
-                    elif event.entity == EntityEnum.POST_USER_METRIC:
-                        handler = PostUserMetricHandler(event, post_user_metric_service)
-                        await handler.handle()
+        if not await deduplicator.mark(uow.processed_event_repository, [event.event_id]):
+            logger.info("Duplicate event skipped", event_id=event.event_id)
+            return
 
-                    elif event.entity == EntityEnum.COMMENT_POST_ENTERPRISE_METRIC:
-                        handler = CommentPostEnterpriseMetricHandler(event, comment_post_enterprise_metric_service)
-                        await handler.handle()
+        if event.entity == EntityEnum.USER_METRIC:
+            handler = UserMetricHandler(event, uow.user_metric_service)
+            await handler.handle()
 
-                    elif event.entity == EntityEnum.COMMENT_POST_USER_METRIC:
-                        handler = CommentPostUserMetricHandler(event, comment_post_user_metric_service)
-                        await handler.handle()
+        elif event.entity == EntityEnum.VACANCY_METRIC:
+            handler = VacancyMetricHandler(event, uow.vacancy_metric_service)
+            await handler.handle()
 
-                except Exception as e:
-                    logger.error("Failed to process event", error=str(e), message_value=msg.value.decode("utf-8"))
-    finally:
-        await consumer.stop()
\ No newline at end of file
+        elif event.entity == EntityEnum.ENTERPRISE_METRIC:
+            handler = EnterpriseMetricHandler(event, uow.enterprise_metric_service)
+            await handler.handle()
+
+        elif event.entity == EntityEnum.POST_ENTERPRISE_METRIC:
+            handler = PostEnterpriseMetricHandler(event, uow.post_enterprise_metric_service)
+            await handler.handle()
+
+        elif event.entity == EntityEnum.POST_USER_METRIC:
+            handler = PostUserMetricHandler(event, uow.post_user_metric_service)
+            await handler.handle()
+
+        elif event.entity == EntityEnum.COMMENT_POST_ENTERPRISE_METRIC:
+            handler = CommentPostEnterpriseMetricHandler(event, uow.comment_post_enterprise_metric_service)
+            await handler.handle()
+
+        elif event.entity == EntityEnum.COMMENT_POST_USER_METRIC:
+            handler = CommentPostUserMetricHandler(event, uow.comment_post_user_metric_service)
+            await handler.handle()
+
+        await uow.commit()
+        deduplicator.remember([event.event_id])
+
+    except Exception as e:
+        await uow.rollback()
+        logger.error("Failed to process event", error=str(e), message_value=event.model_dump_json())
+        await retry_router.publish_failure(event.model_dump_json().encode("utf-8"), e, attempt)
\ No newline at end of file
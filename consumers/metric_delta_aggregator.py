@@ -0,0 +1,196 @@
+import asyncio
+import os
+from typing import Callable, Final, Type
+
+import structlog
+from dotenv import load_dotenv
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from configs.db.database import (
+    AsyncSessionLocal, Base,
+    UserMetricEntity, VacancyMetricEntity, EnterpriseMetricEntity,
+    PostEnterpriseMetricEntity, PostUserMetricEntity,
+    CommentPostEnterpriseMetricEntity, CommentPostUserMetricEntity
+)
+from consumers.event_deduplicator import EventDeduplicator
+from repositories.generics.generic_metric_repository import GenericMetricRepository, MetricDelta, get_counter_column
+from repositories.provider.comment_post_enterprise_metric_repository_provider import \
+    CommentPostEnterpriseMetricRepositoryProvider
+from repositories.provider.comment_post_user_metric_repository_provider import CommentPostUserMetricRepositoryProvider
+from repositories.provider.enterprise_metric_repository_provider import EnterpriseMetricRepositoryProvider
+from repositories.provider.post_enterprise_metric_repository_provider import PostEnterpriseMetricRepositoryProvider
+from repositories.provider.post_user_metric_repository_provider import PostUserMetricRepositoryProvider
+from repositories.provider.processed_event_repository_provider import ProcessedEventRepositoryProvider
+from repositories.provider.user_metric_repository_provider import UserMetricRepositoryProvider
+from repositories.provider.vacancy_metric_repository_provider import VacancyMetricRepositoryProvider
+from schemas.event_message_metric_schemas import EventMessageMetric, EntityEnum, SumRedEnum
+
+logger = structlog.get_logger()
+
+load_dotenv()
+
+# 0 disables aggregation and every event is applied as soon as it is consumed
+METRIC_AGGREGATION_WINDOW_MS: Final[int] = int(os.getenv("METRIC_AGGREGATION_WINDOW_MS", "1000"))
+METRIC_AGGREGATION_MAX_KEYS: Final[int] = int(os.getenv("METRIC_AGGREGATION_MAX_KEYS", "5000"))
+
+METRIC_ENTITIES: Final[dict[EntityEnum, Type[Base]]] = {
+    EntityEnum.USER_METRIC: UserMetricEntity,
+    EntityEnum.VACANCY_METRIC: VacancyMetricEntity,
+    EntityEnum.ENTERPRISE_METRIC: EnterpriseMetricEntity,
+    EntityEnum.POST_ENTERPRISE_METRIC: PostEnterpriseMetricEntity,
+    EntityEnum.POST_USER_METRIC: PostUserMetricEntity,
+    EntityEnum.COMMENT_POST_ENTERPRISE_METRIC: CommentPostEnterpriseMetricEntity,
+    EntityEnum.COMMENT_POST_USER_METRIC: CommentPostUserMetricEntity,
+}
+
+METRIC_REPOSITORIES: Final[dict[EntityEnum, Type[GenericMetricRepository]]] = {
+    EntityEnum.USER_METRIC: UserMetricRepositoryProvider,
+    EntityEnum.VACANCY_METRIC: VacancyMetricRepositoryProvider,
+    EntityEnum.ENTERPRISE_METRIC: EnterpriseMetricRepositoryProvider,
+    EntityEnum.POST_ENTERPRISE_METRIC: PostEnterpriseMetricRepositoryProvider,
+    EntityEnum.POST_USER_METRIC: PostUserMetricRepositoryProvider,
+    EntityEnum.COMMENT_POST_ENTERPRISE_METRIC: CommentPostEnterpriseMetricRepositoryProvider,
+    EntityEnum.COMMENT_POST_USER_METRIC: CommentPostUserMetricRepositoryProvider,
+}
+
+MetricKey = tuple[EntityEnum, int, str]
+
+
+class MetricDeltaAggregator:
+    def __init__(
+        self,
+        window_ms: int = METRIC_AGGREGATION_WINDOW_MS,
+        max_keys: int = METRIC_AGGREGATION_MAX_KEYS,
+        deduplicator: EventDeduplicator | None = None,
+    ):
+        self.window_seconds = window_ms / 1000
+        self.max_keys = max_keys
+        self.deduplicator = deduplicator
+        self._deltas: dict[MetricKey, int] = {}
+        self._event_steps: dict[str, tuple[MetricKey, int]] = {}
+        self._on_flushed: list[Callable[[], None]] = []
+        self._events = 0
+        self._lock = asyncio.Lock()
+
+    @property
+    def is_full(self) -> bool:
+        return len(self._deltas) >= self.max_keys
+
+    def add(self, event: EventMessageMetric, on_flushed: Callable[[], None] | None = None) -> bool:
+        if get_counter_column(METRIC_ENTITIES[event.entity], event.column) is None:
+            logger.error(f"Column {event.column} does not exist on {METRIC_ENTITIES[event.entity].__name__}")
+            return False
+
+        key = (event.entity, event.metric_id, event.column)
+        step = 1 if event.action == SumRedEnum.SUM else -1
+
+        if self.deduplicator is not None:
+            if event.event_id in self._event_steps or self.deduplicator.is_known(event.event_id):
+                logger.info("Duplicate event skipped", event_id=event.event_id)
+                return False
+
+            self._event_steps[event.event_id] = (key, step)
+
+        self._deltas[key] = self._deltas.get(key, 0) + step
+        self._events += 1
+
+        if on_flushed is not None:
+            self._on_flushed.append(on_flushed)
+
+        return True
+
+    async def flush(self, db: AsyncSession | None = None, raise_on_error: bool = False) -> None:
+        async with self._lock:
+            deltas, self._deltas = self._deltas, {}
+            event_steps, self._event_steps = self._event_steps, {}
+            on_flushed, self._on_flushed = self._on_flushed, []
+            events, self._events = self._events, 0
+
+            if not deltas:
+                self._run_callbacks(on_flushed)
+                return
+
+            try:
+                if db is None:
+                    async with AsyncSessionLocal() as session:
+                        keys = await self._apply(session, deltas, event_steps)
+                else:
+                    keys = await self._apply(db, deltas, event_steps)
+
+            except Exception as e:
+                logger.error("Failed to flush metric deltas", error=str(e), keys=len(deltas))
+
+                if raise_on_error:
+                    raise
+
+                self._restore(deltas, event_steps, events)
+                self._on_flushed[:0] = on_flushed
+                return
+
+            logger.info("Metric deltas flushed", events=events, keys=keys)
+            self._run_callbacks(on_flushed)
+
+    @staticmethod
+    def _run_callbacks(callbacks: list[Callable[[], None]]) -> None:
+        for callback in callbacks:
+            callback()
+
+    async def _apply(
+        self,
+        db: AsyncSession,
+        deltas: dict[MetricKey, int],
+        event_steps: dict[str, tuple[MetricKey, int]],
+    ) -> int:
+        processed_repository = ProcessedEventRepositoryProvider(db)
+
+        # events are claimed before their deltas are applied, the ones another consumer already claimed are backed out
+        if self.deduplicator is not None and event_steps:
+            claimed = set(await self.deduplicator.mark(processed_repository, list(event_steps)))
+
+            for event_id in [event_id for event_id in event_steps if event_id not in claimed]:
+                key, step = event_steps.pop(event_id)
+                deltas[key] -= step
+
+        by_entity: dict[EntityEnum, list[MetricDelta]] = {}
+
+        for (entity, metric_id, column_name), delta in deltas.items():
+            if delta != 0:
+                by_entity.setdefault(entity, []).append((metric_id, column_name, delta))
+
+        for entity, entity_deltas in by_entity.items():
+            result = await METRIC_REPOSITORIES[entity](db).add_deltas(entity_deltas)
+
+            if result.missing_ids:
+                logger.warning(
+                    "Metric rows not found",
+                    entity=entity.value,
+                    requested=result.requested,
+                    matched=result.matched,
+                    missing_ids=result.missing_ids,
+                )
+
+        await db.commit()
+
+        if self.deduplicator is not None:
+            self.deduplicator.remember(list(event_steps))
+
+        return sum(len(entity_deltas) for entity_deltas in by_entity.values())
+
+    def _restore(
+        self,
+        deltas: dict[MetricKey, int],
+        event_steps: dict[str, tuple[MetricKey, int]],
+        events: int,
+    ) -> None:
+        for key, delta in deltas.items():
+            self._deltas[key] = self._deltas.get(key, 0) + delta
+
+        for event_id, key_step in event_steps.items():
+            self._event_steps.setdefault(event_id, key_step)
+
+        self._events += events
+
+    async def run(self) -> None:
+        while True:
+            await asyncio.sleep(self.window_seconds)
+            await self.flush()
@@ -0,0 +1,106 @@
+import asyncio
+import time
+from typing import Awaitable, Callable, Final
+
+import structlog
+
+from configs.db.enums import NotificationTypeEnum
+from configs.notification.notification_config import NOTIFICATION_COALESCE_WINDOW_MS, NOTIFICATION_COALESCE_MAX_EVENTS
+from schemas.event_notification import EventNotification
+
+logger = structlog.get_logger()
+
+COALESCABLE_EVENT_TYPES: Final[frozenset[NotificationTypeEnum]] = frozenset({
+    NotificationTypeEnum.NEW_POST,
+    NotificationTypeEnum.NEW_COMMENT,
+    NotificationTypeEnum.NEW_POST_ENTERPRISE,
+    NotificationTypeEnum.NEW_VACANCY,
+})
+
+CoalesceKey = tuple[int, NotificationTypeEnum]
+
+
+def coalesce_key(event: EventNotification) -> CoalesceKey | None:
+    if event.event_type not in COALESCABLE_EVENT_TYPES or event.actor_id is None:
+        return None
+
+    return event.actor_id, event.event_type
+
+
+def coalesce(events: list[EventNotification]) -> list[list[EventNotification]]:
+    groups: dict[CoalesceKey, list[EventNotification]] = {}
+    result: list[list[EventNotification]] = []
+
+    for event in events:
+        key = coalesce_key(event)
+
+        if key is None:
+            result.append([event])
+        elif key in groups:
+            groups[key].append(event)
+        else:
+            groups[key] = [event]
+            result.append(groups[key])
+
+    return result
+
+
+def build_digest(events: list[EventNotification]) -> EventNotification:
+    latest = events[-1]
+
+    return latest.model_copy(update={"data": {**latest.data, "count": len(events)}})
+
+
+class NotificationCoalescer:
+    def __init__(
+        self,
+        emit: Callable[[list[EventNotification]], Awaitable[None]],
+        window_ms: int = NOTIFICATION_COALESCE_WINDOW_MS,
+        max_events: int = NOTIFICATION_COALESCE_MAX_EVENTS,
+    ):
+        self.window_seconds = window_ms / 1000
+        self.max_events = max_events
+        self._emit = emit
+        self._groups: dict[CoalesceKey, list[EventNotification]] = {}
+        self._opened_at: dict[CoalesceKey, float] = {}
+        self._events = 0
+        self._lock = asyncio.Lock()
+
+    def accepts(self, event: EventNotification) -> bool:
+        return coalesce_key(event) is not None
+
+    async def add(self, event: EventNotification) -> None:
+        key = coalesce_key(event)
+
+        if key not in self._groups:
+            self._groups[key] = []
+            self._opened_at[key] = time.monotonic()
+
+        self._groups[key].append(event)
+        self._events += 1
+
+        if self._events >= self.max_events:
+            await self.flush()
+
+    async def flush(self, due_only: bool = False) -> None:
+        async with self._lock:
+            now = time.monotonic()
+            keys = [
+                key for key, opened_at in self._opened_at.items()
+                if not due_only or now - opened_at >= self.window_seconds
+            ]
+
+            for key in keys:
+                events = self._groups.pop(key)
+                del self._opened_at[key]
+                self._events -= len(events)
+
+                if len(events) > 1:
+                    logger.info("Notification events coalesced", actor_id=key[0], type=key[1].name, events=len(events))
+
+                await self._emit(events)
+
+    async def run(self) -> None:
+        while True:
+            await asyncio.sleep(min(self.window_seconds, 1))
+            await self.flush(due_only=True)
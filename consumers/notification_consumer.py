@@ -1,74 +1,266 @@
+import asyncio
+from functools import partial
+from typing import Callable, Final
+
 import structlog
+from aiokafka import ConsumerRecord
 
-from configs.db.database import AsyncSessionLocal
 from configs.db.enums import NotificationTypeEnum
-from configs.db.kafka import get_kafka_consumer, NOTIFICATION_TOPIC
+from configs.db.kafka import (
+    NOTIFICATION_TOPIC, CONSUMER_MAX_IN_FLIGHT, CONSUMER_BATCH_MODE,
+    CONSUMER_BATCH_MAX_RECORDS, CONSUMER_BATCH_TIMEOUT_MS, CONSUMER_BATCH_RETRY_BACKOFF_MS
+)
+from configs.notification.notification_config import (
+    NOTIFICATION_COALESCE_WINDOW_MS, NOTIFICATION_POINT_EVENT_TYPES, NOTIFICATION_LANE_SLOTS,
+    NOTIFICATION_POINT_LANE_WEIGHT, NOTIFICATION_POINT_LANE_CONCURRENCY,
+    NOTIFICATION_BULK_LANE_WEIGHT, NOTIFICATION_BULK_LANE_CONCURRENCY, NOTIFICATION_BULK_LANE_BACKLOG
+)
+from consumers.event_deduplicator import EventDeduplicator
+from consumers.fanout_jobs import fanout_publisher
+from consumers.notification_coalescer import NotificationCoalescer, coalesce, build_digest
+from consumers.offset_tracker import OffsetTracker, get_tracked_consumer
+from consumers.priority_lanes import Lane, PriorityLaneScheduler
+from consumers.retry_router import RetryRouter
+from consumers.unit_of_work import NotificationUnitOfWork
 from handlers.notification_handler import NotificationHandler
-from repositories.provider.enterprise_follow_user_repository_provider import EnterpriseFollowUserRepositoryProvider
-from repositories.provider.follow_repository_provider import FollowRepositoryProvider
-from repositories.provider.notification_enterprise_repository_provider import NotificationEnterpriseRepositoryProvider
-from repositories.provider.notify_repository_provider import NotifyRepositoryProvider
 from schemas.event_notification import EventNotification
-from services.provider.enterprise_follow_user_service_provider import EnterpriseFollowUserServiceProvider
-from services.provider.follow_service_provider import FollowServiceProvider
-from services.provider.notification_enterprise_service_provider import NotificationEnterpriseServiceProvider
-from services.provider.notification_service_provider import NotificationServiceProvider
+from services.limit.fanout_rate_limiter import fanout_rate_limiter
 
 logger = structlog.get_logger()
 
+deduplicator: Final[EventDeduplicator] = EventDeduplicator(NOTIFICATION_TOPIC)
+
+async def retry_notification_event(value: bytes, attempt: int):
+    await handle_notification_event(EventNotification.model_validate_json(value), attempt)
+
+retry_router: Final[RetryRouter] = RetryRouter(NOTIFICATION_TOPIC, "notification-service", retry_notification_event)
+
+POINT_LANE: Final[str] = "point"
+BULK_LANE: Final[str] = "bulk"
+
+NOTIFICATION_LANES: Final[list[Lane]] = [
+    Lane(POINT_LANE, NOTIFICATION_POINT_LANE_WEIGHT, NOTIFICATION_POINT_LANE_CONCURRENCY),
+    Lane(BULK_LANE, NOTIFICATION_BULK_LANE_WEIGHT, NOTIFICATION_BULK_LANE_CONCURRENCY, NOTIFICATION_BULK_LANE_BACKLOG),
+]
+
+def notification_lane(event: EventNotification) -> str:
+    return POINT_LANE if event.event_type.name in NOTIFICATION_POINT_EVENT_TYPES else BULK_LANE
+
+def validate_lanes() -> None:
+    # a bulk lane allowed to hold every slot leaves point events waiting behind fan-outs
+    if NOTIFICATION_BULK_LANE_CONCURRENCY >= NOTIFICATION_LANE_SLOTS:
+        raise ValueError(
+            f"NOTIFICATION_BULK_LANE_CONCURRENCY {NOTIFICATION_BULK_LANE_CONCURRENCY} "
+            f"must be below NOTIFICATION_LANE_SLOTS {NOTIFICATION_LANE_SLOTS}"
+        )
+
+def new_scheduler() -> PriorityLaneScheduler:
+    return PriorityLaneScheduler(
+        "notification", handle_notification_events, NOTIFICATION_LANES, NOTIFICATION_LANE_SLOTS, CONSUMER_MAX_IN_FLIGHT
+    )
+
 async def consumer_notification():
-    consumer = await get_kafka_consumer(NOTIFICATION_TOPIC, group_id="email-service")
+    retry_task = asyncio.create_task(retry_router.run())
 
-    try :
-        async for msg in consumer:
-            async with AsyncSessionLocal() as db:
-                notify_repository = NotifyRepositoryProvider(db)
-                notification_service = NotificationServiceProvider(notify_repository)
+    try:
+        await consume_notification_topic()
+    finally:
+        retry_task.cancel()
+        await asyncio.gather(retry_task, return_exceptions=True)
 
-                notify_enterprise_repository = NotificationEnterpriseRepositoryProvider(db)
-                notification_enterprise_service = NotificationEnterpriseServiceProvider(notify_enterprise_repository)
+async def consume_notification_topic():
+    consumer, offsets = await get_tracked_consumer(NOTIFICATION_TOPIC, group_id="notification-service")
+    commit_task = asyncio.create_task(offsets.run())
 
-                follow_repository = FollowRepositoryProvider(db)
-                follow_service = FollowServiceProvider(follow_repository)
+    scheduler = new_scheduler()
+    scheduler.start()
 
-                enterprise_follow_user_repository = EnterpriseFollowUserRepositoryProvider(db)
-                enterprise_follow_user_service = EnterpriseFollowUserServiceProvider(enterprise_follow_user_repository)
+    if CONSUMER_BATCH_MODE:
+        # offsets are tracked per record rather than per batch, so a batch is read as soon as its point
+        # events are done while the bulk events of earlier batches are still running
+        try:
+            while True:
+                batches = await consumer.getmany(
+                    timeout_ms=CONSUMER_BATCH_TIMEOUT_MS,
+                    max_records=CONSUMER_BATCH_MAX_RECORDS,
+                )
+                records = [record for partition_records in batches.values() for record in partition_records]
 
-                try:
-                    event = EventNotification.model_validate_json(msg.value.decode("utf-8"))
-                    handler = NotificationHandler(event,
-                          follow_service=follow_service,
-                          notification_service=notification_service,
-                          notification_enterprise_service=notification_enterprise_service,
-                          enterprise_follow_service=enterprise_follow_user_service,
-                    )
+                if records:
+                    await process_notification_batch(scheduler, offsets, records)
+        finally:
+            await scheduler.stop()
+            commit_task.cancel()
+            await offsets.commit()
+            await consumer.stop()
 
-                    if event.event_type == NotificationTypeEnum.NEW_POST:
-                        await handler.notify_user_about_new_post()
+        return
 
-                    if event.event_type == NotificationTypeEnum.NEW_COMMENT:
-                        await handler.notify_user_about_new_comment()
+    # a coalesced event may sit in the coalescer for a while, its record is done once the digest it joined is
+    pending_offsets: dict[int, Callable[[], None]] = {}
 
-                    if event.event_type == NotificationTypeEnum.NEW_FOLLOWER:
-                        await handler.notify_about_new_follow()
+    async def submit(events: list[EventNotification]):
+        done = partial(run_callbacks, [pending_offsets.pop(id(event)) for event in events])
 
-                    if event.event_type == NotificationTypeEnum.NEW_POST_ENTERPRISE:
-                        await handler.notify_about_new_post_enterprise()
+        await scheduler.submit(notification_lane(events[0]), notification_key(events[0]), events, done)
 
-                    if event.event_type == NotificationTypeEnum.NEW_VACANCY:
-                        logger.info(f"Event received: {event.model_dump_json()}")
-                        await handler.notify_about_new_vacancy()
+    coalescer = NotificationCoalescer(submit) if NOTIFICATION_COALESCE_WINDOW_MS > 0 else None
+    coalesce_task = asyncio.create_task(coalescer.run()) if coalescer is not None else None
 
-                    if event.event_type == NotificationTypeEnum.NEW_REVIEW_ENTERPRISE:
-                        await handler.notify_enterprise_about_new_review()
+    try :
+        async for msg in consumer:
+            done = offsets.track(msg)
 
-                    if event.event_type == NotificationTypeEnum.APPLICATION_RECEIVED:
-                        await handler.notify_enterprise_about_new_app()
+            try:
+                event = EventNotification.model_validate_json(msg.value.decode("utf-8"))
+                pending_offsets[id(event)] = done
 
-                    if event.event_type == NotificationTypeEnum.SYSTEM:
-                        await handler.notify_user_about_notification_system()
+                if coalescer is not None and coalescer.accepts(event):
+                    await coalescer.add(event)
+                    continue
 
-                except Exception as e:
-                    logger.error("Failed to process event", error=str(e), message_value=msg.value.decode("utf-8"))
+                await submit([event])
+            except Exception as e:
+                logger.error("Failed to process event", error=str(e), message_value=msg.value.decode("utf-8"))
+                await retry_router.dead_letter(msg.value, e)
+                done()
     finally:
+        if coalesce_task is not None:
+            coalesce_task.cancel()
+            await coalescer.flush()
+
+        await scheduler.stop()
+        commit_task.cancel()
+        await offsets.commit()
         await consumer.stop()
+
+def notification_key(event: EventNotification):
+    return event.actor_id if event.actor_id is not None else event.entity_id
+
+def run_callbacks(callbacks: list[Callable[[], None]]) -> None:
+    for callback in callbacks:
+        callback()
+
+async def process_notification_batch(
+    scheduler: PriorityLaneScheduler,
+    offsets: OffsetTracker,
+    records: list[ConsumerRecord],
+):
+    events = []
+    pending_offsets: dict[int, Callable[[], None]] = {}
+
+    for record in records:
+        done = offsets.track(record)
+
+        try:
+            event = EventNotification.model_validate_json(record.value.decode("utf-8"))
+        except Exception as e:
+            logger.error("Failed to process event", error=str(e), message_value=record.value.decode("utf-8"))
+            await retry_router.dead_letter(record.value, e)
+            done()
+            continue
+
+        events.append(event)
+        pending_offsets[id(event)] = done
+
+    # the batch itself is the coalescing window
+    groups = coalesce(events) if NOTIFICATION_COALESCE_WINDOW_MS > 0 else [[event] for event in events]
+    point_groups = []
+
+    for group in groups:
+        done = partial(run_callbacks, [pending_offsets.pop(id(event)) for event in group])
+
+        # bulk groups go to the bulk lane's backlog and finish on their own, the batch only waits for point groups
+        if notification_lane(group[0]) == BULK_LANE:
+            await scheduler.submit(BULK_LANE, notification_key(group[0]), group, done)
+        else:
+            point_groups.append((group, done))
+
+    while True:
+        try:
+            await scheduler.run_partitioned(
+                [(POINT_LANE, notification_key(group[0]), group) for group, _ in point_groups],
+                process_notification_lane,
+            )
+            break
+        except Exception as e:
+            # already applied groups are skipped as duplicates on the next attempt
+            logger.error("Failed to process point events, retrying", error=str(e), groups=len(point_groups))
+            await asyncio.sleep(CONSUMER_BATCH_RETRY_BACKOFF_MS / 1000)
+
+    for _, done in point_groups:
+        done()
+
+async def process_notification_lane(groups: list[list[EventNotification]]):
+    async with NotificationUnitOfWork() as uow:
+        for events in groups:
+            await dispatch_notification_events(uow, events)
+
+async def handle_notification_event(event: EventNotification, attempt: int = 0):
+    await handle_notification_events([event], attempt)
+
+async def handle_notification_events(events: list[EventNotification], attempt: int = 0):
+    async with NotificationUnitOfWork() as uow:
+        await dispatch_notification_events(uow, events, attempt)
+
+async def dispatch_notification_events(uow: NotificationUnitOfWork, events: list[EventNotification], attempt: int = 0):
+    try:
+        new_ids = await deduplicator.filter_new(uow.processed_event_repository, [str(e.event_id) for e in events])
+        new_ids = set(await deduplicator.mark(uow.processed_event_repository, new_ids))
+
+        for event in events:
+            if str(event.event_id) not in new_ids:
+                logger.info("Duplicate event skipped", event_id=str(event.event_id))
+
+        events = [event for event in events if str(event.event_id) in new_ids]
+
+        if not events:
+            return
+
+        event = build_digest(events) if len(events) > 1 else events[0]
+
+        handler = NotificationHandler(event,
+              follow_service=uow.follow_service,
+              notification_service=uow.notification_service,
+              notification_enterprise_service=uow.notification_enterprise_service,
+              enterprise_follow_service=uow.enterprise_follow_user_service,
+              fanout_publisher=fanout_publisher,
+              fanout_limiter=fanout_rate_limiter,
+              attempt=attempt,
+        )
+
+        if event.event_type == NotificationTypeEnum.NEW_POST:
+            await handler.notify_user_about_new_post()
+
+        if event.event_type == NotificationTypeEnum.NEW_COMMENT:
+            await handler.notify_user_about_new_comment()
+
+        if event.event_type == NotificationTypeEnum.NEW_FOLLOWER:
+            await handler.notify_about_new_follow()
+
+        if event.event_type == NotificationTypeEnum.NEW_POST_ENTERPRISE:
+            await handler.notify_about_new_post_enterprise()
+
+        if event.event_type == NotificationTypeEnum.NEW_VACANCY:
+            logger.info(f"Event received: {event.model_dump_json()}")
+            await handler.notify_about_new_vacancy()
+
+        if event.event_type == NotificationTypeEnum.NEW_REVIEW_ENTERPRISE:
+            await handler.notify_enterprise_about_new_review()
+
+        if event.event_type == NotificationTypeEnum.APPLICATION_RECEIVED:
+            await handler.notify_enterprise_about_new_app()
+
+        if event.event_type == NotificationTypeEnum.SYSTEM:
+            await handler.notify_user_about_notification_system()
+
+        await uow.commit()
+        deduplicator.remember(list(new_ids))
+
+    except Exception as e:
+        await uow.rollback()
+
+        # coalesced events are retried one by one
+        for event in events:
+            logger.error("Failed to process event", error=str(e), message_value=event.model_dump_json())
+            await retry_router.publish_failure(event.model_dump_json().encode("utf-8"), e, attempt)
@@ -0,0 +1,97 @@
+import asyncio
+from collections import deque
+from functools import partial
+from typing import Callable
+
+import structlog
+from aiokafka import AIOKafkaConsumer, ConsumerRebalanceListener, ConsumerRecord, TopicPartition
+from aiokafka.errors import KafkaError
+
+from configs.db.kafka import get_kafka_consumer, CONSUMER_COMMIT_INTERVAL_MS
+
+logger = structlog.get_logger()
+
+
+class OffsetTracker:
+    def __init__(self, consumer: AIOKafkaConsumer, interval_ms: int = CONSUMER_COMMIT_INTERVAL_MS):
+        if consumer._enable_auto_commit:
+            raise ValueError("OffsetTracker needs a consumer created with enable_auto_commit=False")
+
+        self.consumer = consumer
+        self.interval_seconds = interval_ms / 1000
+        self._pending: dict[TopicPartition, deque[int]] = {}
+        self._done: dict[TopicPartition, set[int]] = {}
+        self._committable: dict[TopicPartition, int] = {}
+
+    def track(self, record: ConsumerRecord) -> Callable[[], None]:
+        tp = TopicPartition(record.topic, record.partition)
+        pending = self._pending.setdefault(tp, deque())
+        pending.append(record.offset)
+
+        return partial(self._complete, tp, pending, record.offset)
+
+    def _complete(self, tp: TopicPartition, pending: deque[int], offset: int) -> None:
+        # a record of a partition revoked since it was tracked belongs to the new owner now
+        if self._pending.get(tp) is not pending:
+            return
+
+        done = self._done.setdefault(tp, set())
+        done.add(offset)
+
+        # records finish out of order across workers, a partition only moves up to its oldest unfinished record
+        while pending and pending[0] in done:
+            done.discard(pending[0])
+            self._committable[tp] = pending.popleft() + 1
+
+    async def commit(self) -> None:
+        offsets, self._committable = self._committable, {}
+
+        # a partition lost in a rebalance can no longer be committed by this member and would fail the others
+        assigned = self.consumer.assignment()
+        offsets = {tp: offset for tp, offset in offsets.items() if tp in assigned}
+
+        if not offsets:
+            return
+
+        try:
+            await self.consumer.commit(offsets)
+        except KafkaError as e:
+            logger.warning("Failed to commit offsets", error=str(e), partitions=len(offsets), retriable=e.retriable)
+
+            # anything else means the group moved on, the records are redelivered to whoever owns them now
+            if e.retriable:
+                for tp, offset in offsets.items():
+                    self._committable.setdefault(tp, offset)
+
+    async def revoke(self, partitions: set[TopicPartition]) -> None:
+        await self.commit()
+
+        for tp in partitions:
+            self._pending.pop(tp, None)
+            self._done.pop(tp, None)
+            self._committable.pop(tp, None)
+
+    async def run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            await self.commit()
+
+
+class OffsetTrackerRebalanceListener(ConsumerRebalanceListener):
+    def __init__(self):
+        self.tracker: OffsetTracker | None = None
+
+    async def on_partitions_revoked(self, revoked) -> None:
+        if self.tracker is not None:
+            await self.tracker.revoke(set(revoked))
+
+    async def on_partitions_assigned(self, assigned) -> None:
+        pass
+
+
+async def get_tracked_consumer(topic: str, group_id: str) -> tuple[AIOKafkaConsumer, OffsetTracker]:
+    listener = OffsetTrackerRebalanceListener()
+    consumer = await get_kafka_consumer(topic, group_id=group_id, enable_auto_commit=False, listener=listener)
+    listener.tracker = OffsetTracker(consumer)
+
+    return consumer, listener.tracker
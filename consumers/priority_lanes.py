@@ -0,0 +1,175 @@
+import asyncio
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from functools import partial
+from typing import Awaitable, Callable, Generic, Hashable, TypeVar
+
+from consumers.keyed_worker_pool import KeyedWorkerPool, run_partitioned
+
+T_Item = TypeVar("T_Item")
+
+
+@dataclass(frozen=True)
+class Lane:
+    name: str
+    weight: int
+    concurrency: int
+    # items waiting in front of the lane's pool before a submission blocks, 0 blocks as soon as the pool is full
+    backlog: int = 0
+
+
+class WeightedSlots:
+    def __init__(self, slots: int, weights: dict[str, int]):
+        self._free = max(1, slots)
+        self._weights = {name: max(1, weight) for name, weight in weights.items()}
+        self._waiters: dict[str, deque[asyncio.Future]] = {name: deque() for name in weights}
+        # stride scheduling: every grant moves the lane forward by 1 / weight and the lane furthest behind goes next
+        self._pass: dict[str, float] = {name: 0.0 for name in weights}
+        self._virtual_time = 0.0
+        self.in_use: dict[str, int] = {name: 0 for name in weights}
+
+    @asynccontextmanager
+    async def slot(self, lane: str):
+        await self.acquire(lane)
+
+        try:
+            yield
+        finally:
+            self.release(lane)
+
+    async def acquire(self, lane: str) -> None:
+        if self._free > 0 and not any(self._waiters.values()):
+            self._grant(lane)
+            return
+
+        waiters = self._waiters[lane]
+
+        # a lane coming back from idle does not get to spend the credit it did not use
+        if not waiters:
+            self._pass[lane] = max(self._pass[lane], self._virtual_time)
+
+        future = asyncio.get_running_loop().create_future()
+        waiters.append(future)
+
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release(lane)
+            else:
+                waiters.remove(future)
+
+            raise
+
+    def release(self, lane: str) -> None:
+        self.in_use[lane] -= 1
+        self._free += 1
+
+        while self._free > 0:
+            waiting = [name for name, waiters in self._waiters.items() if waiters]
+
+            if not waiting:
+                return
+
+            name = min(waiting, key=lambda n: self._pass[n])
+            future = self._waiters[name].popleft()
+
+            if future.done():
+                continue
+
+            self._grant(name)
+            future.set_result(None)
+
+    def _grant(self, lane: str) -> None:
+        self._free -= 1
+        self.in_use[lane] += 1
+        self._virtual_time = self._pass[lane]
+        self._pass[lane] += 1 / self._weights[lane]
+
+
+class PriorityLaneScheduler(Generic[T_Item]):
+    def __init__(
+        self,
+        name: str,
+        handler: Callable[[T_Item], Awaitable[None]],
+        lanes: list[Lane],
+        slots: int,
+        max_in_flight: int,
+    ):
+        self.name = name
+        self.lanes = {lane.name: lane for lane in lanes}
+        self._handler = handler
+        self._slots = WeightedSlots(slots, {lane.name: lane.weight for lane in lanes})
+        # one keyed pool per lane keeps per-key ordering inside the lane and its own bounded buffer,
+        # so a full bulk lane never delays submissions to the point lane
+        self._pools: dict[str, KeyedWorkerPool[T_Item]] = {
+            lane.name: KeyedWorkerPool(f"{name}-{lane.name}", partial(self._run, lane.name), lane.concurrency, max_in_flight)
+            for lane in lanes
+        }
+        # a shared poll loop feeds every lane, a lane with a backlog takes its items without waiting on its
+        # workers, so a burst of slow items never holds back the cheap ones read after them
+        self._backlogs: dict[str, asyncio.Queue[tuple[Hashable, T_Item, Callable[[], None] | None]]] = {
+            lane.name: asyncio.Queue(maxsize=lane.backlog) for lane in lanes if lane.backlog > 0
+        }
+        self._feeders: list[asyncio.Task] = []
+
+    def start(self) -> None:
+        for pool in self._pools.values():
+            pool.start()
+
+        self._feeders = [asyncio.create_task(self._feed(lane, backlog)) for lane, backlog in self._backlogs.items()]
+
+    async def submit(self, lane: str, key: Hashable, item: T_Item, on_done: Callable[[], None] | None = None) -> None:
+        backlog = self._backlogs.get(lane)
+
+        if backlog is None:
+            await self._pools[lane].submit(key, item, on_done)
+        else:
+            await backlog.put((key, item, on_done))
+
+    async def run_partitioned(
+        self,
+        items: list[tuple[str, Hashable, T_Item]],
+        lane_handler: Callable[[list[T_Item]], Awaitable[None]],
+    ) -> None:
+        async def run_lane(lane: str, partition: list[T_Item]):
+            async with self._slots.slot(lane):
+                await lane_handler(partition)
+
+        await asyncio.gather(*(
+            run_partitioned(
+                [(key, item) for item_lane, key, item in items if item_lane == lane.name],
+                partial(run_lane, lane.name),
+                lane.concurrency,
+            )
+            for lane in self.lanes.values()
+        ))
+
+    async def stop(self) -> None:
+        # an item failing on a broker outage gives up instead of holding the backlog behind it forever
+        for pool in self._pools.values():
+            pool.stop_retrying()
+
+        await asyncio.gather(*(backlog.join() for backlog in self._backlogs.values()))
+
+        for feeder in self._feeders:
+            feeder.cancel()
+
+        await asyncio.gather(*self._feeders, return_exceptions=True)
+        self._feeders = []
+
+        await asyncio.gather(*(pool.stop() for pool in self._pools.values()))
+
+    async def _feed(self, lane: str, backlog: asyncio.Queue[tuple[Hashable, T_Item, Callable[[], None] | None]]) -> None:
+        while True:
+            key, item, on_done = await backlog.get()
+
+            try:
+                await self._pools[lane].submit(key, item, on_done)
+            finally:
+                backlog.task_done()
+
+    async def _run(self, lane: str, item: T_Item) -> None:
+        async with self._slots.slot(lane):
+            await self._handler(item)
@@ -0,0 +1,98 @@
+import asyncio
+import time
+from datetime import datetime, timezone
+from typing import Awaitable, Callable
+
+import structlog
+from aiokafka import ConsumerRecord
+
+from configs.db.kafka import (
+    get_kafka_consumer, producer_manager, retry_topic, dlq_topic, retry_delay_ms,
+    CONSUMER_RETRY_TIERS
+)
+
+logger = structlog.get_logger()
+
+ATTEMPT_HEADER = "x-retry-attempt"
+NOT_BEFORE_HEADER = "x-retry-not-before"
+
+
+def get_header(record: ConsumerRecord, name: str) -> str | None:
+    for key, value in record.headers or ():
+        if key == name:
+            return value.decode("utf-8")
+
+    return None
+
+
+class RetryRouter:
+    def __init__(
+        self,
+        topic: str,
+        group_id: str,
+        process: Callable[[bytes, int], Awaitable[None]],
+        tiers: int = CONSUMER_RETRY_TIERS,
+    ):
+        self.topic = topic
+        self.group_id = group_id
+        self.tiers = tiers
+        self._process = process
+
+    async def publish_failure(self, value: bytes, error: Exception, attempt: int = 0) -> None:
+        if attempt < self.tiers:
+            await self.retry(value, error, attempt + 1)
+        else:
+            await self.dead_letter(value, error, attempt)
+
+    async def retry(self, value: bytes, error: Exception, tier: int) -> None:
+        not_before = int(time.time() * 1000) + retry_delay_ms(tier)
+
+        await producer_manager.send_and_wait(retry_topic(self.topic, tier), value, headers=[
+            *self._error_headers(error, tier),
+            (NOT_BEFORE_HEADER, str(not_before).encode("utf-8")),
+        ])
+
+        logger.warning("Event scheduled for retry", topic=self.topic, tier=tier, error=str(error))
+
+    async def dead_letter(self, value: bytes, error: Exception, attempt: int = 0) -> None:
+        await producer_manager.send_and_wait(dlq_topic(self.topic), value, headers=self._error_headers(error, attempt))
+
+        logger.error("Event sent to dead letter topic", topic=self.topic, attempts=attempt, error=str(error))
+
+    def _error_headers(self, error: Exception, attempt: int) -> list[tuple[str, bytes]]:
+        return [
+            ("x-original-topic", self.topic.encode("utf-8")),
+            (ATTEMPT_HEADER, str(attempt).encode("utf-8")),
+            ("x-error-type", type(error).__name__.encode("utf-8")),
+            ("x-error-message", str(error).encode("utf-8")),
+            ("x-failed-at", datetime.now(timezone.utc).isoformat().encode("utf-8")),
+        ]
+
+    async def run(self) -> None:
+        await asyncio.gather(*(self._consume_tier(tier) for tier in range(1, self.tiers + 1)))
+
+    async def _consume_tier(self, tier: int) -> None:
+        # every message in a tier waits the same delay, so sleeping on the head of the topic
+        # only holds back this tier and never the main partition loop
+        consumer = await get_kafka_consumer(
+            retry_topic(self.topic, tier),
+            group_id=f"{self.group_id}-retry-{tier}",
+            enable_auto_commit=False,
+        )
+
+        try:
+            async for msg in consumer:
+                not_before = int(get_header(msg, NOT_BEFORE_HEADER) or 0)
+                wait_ms = not_before - int(time.time() * 1000)
+
+                if wait_ms > 0:
+                    await asyncio.sleep(wait_ms / 1000)
+
+                try:
+                    await self._process(msg.value, tier)
+                except Exception as e:
+                    await self.dead_letter(msg.value, e, tier)
+
+                await consumer.commit()
+        finally:
+            await consumer.stop()
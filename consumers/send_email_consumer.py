@@ -1,63 +1,142 @@
+import asyncio
+from typing import Final
+
 import structlog
+from aiokafka import ConsumerRecord
 
-from configs.db.database import AsyncSessionLocal
-from configs.db.kafka import get_kafka_consumer, SEND_EMAIL_TOPIC
+from configs.db.kafka import (
+    get_kafka_consumer, SEND_EMAIL_TOPIC,
+    CONSUMER_WORKERS, CONSUMER_MAX_IN_FLIGHT, CONSUMER_BATCH_MODE
+)
+from consumers.batch_consumer import consume_batches
+from consumers.event_deduplicator import EventDeduplicator
+from consumers.keyed_worker_pool import KeyedWorkerPool, run_partitioned
+from consumers.offset_tracker import get_tracked_consumer
+from consumers.retry_router import RetryRouter
+from consumers.unit_of_work import EmailUnitOfWork
 from handlers.email_handler import EmailHandler
-from repositories.provider.user_repository_provider import UserRepositoryProvider
 from schemas.event_message_email import EventMessageEmail, TemplateEnum
-from services.provider.email_service_provider import EmailServiceProvider
-from services.provider.user_service_provider import UserServiceProvider
-from templates.template_manager import TemplateManager
 
 logger = structlog.get_logger()
 
+deduplicator: Final[EventDeduplicator] = EventDeduplicator(SEND_EMAIL_TOPIC)
+
+async def retry_email_event(value: bytes, attempt: int):
+    await handle_email_event(EventMessageEmail.model_validate_json(value), attempt)
+
+retry_router: Final[RetryRouter] = RetryRouter(SEND_EMAIL_TOPIC, "email-service", retry_email_event)
+
 async def consume_send_email():
-    consumer = await get_kafka_consumer(SEND_EMAIL_TOPIC, group_id="email-service")
+    retry_task = asyncio.create_task(retry_router.run())
+
+    try:
+        await consume_send_email_topic()
+    finally:
+        retry_task.cancel()
+        await asyncio.gather(retry_task, return_exceptions=True)
+
+async def consume_send_email_topic():
+    if CONSUMER_BATCH_MODE:
+        consumer = await get_kafka_consumer(SEND_EMAIL_TOPIC, group_id="email-service", enable_auto_commit=False)
+
+        try:
+            await consume_batches(consumer, process_email_batch)
+        finally:
+            await consumer.stop()
+
+        return
+
+    consumer, offsets = await get_tracked_consumer(SEND_EMAIL_TOPIC, group_id="email-service")
+    commit_task = asyncio.create_task(offsets.run())
+
+    pool = KeyedWorkerPool("email", handle_email_event, CONSUMER_WORKERS, CONSUMER_MAX_IN_FLIGHT)
+    pool.start()
 
     try:
         async for msg in consumer:
-            async with AsyncSessionLocal() as db:
-                repository_user = UserRepositoryProvider(db)
-                user_service = UserServiceProvider(repository_user)
+            done = offsets.track(msg)
 
-                email_service = EmailServiceProvider()
+            try:
+                event = EventMessageEmail.model_validate_json(msg.value.decode("utf-8"))
+                logger.info(f"Event received: {event.model_dump_json()}")
 
-                template_manager = TemplateManager()
+                await pool.submit(event.email, event, done)
+            except Exception as e:
+                logger.error("Failed to process event", error=str(e), message_value=msg.value.decode("utf-8"))
+                await retry_router.dead_letter(msg.value, e)
+                done()
+    finally:
+        await pool.stop()
+        commit_task.cancel()
+        await offsets.commit()
+        await consumer.stop()
+
+async def process_email_batch(records: list[ConsumerRecord]):
+    events = []
 
-                try:
-                    event = EventMessageEmail.model_validate_json(msg.value.decode("utf-8"))
-                    logger.info(f"Event received: {event.model_dump_json()}")
+    for record in records:
+        try:
+            event = EventMessageEmail.model_validate_json(record.value.decode("utf-8"))
+            events.append((event.email, event))
+        except Exception as e:
+            logger.error("Failed to process event", error=str(e), message_value=record.value.decode("utf-8"))
+            await retry_router.dead_letter(record.value, e)
 
-                    if event.template_name == TemplateEnum.welcome_email:
-                        handler = EmailHandler(event, user_service, email_service, template_manager)
-                        await handler.send_email_welcome()
+    await run_partitioned(events, process_email_lane, CONSUMER_WORKERS)
 
-                    if event.template_name == TemplateEnum.email_bye:
-                        handler = EmailHandler(event, user_service, email_service, template_manager)
-                        await handler.send_email_bye()
+async def process_email_lane(events: list[EventMessageEmail]):
+    async with EmailUnitOfWork() as uow:
+        for event in events:
+            await dispatch_email_event(uow, event)
 
-                    if event.template_name == TemplateEnum.informing_application:
-                        handler = EmailHandler(event, user_service, email_service, template_manager)
-                        await handler.send_email_informing_application()
+async def handle_email_event(event: EventMessageEmail, attempt: int = 0):
+    async with EmailUnitOfWork() as uow:
+        await dispatch_email_event(uow, event, attempt)
 
-                    if event.template_name == TemplateEnum.interview_scheduled:
-                        handler = EmailHandler(event, user_service, email_service, template_manager)
-                        await handler.send_email_interview_scheduled()
+async def dispatch_email_event(uow: EmailUnitOfWork, event: EventMessageEmail, attempt: int = 0):
+    event_id = str(event.event_id)
 
-                    if event.template_name == TemplateEnum.offer_extended:
-                        handler = EmailHandler(event, user_service, email_service, template_manager)
-                        await handler.send_email_offer_extended()
+    try:
+        if not await deduplicator.filter_new(uow.processed_event_repository, [event_id]):
+            logger.info("Duplicate event skipped", event_id=event_id)
+            return
 
-                    if event.template_name == TemplateEnum.hired_confirmation:
-                        handler = EmailHandler(event, user_service, email_service, template_manager)
-                        await handler.send_email_hired_confirmation()
+        # the claim is taken before sending, a consumer racing on the same event waits for this transaction
+        if not await deduplicator.mark(uow.processed_event_repository, [event_id]):
+            logger.info("Duplicate event skipped", event_id=event_id)
+            return
 
-                    if event.template_name == TemplateEnum.rejected_application:
-                        handler = EmailHandler(event, user_service, email_service, template_manager)
-                        await handler.send_email_rejected_application()
+        if event.template_name == TemplateEnum.welcome_email:
+            handler = EmailHandler(event, uow.user_service, uow.email_service, uow.template_manager)
+            await handler.send_email_welcome()
 
-                    await consumer.commit()
-                except Exception as e:
-                    logger.error("Failed to process event", error=str(e), message_value=msg.value.decode("utf-8"))
-    finally:
-        await consumer.stop()
+        if event.template_name == TemplateEnum.email_bye:
+            handler = EmailHandler(event, uow.user_service, uow.email_service, uow.template_manager)
+            await handler.send_email_bye()
+
+        if event.template_name == TemplateEnum.informing_application:
+            handler = EmailHandler(event, uow.user_service, uow.email_service, uow.template_manager)
+            await handler.send_email_informing_application()
+
+        if event.template_name == TemplateEnum.interview_scheduled:
+            handler = EmailHandler(event, uow.user_service, uow.email_service, uow.template_manager)
+            await handler.send_email_interview_scheduled()
+
+        if event.template_name == TemplateEnum.offer_extended:
+            handler = EmailHandler(event, uow.user_service, uow.email_service, uow.template_manager)
+            await handler.send_email_offer_extended()
+
+        if event.template_name == TemplateEnum.hired_confirmation:
+            handler = EmailHandler(event, uow.user_service, uow.email_service, uow.template_manager)
+            await handler.send_email_hired_confirmation()
+
+        if event.template_name == TemplateEnum.rejected_application:
+            handler = EmailHandler(event, uow.user_service, uow.email_service, uow.template_manager)
+            await handler.send_email_rejected_application()
+
+        await uow.commit()
+        deduplicator.remember([event_id])
+    except Exception as e:
+        await uow.rollback()
+        logger.error("Failed to process event", error=str(e), message_value=event.model_dump_json())
+        await retry_router.publish_failure(event.model_dump_json().encode("utf-8"), e, attempt)
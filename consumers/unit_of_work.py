@@ -0,0 +1,153 @@
+from functools import cached_property
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from configs.db.database import AsyncSessionLocal
+from repositories.provider.comment_post_enterprise_metric_repository_provider import \
+    CommentPostEnterpriseMetricRepositoryProvider
+from repositories.provider.comment_post_user_metric_repository_provider import CommentPostUserMetricRepositoryProvider
+from repositories.provider.enterprise_follow_user_repository_provider import EnterpriseFollowUserRepositoryProvider
+from repositories.provider.enterprise_metric_repository_provider import EnterpriseMetricRepositoryProvider
+from repositories.provider.follow_repository_provider import FollowRepositoryProvider
+from repositories.provider.notification_broadcast_repository_provider import NotificationBroadcastRepositoryProvider
+from repositories.provider.notification_enterprise_repository_provider import NotificationEnterpriseRepositoryProvider
+from repositories.provider.notification_params_repository_provider import NotificationParamsRepositoryProvider
+from repositories.provider.notification_unread_counter_repository_provider import NotificationUnreadCounterRepositoryProvider
+from repositories.provider.notify_repository_provider import NotifyRepositoryProvider
+from repositories.provider.post_enterprise_metric_repository_provider import PostEnterpriseMetricRepositoryProvider
+from repositories.provider.post_user_metric_repository_provider import PostUserMetricRepositoryProvider
+from repositories.provider.processed_event_repository_provider import ProcessedEventRepositoryProvider
+from repositories.provider.user_metric_repository_provider import UserMetricRepositoryProvider
+from repositories.provider.user_repository_provider import UserRepositoryProvider
+from repositories.provider.vacancy_metric_repository_provider import VacancyMetricRepositoryProvider
+from services.base.comment_post_enterprise_metric_service_provider import CommentPostEnterpriseMetricServiceProvider
+from services.base.comment_post_user_metric_service_provider import CommentPostUserMetricServiceProvider
+from services.provider.email_service_provider import EmailServiceProvider
+from services.provider.enterprise_follow_user_service_provider import EnterpriseFollowUserServiceProvider
+from services.provider.enterprise_metric_service_provider import EnterpriseMetricServiceProvider
+from services.provider.follow_service_provider import FollowServiceProvider
+from services.provider.notification_enterprise_service_provider import NotificationEnterpriseServiceProvider
+from services.provider.notification_service_provider import NotificationServiceProvider
+from services.provider.post_enterprise_metric_service_provider import PostEnterpriseMetricServiceProvider
+from services.provider.post_user_metric_service_provider import PostUserMetricServiceProvider
+from services.provider.user_metric_service_provider import UserMetricServiceProvider
+from services.provider.user_service_provider import UserServiceProvider
+from services.cache.follower_cache_invalidator import follower_cache_invalidator
+from services.cache.follower_id_cache import follower_id_cache
+from services.push.notification_push_hub import notification_push_hub
+from services.provider.vacancy_metric_service_provider import VacancyMetricServiceProvider
+from templates.template_manager import TemplateManager
+
+
+class UnitOfWork:
+    db: AsyncSession
+
+    async def __aenter__(self):
+        self.db = AsyncSessionLocal()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.db.close()
+
+    async def commit(self) -> None:
+        await self.db.commit()
+
+    async def rollback(self) -> None:
+        await self.db.rollback()
+
+    @cached_property
+    def processed_event_repository(self) -> ProcessedEventRepositoryProvider:
+        return ProcessedEventRepositoryProvider(self.db)
+
+
+class MetricUnitOfWork(UnitOfWork):
+    @cached_property
+    def user_metric_service(self) -> UserMetricServiceProvider:
+        return UserMetricServiceProvider(UserMetricRepositoryProvider(self.db))
+
+    @cached_property
+    def vacancy_metric_service(self) -> VacancyMetricServiceProvider:
+        return VacancyMetricServiceProvider(VacancyMetricRepositoryProvider(self.db))
+
+    @cached_property
+    def enterprise_metric_service(self) -> EnterpriseMetricServiceProvider:
+        return EnterpriseMetricServiceProvider(EnterpriseMetricRepositoryProvider(self.db))
+
+    @cached_property
+    def post_enterprise_metric_service(self) -> PostEnterpriseMetricServiceProvider:
+        return PostEnterpriseMetricServiceProvider(PostEnterpriseMetricRepositoryProvider(self.db))
+
+    @cached_property
+    def post_user_metric_service(self) -> PostUserMetricServiceProvider:
+        return PostUserMetricServiceProvider(PostUserMetricRepositoryProvider(self.db))
+
+    @cached_property
+    def comment_post_enterprise_metric_service(self) -> CommentPostEnterpriseMetricServiceProvider:
+        return CommentPostEnterpriseMetricServiceProvider(CommentPostEnterpriseMetricRepositoryProvider(self.db))
+
+    @cached_property
+    def comment_post_user_metric_service(self) -> CommentPostUserMetricServiceProvider:
+        return CommentPostUserMetricServiceProvider(CommentPostUserMetricRepositoryProvider(self.db))
+
+
+class NotificationUnitOfWork(UnitOfWork):
+    async def commit(self) -> None:
+        await super().commit()
+
+        # clients are told about notifications only once the inbox API can return them
+        for service in self._push_services:
+            await service.publish_pending()
+
+    async def rollback(self) -> None:
+        await super().rollback()
+
+        for service in self._push_services:
+            service.discard_pending()
+
+    @property
+    def _push_services(self) -> list:
+        return [self.__dict__[name] for name in ("notification_service", "notification_enterprise_service") if name in self.__dict__]
+
+    @cached_property
+    def notification_service(self) -> NotificationServiceProvider:
+        return NotificationServiceProvider(
+            NotifyRepositoryProvider(self.db),
+            NotificationBroadcastRepositoryProvider(self.db),
+            self.notification_unread_counter_repository,
+            NotificationParamsRepositoryProvider(self.db),
+            notification_push_hub,
+        )
+
+    @cached_property
+    def notification_enterprise_service(self) -> NotificationEnterpriseServiceProvider:
+        return NotificationEnterpriseServiceProvider(
+            NotificationEnterpriseRepositoryProvider(self.db),
+            self.notification_unread_counter_repository,
+            notification_push_hub,
+        )
+
+    @cached_property
+    def notification_unread_counter_repository(self) -> NotificationUnreadCounterRepositoryProvider:
+        return NotificationUnreadCounterRepositoryProvider(self.db)
+
+    @cached_property
+    def follow_service(self) -> FollowServiceProvider:
+        return FollowServiceProvider(FollowRepositoryProvider(self.db), follower_id_cache, follower_cache_invalidator)
+
+    @cached_property
+    def enterprise_follow_user_service(self) -> EnterpriseFollowUserServiceProvider:
+        return EnterpriseFollowUserServiceProvider(EnterpriseFollowUserRepositoryProvider(self.db), follower_id_cache)
+
+
+class EmailUnitOfWork(UnitOfWork):
+    @cached_property
+    def user_service(self) -> UserServiceProvider:
+        return UserServiceProvider(UserRepositoryProvider(self.db))
+
+    @cached_property
+    def email_service(self) -> EmailServiceProvider:
+        return EmailServiceProvider()
+
+    @cached_property
+    def template_manager(self) -> TemplateManager:
+        return TemplateManager()
@@ -1,3 +1,4 @@
+import asyncio
 import datetime
 
 import structlog
@@ -46,7 +47,8 @@ class EmailHandler:
             template_context
         )
 
-        self.email_service.send_email(
+        await asyncio.to_thread(
+            self.email_service.send_email,
             to_email=self.event.email,
             subject=self.event.subject,
             html_content=html_content
@@ -68,7 +70,8 @@ class EmailHandler:
             template_context
         )
 
-        self.email_service.send_email(
+        await asyncio.to_thread(
+            self.email_service.send_email,
             to_email=self.event.email,
             subject=self.event.subject,
             html_content=html_content
@@ -91,7 +94,8 @@ class EmailHandler:
             template_context
         )
 
-        self.email_service.send_email(
+        await asyncio.to_thread(
+            self.email_service.send_email,
             to_email=self.event.email,
             subject=self.event.subject,
             html_content=html_content
@@ -114,7 +118,8 @@ class EmailHandler:
             template_context
         )
 
-        self.email_service.send_email(
+        await asyncio.to_thread(
+            self.email_service.send_email,
             to_email=self.event.email,
             subject=self.event.subject,
             html_content=html_content
@@ -136,7 +141,8 @@ class EmailHandler:
             template_context
         )
 
-        self.email_service.send_email(
+        await asyncio.to_thread(
+            self.email_service.send_email,
             to_email=self.event.email,
             subject=self.event.subject,
             html_content=html_content
@@ -157,7 +163,8 @@ class EmailHandler:
             template_context
         )
 
-        self.email_service.send_email(
+        await asyncio.to_thread(
+            self.email_service.send_email,
             to_email=self.event.email,
             subject=self.event.subject,
             html_content=html_content
@@ -181,7 +188,8 @@ class EmailHandler:
             template_context
         )
 
-        self.email_service.send_email(
+        await asyncio.to_thread(
+            self.email_service.send_email,
             to_email=user.email,
             subject=self.event.subject,
             html_content=html_content
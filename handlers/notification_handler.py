@@ -1,5 +1,10 @@
-from configs.db.database import FollowerRelationshipEntity, EnterpriseFollowsUserEntity
+from configs.notification.notification_config import (
+    FANOUT_MODE, FANOUT_BROADCAST_THRESHOLD, FANOUT_JOB_THRESHOLD, FANOUT_JOB_CHUNK_SIZE
+)
+from consumers.fanout_jobs import FanoutJobPublisher
 from schemas.event_notification import EventNotification
+from schemas.fanout_chunk import FanoutChunk, FanoutAudienceEnum
+from services.limit.fanout_rate_limiter import FanoutRateLimiter
 from services.provider.enterprise_follow_user_service_provider import EnterpriseFollowUserServiceProvider
 from services.provider.follow_service_provider import FollowServiceProvider
 from services.provider.notification_enterprise_service_provider import NotificationEnterpriseServiceProvider
@@ -13,53 +18,177 @@ class NotificationHandler:
                  notification_service: NotificationServiceProvider,
                  notification_enterprise_service: NotificationEnterpriseServiceProvider,
                  enterprise_follow_service: EnterpriseFollowUserServiceProvider,
+                 fanout_publisher: FanoutJobPublisher | None = None,
+                 fanout_limiter: FanoutRateLimiter | None = None,
+                 attempt: int = 0,
                  ):
         self.enterprise_follow_service = enterprise_follow_service
+        self.fanout_publisher = fanout_publisher
+        self.fanout_limiter = fanout_limiter
+        self.attempt = attempt
         self.event = event
         self.follow_service = follow_service
         self.notification_service = notification_service
         self.notification_enterprise_service = notification_enterprise_service
 
     async def notify_about_new_follow(self):
+        await self.follow_service.invalidate_follower_ids(self.event.entity_id)
         await self.notification_service.notify_about_new_follow(event=self.event)
 
     async def notify_user_about_new_post(self):
-        follows: list[FollowerRelationshipEntity] = await self.follow_service.get_all(
-            followed_id=self.event.actor_id,
-            receive_post=True
-        )
-
-        await self.notification_service.notify_users_by_event_follow(follows, event=self.event)
+        await self._notify_followers(receive_post=True)
 
     async def notify_user_about_new_comment(self):
-        follows: list[FollowerRelationshipEntity] = await self.follow_service.get_all(
+        await self._notify_followers(receive_comment=True)
+
+    async def notify_about_new_post_enterprise(self):
+        await self._notify_enterprise_followers(receive_post=True)
+
+    async def notify_about_new_vacancy(self):
+        await self._notify_enterprise_followers(receive_vacancy=True)
+
+    async def _notify_followers(self, receive_post: bool | None = None, receive_comment: bool | None = None):
+        if self._count_followers:
+            followers = await self.follow_service.count_follower_ids(
+                followed_id=self.event.actor_id,
+                receive_post=receive_post,
+                receive_comment=receive_comment,
+                limit=self._count_limit
+            )
+
+            if 0 < FANOUT_BROADCAST_THRESHOLD < followers or not self._within_budget(False, followers):
+                await self.notification_service.broadcast_to_followers(self.event)
+                return
+
+            if self._jobs_enabled and followers > FANOUT_JOB_THRESHOLD:
+                boundaries = await self.follow_service.follower_id_boundaries(
+                    followed_id=self.event.actor_id,
+                    chunk_size=FANOUT_JOB_CHUNK_SIZE,
+                    receive_post=receive_post,
+                    receive_comment=receive_comment
+                )
+
+                await self._publish_fanout_job(
+                    FanoutAudienceEnum.FOLLOWERS, boundaries,
+                    receive_post=receive_post, receive_comment=receive_comment
+                )
+                return
+
+        if FANOUT_MODE == "insert_select":
+            recipients = self.follow_service.follower_ids_select(
+                followed_id=self.event.actor_id,
+                receive_post=receive_post,
+                receive_comment=receive_comment
+            )
+
+            await self.notification_service.notify_followers_from_select(recipients, event=self.event)
+            return
+
+        follower_ids = self.follow_service.stream_follower_ids(
             followed_id=self.event.actor_id,
-            receive_comment=True
+            receive_post=receive_post,
+            receive_comment=receive_comment
         )
 
-        await self.notification_service.notify_users_by_event_follow(follows, event=self.event)
+        await self.notification_service.notify_followers_by_event(follower_ids, event=self.event)
 
-    async def notify_about_new_post_enterprise(self):
-        follows: list[EnterpriseFollowsUserEntity] = await self.enterprise_follow_service.get_all(
+    async def _notify_enterprise_followers(self, receive_post: bool | None = None, receive_vacancy: bool | None = None):
+        if self._count_followers:
+            followers = await self.enterprise_follow_service.count_user_ids(
+                enterprise_id=self.event.actor_id,
+                receive_post=receive_post,
+                receive_vacancy=receive_vacancy,
+                limit=self._count_limit
+            )
+
+            if 0 < FANOUT_BROADCAST_THRESHOLD < followers or not self._within_budget(True, followers):
+                await self.notification_service.broadcast_to_followers_enterprise(self.event)
+                return
+
+            if self._jobs_enabled and followers > FANOUT_JOB_THRESHOLD:
+                boundaries = await self.enterprise_follow_service.user_id_boundaries(
+                    enterprise_id=self.event.actor_id,
+                    chunk_size=FANOUT_JOB_CHUNK_SIZE,
+                    receive_post=receive_post,
+                    receive_vacancy=receive_vacancy
+                )
+
+                await self._publish_fanout_job(
+                    FanoutAudienceEnum.ENTERPRISE_FOLLOWERS, boundaries,
+                    receive_post=receive_post, receive_vacancy=receive_vacancy
+                )
+                return
+
+        if FANOUT_MODE == "insert_select":
+            recipients = self.enterprise_follow_service.user_ids_select(
+                enterprise_id=self.event.actor_id,
+                receive_post=receive_post,
+                receive_vacancy=receive_vacancy
+            )
+
+            await self.notification_service.notify_followers_from_select_enterprise(recipients, self.event)
+            return
+
+        user_ids = self.enterprise_follow_service.stream_user_ids(
             enterprise_id=self.event.actor_id,
-            receive_post=True,
-            user_id=None,
-            receive_comment=None,
-            receive_vacancy = None
+            receive_post=receive_post,
+            receive_vacancy=receive_vacancy
         )
 
-        await self.notification_service.notify_users_by_event_follow_by_enterprise(follows, self.event)
+        await self.notification_service.notify_followers_by_event_enterprise(user_ids, self.event)
 
-    async def notify_about_new_vacancy(self):
-        follows: list[EnterpriseFollowsUserEntity] = await self.enterprise_follow_service.get_all(
-            enterprise_id=self.event.actor_id,
-            receive_post=None,
-            user_id=None,
-            receive_comment=None,
-            receive_vacancy = True
+    @property
+    def _jobs_enabled(self) -> bool:
+        return self.fanout_publisher is not None and FANOUT_JOB_THRESHOLD > 0
+
+    @property
+    def _budget_enabled(self) -> bool:
+        return self.fanout_limiter is not None and self.fanout_limiter.enabled
+
+    @property
+    def _count_followers(self) -> bool:
+        return FANOUT_BROADCAST_THRESHOLD > 0 or self._jobs_enabled or self._budget_enabled
+
+    @property
+    def _count_limit(self) -> int:
+        budget = self.fanout_limiter.capacity if self._budget_enabled else 0
+
+        return max(FANOUT_BROADCAST_THRESHOLD, FANOUT_JOB_THRESHOLD, budget) + 1
+
+    def _within_budget(self, is_enterprise: bool, rows: int) -> bool:
+        # an actor over its budget still reaches its followers, through one broadcast row instead of a fan-out
+        if not self._budget_enabled:
+            return True
+
+        # the first attempt already paid for this event, a retry is not charged again
+        if self.attempt > 0:
+            return True
+
+        return self.fanout_limiter.try_consume((is_enterprise, self.event.actor_id), rows)
+
+    async def _publish_fanout_job(self, audience: FanoutAudienceEnum, boundaries: list[int], **preferences):
+        # chunk ranges are [boundaries[i], boundaries[i + 1]), the job id is the event id so a
+        # redelivered event republishes the same chunks and completed ones are skipped
+        params_id = await self.fanout_publisher.store_params(
+            self.event, audience == FanoutAudienceEnum.ENTERPRISE_FOLLOWERS
         )
 
-        await self.notification_service.notify_users_by_event_follow_by_enterprise(follows, self.event)
+        chunks = [
+            FanoutChunk(
+                job_id=str(self.event.event_id),
+                chunk_index=index,
+                chunks=len(boundaries),
+                audience=audience,
+                start_id=start_id,
+                end_id=boundaries[index + 1] if index + 1 < len(boundaries) else None,
+                event=self.event,
+                params_id=params_id,
+                **preferences
+            )
+            for index, start_id in enumerate(boundaries)
+        ]
+
+        await self.fanout_publisher.publish(chunks)
 
     async def notify_enterprise_about_new_review(self):
         await self.notification_enterprise_service.create_notify(self.event)
@@ -11,5 +11,4 @@ class PostEnterpriseMetricHandler:
         self.service = service
 
     async def handle(self):
-        metric = await self.service.get_by_id(self.event.metric_id)
-        await self.service.save_metric(metric, self.event)
\ No newline at end of file
+        await self.service.update_metric(self.event)
\ No newline at end of file
@@ -12,5 +12,4 @@ class UserMetricHandler:
 
     async def handle(self):
 
-        metric = await self.service.get_by_id(self.event.metric_id)
-        await self.service.save_metric(metric, self.event)
+        await self.service.update_metric(self.event)
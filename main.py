@@ -1,20 +1,144 @@
 #  uvicorn main:app --host 0.0.0.0 --port 8001 --reload
 
 import asyncio
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 import uvicorn
 
+from configs.db.database import engine
+from configs.db.kafka import producer_manager
+from configs.notification.notification_config import PUSH_KEEPALIVE_SECONDS
+from consumers.event_deduplicator import purge_processed_events
+from consumers.fanout_jobs import consume_fanout_jobs
 from consumers.metric_consumer import consume_metric_events
-from consumers.notification_consumer import consumer_notification
+from consumers.notification_consumer import consumer_notification, validate_lanes
 from consumers.send_email_consumer import consume_send_email
+from consumers.unit_of_work import NotificationUnitOfWork
+from schemas.notification_page import NotificationCursor, NotificationPage
+from schemas.notification_unread import NotificationUnreadCount, NotificationReadRequest, NotificationReadResult
+from services.cache.follower_cache_invalidator import follower_cache_invalidator
+from services.cache.follower_id_cache import follower_id_cache
+from services.limit.fanout_rate_limiter import fanout_rate_limiter
+from services.push.notification_push_hub import notification_push_hub
 
 app = FastAPI(title="Metric Consumer Microservice")
 
+background_tasks: list[asyncio.Task] = []
+
 @app.on_event("startup")
 async def startup_event():
-    asyncio.create_task(consume_metric_events())
-    asyncio.create_task(consume_send_email())
-    asyncio.create_task(consumer_notification())
+    validate_lanes()
+
+    await producer_manager.start()
+
+    background_tasks.extend([
+        asyncio.create_task(consume_metric_events()),
+        asyncio.create_task(consume_send_email()),
+        asyncio.create_task(consumer_notification()),
+        asyncio.create_task(consume_fanout_jobs()),
+        asyncio.create_task(purge_processed_events()),
+        asyncio.create_task(follower_cache_invalidator.run()),
+    ])
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    # the consumers flush, commit offsets and dead-letter in their finally blocks, which need the producer and the engine
+    for task in background_tasks:
+        task.cancel()
+
+    await asyncio.gather(*background_tasks, return_exceptions=True)
+    background_tasks.clear()
+
+    await producer_manager.stop()
+    await engine.dispose()
+
+@app.get("/metrics/follower-cache")
+async def follower_cache_stats():
+    return follower_id_cache.stats()
+
+@app.get("/metrics/fanout-budget")
+async def fanout_budget_stats():
+    return fanout_rate_limiter.stats()
+
+@app.get("/metrics/notification-push")
+async def notification_push_stats():
+    return notification_push_hub.stats()
+
+async def push_events(request: Request, owner_id: int, is_enterprise: bool = False):
+    # subscribing inside the body ties the subscription to the lifetime of the stream
+    subscription = notification_push_hub.subscribe(owner_id, is_enterprise)
+
+    try:
+        while not await request.is_disconnected():
+            message = await subscription.next(PUSH_KEEPALIVE_SECONDS)
+
+            if message is None:
+                yield ": keepalive\n\n"
+                continue
+
+            yield f"event: {message.event.value}\ndata: {message.model_dump_json()}\n\n"
+    finally:
+        notification_push_hub.unsubscribe(subscription)
+
+@app.get("/users/{user_id}/notifications/stream")
+async def user_notification_stream(user_id: int, request: Request):
+    return StreamingResponse(push_events(request, user_id), media_type="text/event-stream")
+
+@app.get("/enterprises/{enterprise_id}/notifications/stream")
+async def enterprise_notification_stream(enterprise_id: int, request: Request):
+    return StreamingResponse(push_events(request, enterprise_id, is_enterprise=True), media_type="text/event-stream")
+
+def decode_cursor(cursor: str | None) -> NotificationCursor | None:
+    if cursor is None:
+        return None
+
+    try:
+        return NotificationCursor.decode(cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def orjson_response(model: NotificationPage) -> Response:
+    return Response(content=model.model_dump_json(), media_type="application/json")
+
+@app.get("/users/{user_id}/notifications", response_model=NotificationPage)
+async def user_notifications(user_id: int, limit: int = Query(20, ge=1, le=100), cursor: str | None = None):
+    async with NotificationUnitOfWork() as uow:
+        page = await uow.notification_service.get_feed(user_id, limit, decode_cursor(cursor))
+
+    return orjson_response(page)
+
+@app.get("/enterprises/{enterprise_id}/notifications", response_model=NotificationPage)
+async def enterprise_notifications(enterprise_id: int, limit: int = Query(20, ge=1, le=100), cursor: str | None = None):
+    async with NotificationUnitOfWork() as uow:
+        page = await uow.notification_enterprise_service.get_page(enterprise_id, limit, decode_cursor(cursor))
+
+    return orjson_response(page)
+
+@app.get("/users/{user_id}/notifications/unread-count", response_model=NotificationUnreadCount)
+async def user_unread_count(user_id: int):
+    async with NotificationUnitOfWork() as uow:
+        return NotificationUnreadCount(unread=await uow.notification_service.get_unread_count(user_id))
+
+@app.get("/enterprises/{enterprise_id}/notifications/unread-count", response_model=NotificationUnreadCount)
+async def enterprise_unread_count(enterprise_id: int):
+    async with NotificationUnitOfWork() as uow:
+        return NotificationUnreadCount(unread=await uow.notification_enterprise_service.get_unread_count(enterprise_id))
+
+@app.post("/users/{user_id}/notifications/read", response_model=NotificationReadResult)
+async def user_mark_read(user_id: int, request: NotificationReadRequest):
+    async with NotificationUnitOfWork() as uow:
+        read = await uow.notification_service.mark_read(user_id, request.ids, request.broadcast_id)
+        await uow.commit()
+
+    return NotificationReadResult(read=read)
+
+@app.post("/enterprises/{enterprise_id}/notifications/read", response_model=NotificationReadResult)
+async def enterprise_mark_read(enterprise_id: int, request: NotificationReadRequest):
+    async with NotificationUnitOfWork() as uow:
+        read = await uow.notification_enterprise_service.mark_read(enterprise_id, request.ids)
+        await uow.commit()
+
+    return NotificationReadResult(read=read)
 
 if __name__ == "__main__":
     uvicorn.run("main:app", host="0.0.0.0", port=8001, reload=True)
@@ -0,0 +1,59 @@
+import asyncio
+from typing import Final
+
+from alembic import context
+from sqlalchemy.engine import Connection
+
+from configs.db.database import Base, DATABASE_URL, engine
+
+# the database is shared with the main application, which owns most of the tables,
+# so this service keeps its own version table and only autogenerates the tables it owns
+VERSION_TABLE: Final[str] = "alembic_version_notification"
+
+SERVICE_TABLES: Final[frozenset[str]] = frozenset({
+    "processed_events",
+    "notification_broadcast",
+    "notification_read_cursor",
+    "notification_unread_counter",
+    "notification_params",
+})
+
+target_metadata = Base.metadata
+
+def include_object(obj, name, type_, reflected, compare_to) -> bool:
+    if type_ == "table":
+        return name in SERVICE_TABLES
+
+    return True
+
+def configure(**kwargs) -> None:
+    context.configure(
+        target_metadata=target_metadata,
+        version_table=VERSION_TABLE,
+        include_object=include_object,
+        compare_type=True,
+        **kwargs,
+    )
+
+def run_migrations_offline() -> None:
+    configure(url=DATABASE_URL, literal_binds=True, dialect_opts={"paramstyle": "named"})
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+def do_run_migrations(connection: Connection) -> None:
+    configure(connection=connection)
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+async def run_migrations_online() -> None:
+    async with engine.connect() as connection:
+        await connection.run_sync(do_run_migrations)
+
+    await engine.dispose()
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    asyncio.run(run_migrations_online())
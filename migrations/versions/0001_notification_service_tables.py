@@ -0,0 +1,92 @@
+"""notification service tables
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 10:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision: str = "0001"
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# owned by the main application's schema
+type_enum = postgresql.ENUM(name="type_enum", create_type=False)
+
+
+def upgrade() -> None:
+    op.create_table(
+        "processed_events",
+        sa.Column("topic", sa.String(length=100), nullable=False),
+        sa.Column("event_id", sa.String(length=64), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint("topic", "event_id"),
+    )
+    op.create_index("ix_processed_events_created_at", "processed_events", ["created_at"])
+
+    op.create_table(
+        "notification_broadcast",
+        sa.Column("id", sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column("actor_id", sa.BigInteger(), nullable=False),
+        sa.Column("is_enterprise", sa.Boolean(), nullable=False),
+        sa.Column("title", sa.String(length=200), nullable=False),
+        sa.Column("content", sa.Text(), nullable=False),
+        sa.Column("link", sa.Text(), nullable=True),
+        sa.Column("type", type_enum, nullable=False),
+        sa.Column("entity_id", sa.Integer(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_notification_broadcast_actor_created",
+        "notification_broadcast",
+        ["is_enterprise", "actor_id", "created_at"],
+    )
+
+    op.create_table(
+        "notification_read_cursor",
+        sa.Column("user_id", sa.BigInteger(), nullable=False),
+        sa.Column("last_read_broadcast_id", sa.BigInteger(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("user_id"),
+    )
+
+    op.add_column("notification_user", sa.Column("event_id", sa.String(length=64), nullable=True))
+
+    # notification_user is large and written by the main application, so build the index without locking writes
+    # and attach it as the constraint afterwards
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "uq_notification_user_event_user",
+            "notification_user",
+            ["event_id", "user_id"],
+            unique=True,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+    op.execute(
+        "ALTER TABLE notification_user ADD CONSTRAINT uq_notification_user_event_user "
+        "UNIQUE USING INDEX uq_notification_user_event_user"
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint("uq_notification_user_event_user", "notification_user", type_="unique")
+    op.drop_column("notification_user", "event_id")
+
+    op.drop_table("notification_read_cursor")
+
+    op.drop_index("ix_notification_broadcast_actor_created", table_name="notification_broadcast")
+    op.drop_table("notification_broadcast")
+
+    op.drop_index("ix_processed_events_created_at", table_name="processed_events")
+    op.drop_table("processed_events")
@@ -0,0 +1,71 @@
+"""fan-out and inbox indexes
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 10:30:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0002"
+down_revision: Union[str, Sequence[str], None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (name, table, columns, partial predicate)
+INDEXES = [
+    (
+        "ix_follower_relationships_followed_post",
+        "follower_relationships",
+        ["followed_id", "follower_id"],
+        "receive_post",
+    ),
+    (
+        "ix_follower_relationships_followed_comment",
+        "follower_relationships",
+        ["followed_id", "follower_id"],
+        "receive_comment",
+    ),
+    (
+        "ix_enterprise_follows_user_enterprise_post",
+        "enterprise_follows_user",
+        ["enterprise_id", "user_id"],
+        "receive_post",
+    ),
+    (
+        "ix_enterprise_follows_user_enterprise_vacancy",
+        "enterprise_follows_user",
+        ["enterprise_id", "user_id"],
+        "receive_vacancy",
+    ),
+    (
+        "ix_notification_user_user_view_created",
+        "notification_user",
+        ["user_id", "is_view", "created_at"],
+        None,
+    ),
+]
+
+
+def upgrade() -> None:
+    # the follow tables are large and written by the main application, so build without locking writes
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                postgresql_where=sa.text(where) if where else None,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,45 @@
+"""notification unread counter
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 12:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0003"
+down_revision: Union[str, Sequence[str], None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "notification_unread_counter",
+        sa.Column("is_enterprise", sa.Boolean(), nullable=False),
+        sa.Column("owner_id", sa.BigInteger(), nullable=False),
+        sa.Column("unread", sa.BigInteger(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint("is_enterprise", "owner_id"),
+    )
+
+    op.execute(
+        """
+        INSERT INTO notification_unread_counter (is_enterprise, owner_id, unread)
+        SELECT false, user_id, count(*) FROM notification_user WHERE NOT is_view GROUP BY user_id
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO notification_unread_counter (is_enterprise, owner_id, unread)
+        SELECT true, enterprise_id, count(*) FROM notification_enterprise_user WHERE NOT is_view GROUP BY enterprise_id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("notification_unread_counter")
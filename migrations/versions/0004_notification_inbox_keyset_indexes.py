@@ -0,0 +1,38 @@
+"""notification inbox keyset indexes
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 14:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "0004"
+down_revision: Union[str, Sequence[str], None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (name, table, columns)
+INDEXES = [
+    ("ix_notification_user_user_created_id", "notification_user", ["user_id", "created_at", "id"]),
+    (
+        "ix_notification_enterprise_user_enterprise_created_id",
+        "notification_enterprise_user",
+        ["enterprise_id", "created_at", "id"],
+    ),
+]
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
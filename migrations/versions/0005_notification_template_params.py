@@ -0,0 +1,131 @@
+"""notification template params
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 16:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision: str = "0005"
+down_revision: Union[str, Sequence[str], None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# frozen copy of the templates as of this revision, the downgrade must not change when the live ones do
+NOTIFICATION_TEMPLATES = {
+    "user_new_comment": (
+        "The user {user_name} created a new comment!",
+        "The user you follow, {user_name}, just created a new comment!",
+    ),
+    "user_new_comments": (
+        "The user {user_name} created {count} new comments!",
+        "The user you follow, {user_name}, just created {count} new comments!",
+    ),
+    "user_new_post": (
+        "The user {user_name} created a new post!",
+        "The user you follow, {user_name}, just created a new post!",
+    ),
+    "user_new_posts": (
+        "The user {user_name} created {count} new posts!",
+        "The user you follow, {user_name}, just created {count} new posts!",
+    ),
+    "enterprise_new_post": (
+        "The enterprise {actor_name} created a new post!",
+        "The enterprise you follow, {actor_name}, just created a new post!",
+    ),
+    "enterprise_new_posts": (
+        "The enterprise {actor_name} created {count} new posts!",
+        "The enterprise you follow, {actor_name}, just created {count} new posts!",
+    ),
+    "enterprise_new_vacancy": (
+        "The enterprise {actor_name} created a new vacancy!",
+        "The enterprise you follow, {actor_name}, just created a new vacancy!",
+    ),
+    "enterprise_new_vacancies": (
+        "The enterprise {actor_name} created {count} new vacancies!",
+        "The enterprise you follow, {actor_name}, just created {count} new vacancies!",
+    ),
+}
+
+notification_user = sa.table(
+    "notification_user",
+    sa.column("title", sa.String()),
+    sa.column("content", sa.Text()),
+    sa.column("template", sa.String()),
+    sa.column("params_id", sa.BigInteger()),
+)
+notification_params = sa.table(
+    "notification_params",
+    sa.column("id", sa.BigInteger()),
+    sa.column("params", postgresql.JSONB()),
+)
+
+
+def render_sql(text: str) -> sa.ColumnElement:
+    rendered = sa.literal(text, sa.Text())
+
+    for key in ("user_name", "actor_name", "count"):
+        value = sa.func.coalesce(notification_params.c.params[key].astext, "None")
+        rendered = sa.func.replace(rendered, "{%s}" % key, value)
+
+    return rendered
+
+
+def upgrade() -> None:
+    op.create_table(
+        "notification_params",
+        sa.Column("id", sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column("event_id", sa.String(length=64), nullable=False),
+        sa.Column("params", postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("event_id"),
+    )
+
+    # nullable columns without a default and dropping NOT NULL only touch the catalog
+    op.add_column("notification_user", sa.Column("template", sa.String(length=32), nullable=True))
+    op.add_column("notification_user", sa.Column("params_id", sa.BigInteger(), nullable=True))
+    op.alter_column("notification_user", "title", existing_type=sa.String(length=200), nullable=True)
+    op.alter_column("notification_user", "content", existing_type=sa.Text(), nullable=True)
+
+    op.create_foreign_key(
+        "notification_user_params_id_fkey",
+        "notification_user",
+        "notification_params",
+        ["params_id"],
+        ["id"],
+        postgresql_not_valid=True,
+    )
+
+    # validating after the DDL commits scans notification_user under a lock that lets writes through
+    with op.get_context().autocommit_block():
+        op.execute("ALTER TABLE notification_user VALIDATE CONSTRAINT notification_user_params_id_fkey")
+
+
+def downgrade() -> None:
+    # template rows are rendered back into plain text before the columns go away
+    for template, (title, content) in NOTIFICATION_TEMPLATES.items():
+        op.execute(
+            notification_user.update()
+            .where(
+                notification_user.c.template == template,
+                notification_user.c.params_id == notification_params.c.id,
+            )
+            .values(title=render_sql(title), content=render_sql(content))
+        )
+
+    op.execute(notification_user.update().where(notification_user.c.title.is_(None)).values(title="", content=""))
+
+    op.drop_constraint("notification_user_params_id_fkey", "notification_user", type_="foreignkey")
+    op.alter_column("notification_user", "content", existing_type=sa.Text(), nullable=False)
+    op.alter_column("notification_user", "title", existing_type=sa.String(length=200), nullable=False)
+    op.drop_column("notification_user", "params_id")
+    op.drop_column("notification_user", "template")
+
+    op.drop_table("notification_params")
@@ -9,10 +9,6 @@ class EnterpriseMetricRepositoryBase(ABC):
     async def save(self, metric: EnterpriseMetricEntity) -> EnterpriseMetricEntity:
         pass
 
-    @abstractmethod
-    async def update_metric_value(self, enterprise_id: int, column_name: str, action: str) -> None:
-        pass
-
     @abstractmethod
     async def get_by_id(self, enterprise_id: int) -> EnterpriseMetricEntity:
         pass
\ No newline at end of file
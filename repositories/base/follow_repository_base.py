@@ -1,6 +1,10 @@
 from abc import ABC, abstractmethod
+from typing import AsyncIterator
+
+from sqlalchemy import Select
 
 from configs.db.database import FollowerRelationshipEntity
+from configs.notification.notification_config import FANOUT_CHUNK_SIZE
 
 
 class FollowRepositoryBase(ABC):
@@ -12,4 +16,41 @@ class FollowRepositoryBase(ABC):
         receive_post: bool | None = None,
         receive_comment: bool | None = None,
     ) -> list[FollowerRelationshipEntity]:
-        pass
\ No newline at end of file
+        pass
+
+    @abstractmethod
+    def follower_ids_select(self,
+        followed_id: int,
+        receive_post: bool | None = None,
+        receive_comment: bool | None = None,
+        start_id: int | None = None,
+        end_id: int | None = None,
+    ) -> Select:
+        pass
+
+    @abstractmethod
+    async def follower_id_boundaries(self,
+        followed_id: int,
+        chunk_size: int,
+        receive_post: bool | None = None,
+        receive_comment: bool | None = None,
+    ) -> list[int]:
+        pass
+
+    @abstractmethod
+    async def count_follower_ids(self,
+        followed_id: int,
+        receive_post: bool | None = None,
+        receive_comment: bool | None = None,
+        limit: int | None = None,
+    ) -> int:
+        pass
+
+    @abstractmethod
+    def stream_follower_ids(self,
+        followed_id: int,
+        receive_post: bool | None = None,
+        receive_comment: bool | None = None,
+        chunk_size: int = FANOUT_CHUNK_SIZE,
+    ) -> AsyncIterator[list[int]]:
+        pass
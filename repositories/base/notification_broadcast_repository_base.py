@@ -0,0 +1,39 @@
+from abc import ABC, abstractmethod
+from datetime import datetime
+
+from sqlalchemy import RowMapping
+
+from configs.db.database import NotificationBroadcastEntity
+
+
+class NotificationBroadcastRepositoryBase(ABC):
+
+    @abstractmethod
+    async def add(self, broadcast: NotificationBroadcastEntity) -> NotificationBroadcastEntity:
+        pass
+
+    @abstractmethod
+    async def get_feed(self,
+                       user_id: int,
+                       limit: int,
+                       before_created_at: datetime | None = None,
+                       before_id: int | None = None,
+                       before_broadcast: bool = False,
+                       ) -> list[RowMapping]:
+        pass
+
+    @abstractmethod
+    async def count_unread(self, user_id: int, limit: int) -> int:
+        pass
+
+    @abstractmethod
+    async def latest_id(self, user_id: int) -> int | None:
+        pass
+
+    @abstractmethod
+    async def audience_among(self, broadcast: NotificationBroadcastEntity, user_ids: list[int]) -> list[int]:
+        pass
+
+    @abstractmethod
+    async def mark_read(self, user_id: int, broadcast_id: int) -> None:
+        pass
@@ -1,7 +1,24 @@
 from abc import ABC, abstractmethod
+from datetime import datetime
 
-from configs.db.database import NotificationEntity
+from configs.db.database import NotificationEntity, NotificationEnterpriseEntity
 
 
 class NotificationEnterpriseRepositoryBase(ABC):
-    pass
\ No newline at end of file
+
+    @abstractmethod
+    async def stage(self, notify: NotificationEnterpriseEntity) -> NotificationEnterpriseEntity:
+        pass
+
+    @abstractmethod
+    async def get_page(self,
+                       enterprise_id: int,
+                       limit: int,
+                       before_created_at: datetime | None = None,
+                       before_id: int | None = None,
+                       ) -> list[NotificationEnterpriseEntity]:
+        pass
+
+    @abstractmethod
+    async def mark_read(self, enterprise_id: int, ids: list[int] | None = None) -> int:
+        pass
@@ -0,0 +1,8 @@
+from abc import ABC, abstractmethod
+
+
+class NotificationParamsRepositoryBase(ABC):
+
+    @abstractmethod
+    async def get_or_create(self, event_id: str, params: dict) -> int:
+        pass
@@ -0,0 +1,16 @@
+from abc import ABC, abstractmethod
+
+
+class NotificationUnreadCounterRepositoryBase(ABC):
+
+    @abstractmethod
+    async def increment(self, owner_ids: list[int], is_enterprise: bool = False) -> None:
+        pass
+
+    @abstractmethod
+    async def decrement(self, owner_id: int, count: int, is_enterprise: bool = False) -> None:
+        pass
+
+    @abstractmethod
+    async def get_unread(self, owner_id: int, is_enterprise: bool = False) -> int:
+        pass
@@ -1,6 +1,10 @@
 from abc import ABC, abstractmethod
+from typing import Iterable
+
+from sqlalchemy import Select
 
 from configs.db.database import NotificationEntity
+from configs.db.enums import NotificationTypeEnum
 
 
 class NotifyRepositoryBase(ABC):
@@ -10,11 +14,32 @@ class NotifyRepositoryBase(ABC):
         pass
 
     @abstractmethod
-    async def add_all(self, noti: list[NotificationEntity]):
+    async def add(self, noti: NotificationEntity) -> NotificationEntity:
         pass
 
     @abstractmethod
-    async def add(self, noti: NotificationEntity) -> NotificationEntity:
+    async def insert_many(self, rows: list[dict]) -> list[int]:
+        pass
+
+    @abstractmethod
+    async def copy_many(self, rows: Iterable[dict]) -> list[int]:
+        pass
+
+    @abstractmethod
+    async def insert_from_select(self,
+                                 recipients: Select,
+                                 title: str | None,
+                                 content: str | None,
+                                 type: NotificationTypeEnum,
+                                 entity_id: int | None,
+                                 event_id: str | None = None,
+                                 template: str | None = None,
+                                 params_id: int | None = None,
+                                 ) -> list[int]:
+        pass
+
+    @abstractmethod
+    async def mark_read(self, user_id: int, ids: list[int] | None = None) -> int:
         pass
 
     @abstractmethod
@@ -0,0 +1,17 @@
+from abc import ABC, abstractmethod
+from datetime import datetime
+
+
+class ProcessedEventRepositoryBase(ABC):
+
+    @abstractmethod
+    async def get_processed_ids(self, topic: str, event_ids: list[str]) -> set[str]:
+        pass
+
+    @abstractmethod
+    async def mark_processed(self, topic: str, event_ids: list[str]) -> list[str]:
+        pass
+
+    @abstractmethod
+    async def delete_older_than(self, cutoff: datetime) -> int:
+        pass
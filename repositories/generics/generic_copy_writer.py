@@ -0,0 +1,70 @@
+from enum import Enum
+from itertools import islice
+from typing import Iterable, Type
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from configs.db.database import Base
+from configs.notification.notification_config import COPY_CHUNK_SIZE
+
+
+def _to_copy_value(value):
+    # SQLAlchemy Enum columns store the member name
+    if isinstance(value, Enum):
+        return value.name
+
+    return value
+
+
+def _to_records(columns: list[str], chunk: list[dict]) -> list[tuple]:
+    return [tuple(_to_copy_value(row.get(column)) for column in columns) for row in chunk]
+
+
+async def _driver_connection(db: AsyncSession):
+    connection = await db.connection()
+
+    # the asyncpg adapter only opens its transaction on the first statement it executes itself,
+    # so make sure COPY runs inside the session's transaction instead of autocommitting
+    await connection.exec_driver_sql("SELECT 1")
+
+    raw_connection = await connection.get_raw_connection()
+
+    return raw_connection.driver_connection
+
+
+async def copy_rows_skip_conflicts(
+    db: AsyncSession,
+    entity_class: Type[Base],
+    columns: list[str],
+    rows: Iterable[dict],
+    returning: str,
+    chunk_size: int = COPY_CHUNK_SIZE,
+) -> list:
+    driver_connection = await _driver_connection(db)
+
+    table = entity_class.__table__
+    target = f"{table.schema}.{table.name}" if table.schema else table.name
+    column_list = ", ".join(columns)
+    staging = f"_copy_staging_{table.name}"
+
+    # COPY cannot skip conflicting rows, so chunks land in a temporary table first
+    await driver_connection.execute(
+        f"CREATE TEMP TABLE IF NOT EXISTS {staging} ON COMMIT DROP "
+        f"AS SELECT {column_list} FROM {target} WITH NO DATA"
+    )
+
+    iterator = iter(rows)
+    inserted = []
+
+    while chunk := list(islice(iterator, chunk_size)):
+        await driver_connection.copy_records_to_table(staging, columns=columns, records=_to_records(columns, chunk))
+
+        records = await driver_connection.fetch(
+            f"INSERT INTO {target} ({column_list}) SELECT {column_list} FROM {staging} "
+            f"ON CONFLICT DO NOTHING RETURNING {returning}"
+        )
+        await driver_connection.execute(f"TRUNCATE {staging}")
+
+        inserted.extend(record[0] for record in records)
+
+    return inserted
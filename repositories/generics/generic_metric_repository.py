@@ -0,0 +1,112 @@
+from dataclasses import dataclass, field
+from typing import TypeVar, Generic, Type, Final
+
+from sqlalchemy import update, func, values, column, Integer, BigInteger, Column
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
+
+from configs.db.database import Base
+from schemas.event_message_metric_schemas import SumRedEnum
+
+T_Model = TypeVar("T_Model", bound=Base)
+
+# asyncpg accepts at most 32767 bind parameters per statement
+MAX_BIND_PARAMS: Final[int] = 32767
+
+MetricDelta = tuple[int, str, int]
+
+
+@dataclass
+class BulkDeltaResult:
+    requested: int = 0
+    matched: int = 0
+    missing_ids: list[int] = field(default_factory=list)
+
+
+def get_counter_column(entity_class: Type[Base], column_name: str) -> Column | None:
+    column = entity_class.__table__.c.get(column_name)
+
+    if column is None or column.primary_key or not isinstance(column.type, Integer):
+        return None
+
+    return column
+
+
+class GenericMetricRepository(Generic[T_Model]):
+    def __init__(self, db: AsyncSession, entity_class: Type[T_Model], key_column: InstrumentedAttribute[int]):
+        self.db = db
+        self._entity_class = entity_class
+        self._key_column = key_column
+
+    def _counter_column(self, column_name: str) -> Column:
+        column = get_counter_column(self._entity_class, column_name)
+
+        if column is None:
+            raise ValueError(f"Column {column_name} is not a counter of {self._entity_class.__name__}")
+
+        return column
+
+    async def add_delta(self, metric_id: int, column_name: str, delta: int) -> int | None:
+        column = self._counter_column(column_name)
+
+        stmt = (
+            update(self._entity_class)
+            .where(self._key_column == metric_id)
+            .values({column: func.greatest(0, column + delta)})
+            .returning(column)
+        )
+
+        result = await self.db.execute(stmt)
+
+        return result.scalar_one_or_none()
+
+    async def update_metric_value(self, metric_id: int, column_name: str, action: SumRedEnum) -> int | None:
+        # None when the row does not exist, retrying cannot create it so callers skip the event; the unit of work commits
+        return await self.add_delta(metric_id, column_name, 1 if action == SumRedEnum.SUM else -1)
+
+    async def add_deltas(self, deltas: list[MetricDelta]) -> BulkDeltaResult:
+        rows: dict[int, dict[str, int]] = {}
+
+        for metric_id, column_name, delta in deltas:
+            self._counter_column(column_name)
+            row = rows.setdefault(metric_id, {})
+            row[column_name] = row.get(column_name, 0) + delta
+
+        column_names = sorted({column_name for row in rows.values() for column_name in row})
+        metric_ids = list(rows)
+        chunk_size = MAX_BIND_PARAMS // (len(column_names) + 1)
+
+        matched: set[int] = set()
+
+        for start in range(0, len(metric_ids), chunk_size):
+            chunk = metric_ids[start:start + chunk_size]
+
+            data = values(
+                column("metric_id", BigInteger),
+                *(column(column_name, BigInteger) for column_name in column_names),
+                name="deltas",
+            ).data([
+                (metric_id, *(rows[metric_id].get(column_name, 0) for column_name in column_names))
+                for metric_id in chunk
+            ])
+
+            counters = {column_name: self._counter_column(column_name) for column_name in column_names}
+
+            stmt = (
+                update(self._entity_class)
+                .where(self._key_column == data.c.metric_id)
+                .values({
+                    counter: func.greatest(0, counter + data.c[column_name])
+                    for column_name, counter in counters.items()
+                })
+                .returning(self._key_column)
+            )
+
+            result = await self.db.execute(stmt)
+            matched.update(result.scalars().all())
+
+        return BulkDeltaResult(
+            requested=len(metric_ids),
+            matched=len(matched),
+            missing_ids=[metric_id for metric_id in metric_ids if metric_id not in matched],
+        )
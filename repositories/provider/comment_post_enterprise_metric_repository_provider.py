@@ -3,11 +3,15 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from configs.db.database import CommentPostEnterpriseMetricEntity
 from repositories.base.comment_post_enterprise_metric_repository_base import CommentPostEnterpriseMetricRepositoryBase
+from repositories.generics.generic_metric_repository import GenericMetricRepository
 
 
-class CommentPostEnterpriseMetricRepositoryProvider(CommentPostEnterpriseMetricRepositoryBase):
+class CommentPostEnterpriseMetricRepositoryProvider(
+    CommentPostEnterpriseMetricRepositoryBase,
+    GenericMetricRepository[CommentPostEnterpriseMetricEntity]
+):
     def __init__(self, db: AsyncSession):
-        self.db = db
+        super().__init__(db=db, entity_class=CommentPostEnterpriseMetricEntity, key_column=CommentPostEnterpriseMetricEntity.comment_id)
 
     async def get_by_id(self, comment_id: int) -> CommentPostEnterpriseMetricEntity:
         stmt = select(CommentPostEnterpriseMetricEntity).where(
@@ -3,10 +3,14 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from configs.db.database import CommentPostUserMetricEntity
 from repositories.base.comment_post_user_metric_repository_base import CommentPostUserMetricRepositoryBase
+from repositories.generics.generic_metric_repository import GenericMetricRepository
 
-class CommentPostUserMetricRepositoryProvider(CommentPostUserMetricRepositoryBase):
+class CommentPostUserMetricRepositoryProvider(
+    CommentPostUserMetricRepositoryBase,
+    GenericMetricRepository[CommentPostUserMetricEntity]
+):
     def __init__(self, db: AsyncSession):
-        self.db = db
+        super().__init__(db=db, entity_class=CommentPostUserMetricEntity, key_column=CommentPostUserMetricEntity.comment_id)
 
     async def get_by_id(self, comment_id: int) -> CommentPostUserMetricEntity:
         stmt = select(CommentPostUserMetricEntity).where(
@@ -1,7 +1,10 @@
-from sqlalchemy import select
+from typing import AsyncIterator
+
+from sqlalchemy import select, func, Select, true, false
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from configs.db.database import EnterpriseFollowsUserEntity
+from configs.notification.notification_config import FANOUT_CHUNK_SIZE
 from repositories.base.enterprise_follow_user_repository_base import EnterpriseFollowUserRepositoryBase
 
 
@@ -35,4 +38,76 @@ class EnterpriseFollowUserRepositoryProvider(EnterpriseFollowUserRepositoryBase)
 
         datas = await self.db.execute(stmt)
 
-        return list(datas.scalars().all())
\ No newline at end of file
+        return list(datas.scalars().all())
+
+    def user_ids_select(self,
+                        enterprise_id: int,
+                        receive_post: bool | None = None,
+                        receive_vacancy: bool | None = None,
+                        start_id: int | None = None,
+                        end_id: int | None = None,
+                        ) -> Select:
+        stmt = select(EnterpriseFollowsUserEntity.user_id).where(
+            EnterpriseFollowsUserEntity.enterprise_id == enterprise_id
+        )
+
+        # literal flags so the planner can match the partial fan-out indexes, a bound parameter never does
+        if receive_post is not None:
+            stmt = stmt.where(EnterpriseFollowsUserEntity.receive_post == (true() if receive_post else false()))
+
+        if receive_vacancy is not None:
+            stmt = stmt.where(EnterpriseFollowsUserEntity.receive_vacancy == (true() if receive_vacancy else false()))
+
+        if start_id is not None:
+            stmt = stmt.where(EnterpriseFollowsUserEntity.user_id >= start_id)
+
+        if end_id is not None:
+            stmt = stmt.where(EnterpriseFollowsUserEntity.user_id < end_id)
+
+        return stmt
+
+    async def user_id_boundaries(self,
+                                 enterprise_id: int,
+                                 chunk_size: int,
+                                 receive_post: bool | None = None,
+                                 receive_vacancy: bool | None = None,
+                                 ) -> list[int]:
+        ranked = self.user_ids_select(enterprise_id, receive_post, receive_vacancy).add_columns(
+            func.row_number().over(order_by=EnterpriseFollowsUserEntity.user_id).label("position")
+        ).subquery()
+
+        stmt = select(ranked.c.user_id).where(
+            (ranked.c.position - 1) % chunk_size == 0
+        ).order_by(ranked.c.user_id)
+
+        result = await self.db.execute(stmt)
+
+        return list(result.scalars().all())
+
+    async def count_user_ids(self,
+                             enterprise_id: int,
+                             receive_post: bool | None = None,
+                             receive_vacancy: bool | None = None,
+                             limit: int | None = None,
+                             ) -> int:
+        stmt = self.user_ids_select(enterprise_id, receive_post, receive_vacancy)
+
+        if limit is not None:
+            stmt = stmt.limit(limit)
+
+        result = await self.db.execute(select(func.count()).select_from(stmt.subquery()))
+
+        return result.scalar_one()
+
+    async def stream_user_ids(self,
+                              enterprise_id: int,
+                              receive_post: bool | None = None,
+                              receive_vacancy: bool | None = None,
+                              chunk_size: int = FANOUT_CHUNK_SIZE,
+                              ) -> AsyncIterator[list[int]]:
+        stmt = self.user_ids_select(enterprise_id, receive_post, receive_vacancy)
+
+        result = await self.db.stream_scalars(stmt.execution_options(yield_per=chunk_size))
+
+        async for user_ids in result.partitions(chunk_size):
+            yield list(user_ids)
@@ -1,14 +1,17 @@
-from sqlalchemy import select, literal_column, func, update
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from configs.db.database import EnterpriseMetricEntity
 from repositories.base.enterprise_metric_repository_base import EnterpriseMetricRepositoryBase
-from schemas.event_message_metric_schemas import SumRedEnum
+from repositories.generics.generic_metric_repository import GenericMetricRepository
 
 
-class EnterpriseMetricRepositoryProvider(EnterpriseMetricRepositoryBase):
+class EnterpriseMetricRepositoryProvider(
+    EnterpriseMetricRepositoryBase,
+    GenericMetricRepository[EnterpriseMetricEntity]
+):
     def __init__(self, db: AsyncSession):
-        self.db = db
+        super().__init__(db=db, entity_class=EnterpriseMetricEntity, key_column=EnterpriseMetricEntity.enterprise_id)
 
     async def get_by_id(self, enterprise_id: int) -> EnterpriseMetricEntity:
         stmt = select(EnterpriseMetricEntity).where(
@@ -28,18 +31,4 @@ class EnterpriseMetricRepositoryProvider(EnterpriseMetricRepositoryBase):
         await self.db.commit()
         await self.db.refresh(metric)
 
-        return metric
-
-    async def update_metric_value(self, enterprise_id: int, column_name: str, action: SumRedEnum) -> None:
-        if action == SumRedEnum.SUM:
-            value_expression = literal_column(column_name) + 1
-        else:  # RED
-            value_expression = func.greatest(0, literal_column(column_name) - 1)
-
-        stmt = (
-            update(EnterpriseMetricEntity)
-            .where(EnterpriseMetricEntity.enterprise_id == enterprise_id)
-            .values({column_name: value_expression})
-        )
-        await self.db.execute(stmt)
-        await self.db.commit()
\ No newline at end of file
+        return metric
\ No newline at end of file
@@ -1,8 +1,11 @@
-from sqlalchemy import select
+from typing import AsyncIterator
+
+from sqlalchemy import select, func, Select, true, false
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from configs.db.database import FollowerRelationshipEntity
+from configs.notification.notification_config import FANOUT_CHUNK_SIZE
 from repositories.base.follow_repository_base import FollowRepositoryBase
 
 
@@ -35,4 +38,80 @@ class FollowRepositoryProvider(FollowRepositoryBase):
 
         datas = await self.db.execute(stmt)
 
-        return list(datas.scalars().all())
\ No newline at end of file
+        return list(datas.scalars().all())
+
+    def follower_ids_select(self,
+        followed_id: int,
+        receive_post: bool | None = None,
+        receive_comment: bool | None = None,
+        start_id: int | None = None,
+        end_id: int | None = None,
+    ) -> Select:
+
+        stmt = select(FollowerRelationshipEntity.follower_id).where(
+            FollowerRelationshipEntity.followed_id == followed_id
+        )
+
+        # literal flags so the planner can match the partial fan-out indexes, a bound parameter never does
+        if receive_post is not None:
+            stmt = stmt.where(FollowerRelationshipEntity.receive_post == (true() if receive_post else false()))
+
+        if receive_comment is not None:
+            stmt = stmt.where(FollowerRelationshipEntity.receive_comment == (true() if receive_comment else false()))
+
+        if start_id is not None:
+            stmt = stmt.where(FollowerRelationshipEntity.follower_id >= start_id)
+
+        if end_id is not None:
+            stmt = stmt.where(FollowerRelationshipEntity.follower_id < end_id)
+
+        return stmt
+
+    async def follower_id_boundaries(self,
+        followed_id: int,
+        chunk_size: int,
+        receive_post: bool | None = None,
+        receive_comment: bool | None = None,
+    ) -> list[int]:
+
+        ranked = self.follower_ids_select(followed_id, receive_post, receive_comment).add_columns(
+            func.row_number().over(order_by=FollowerRelationshipEntity.follower_id).label("position")
+        ).subquery()
+
+        stmt = select(ranked.c.follower_id).where(
+            (ranked.c.position - 1) % chunk_size == 0
+        ).order_by(ranked.c.follower_id)
+
+        result = await self.db.execute(stmt)
+
+        return list(result.scalars().all())
+
+    async def count_follower_ids(self,
+        followed_id: int,
+        receive_post: bool | None = None,
+        receive_comment: bool | None = None,
+        limit: int | None = None,
+    ) -> int:
+
+        stmt = self.follower_ids_select(followed_id, receive_post, receive_comment)
+
+        if limit is not None:
+            stmt = stmt.limit(limit)
+
+        result = await self.db.execute(select(func.count()).select_from(stmt.subquery()))
+
+        return result.scalar_one()
+
+    async def stream_follower_ids(self,
+        followed_id: int,
+        receive_post: bool | None = None,
+        receive_comment: bool | None = None,
+        chunk_size: int = FANOUT_CHUNK_SIZE,
+    ) -> AsyncIterator[list[int]]:
+
+        stmt = self.follower_ids_select(followed_id, receive_post, receive_comment)
+
+        result = await self.db.stream_scalars(stmt.execution_options(yield_per=chunk_size))
+
+        async for follower_ids in result.partitions(chunk_size):
+            yield list(follower_ids)
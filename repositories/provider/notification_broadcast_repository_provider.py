@@ -0,0 +1,226 @@
+from datetime import datetime
+
+from sqlalchemy import select, func, literal, and_, or_, union_all, tuple_, cast, null, String, RowMapping, Select
+from sqlalchemy.dialects.postgresql import insert, JSONB
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from configs.db.database import (
+    NotificationEntity, NotificationBroadcastEntity, NotificationReadCursorEntity, NotificationParamsEntity,
+    FollowerRelationshipEntity, EnterpriseFollowsUserEntity
+)
+from configs.db.enums import NotificationTypeEnum
+from repositories.base.notification_broadcast_repository_base import NotificationBroadcastRepositoryBase
+
+# the follow preference a follower must have enabled to see each kind of broadcast
+BROADCAST_PREFERENCES = {
+    NotificationTypeEnum.NEW_POST: FollowerRelationshipEntity.receive_post,
+    NotificationTypeEnum.NEW_COMMENT: FollowerRelationshipEntity.receive_comment,
+    NotificationTypeEnum.NEW_POST_ENTERPRISE: EnterpriseFollowsUserEntity.receive_post,
+    NotificationTypeEnum.NEW_VACANCY: EnterpriseFollowsUserEntity.receive_vacancy,
+}
+
+
+class NotificationBroadcastRepositoryProvider(NotificationBroadcastRepositoryBase):
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def add(self, broadcast: NotificationBroadcastEntity) -> NotificationBroadcastEntity:
+        self.db.add(broadcast)
+        await self.db.flush()
+
+        return broadcast
+
+    async def get_feed(self,
+                       user_id: int,
+                       limit: int,
+                       before_created_at: datetime | None = None,
+                       before_id: int | None = None,
+                       before_broadcast: bool = False,
+                       ) -> list[RowMapping]:
+        personal = self._personal_select(user_id)
+        broadcasts = [self._broadcast_select(user_id), self._enterprise_broadcast_select(user_id)]
+
+        # the feed is ordered by (created_at, is_broadcast, id), which stays unique across both id sequences,
+        # and every branch is cut at the cursor and limited on its own so each one can walk its index
+        if before_created_at is not None:
+            personal = personal.where(self._before(
+                NotificationEntity, False, before_created_at, before_id, before_broadcast
+            ))
+            broadcasts = [broadcast.where(self._before(
+                NotificationBroadcastEntity, True, before_created_at, before_id, before_broadcast
+            )) for broadcast in broadcasts]
+
+        feed = union_all(
+            personal.order_by(NotificationEntity.created_at.desc(), NotificationEntity.id.desc()).limit(limit),
+            *(broadcast.order_by(
+                NotificationBroadcastEntity.created_at.desc(), NotificationBroadcastEntity.id.desc()
+            ).limit(limit) for broadcast in broadcasts),
+        ).subquery()
+
+        stmt = select(feed).order_by(
+            feed.c.created_at.desc(), feed.c.is_broadcast.desc(), feed.c.id.desc()
+        ).limit(limit)
+
+        result = await self.db.execute(stmt)
+
+        return list(result.mappings().all())
+
+    async def count_unread(self, user_id: int, limit: int) -> int:
+        last_read = func.coalesce(self._last_read(user_id), 0)
+
+        unread = union_all(
+            self._broadcast_select(user_id).where(NotificationBroadcastEntity.id > last_read),
+            self._enterprise_broadcast_select(user_id).where(NotificationBroadcastEntity.id > last_read),
+        ).limit(limit).subquery()
+
+        result = await self.db.execute(select(func.count()).select_from(unread))
+
+        return result.scalar_one()
+
+    async def latest_id(self, user_id: int) -> int | None:
+        visible = union_all(
+            self._broadcast_select(user_id), self._enterprise_broadcast_select(user_id)
+        ).subquery()
+
+        result = await self.db.execute(select(func.max(visible.c.id)))
+
+        return result.scalar_one()
+
+    async def audience_among(self, broadcast: NotificationBroadcastEntity, user_ids: list[int]) -> list[int]:
+        preference = BROADCAST_PREFERENCES.get(broadcast.type)
+
+        if not user_ids or preference is None:
+            return []
+
+        if broadcast.is_enterprise:
+            stmt = select(EnterpriseFollowsUserEntity.user_id).where(
+                EnterpriseFollowsUserEntity.enterprise_id == broadcast.actor_id,
+                EnterpriseFollowsUserEntity.user_id.in_(user_ids),
+            )
+        else:
+            stmt = select(FollowerRelationshipEntity.follower_id).where(
+                FollowerRelationshipEntity.followed_id == broadcast.actor_id,
+                FollowerRelationshipEntity.follower_id.in_(user_ids),
+            )
+
+        result = await self.db.execute(stmt.where(preference.is_(True)))
+
+        return list(result.scalars().all())
+
+    async def mark_read(self, user_id: int, broadcast_id: int) -> None:
+        stmt = insert(NotificationReadCursorEntity).values(
+            user_id=user_id,
+            last_read_broadcast_id=broadcast_id,
+        )
+
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[NotificationReadCursorEntity.user_id],
+            set_={
+                "last_read_broadcast_id": func.greatest(
+                    NotificationReadCursorEntity.last_read_broadcast_id,
+                    stmt.excluded.last_read_broadcast_id,
+                ),
+                "updated_at": func.now(),
+            },
+        )
+
+        await self.db.execute(stmt)
+
+    @staticmethod
+    def _personal_select(user_id: int) -> Select:
+        return select(
+            NotificationEntity.id,
+            NotificationEntity.title,
+            NotificationEntity.content,
+            NotificationEntity.link,
+            NotificationEntity.type,
+            NotificationEntity.entity_id,
+            NotificationEntity.is_view,
+            NotificationEntity.created_at,
+            literal(False).label("is_broadcast"),
+            NotificationEntity.template,
+            NotificationParamsEntity.params,
+        ).outerjoin(
+            NotificationParamsEntity, NotificationParamsEntity.id == NotificationEntity.params_id
+        ).where(NotificationEntity.user_id == user_id)
+
+    @staticmethod
+    def _before(entity, is_broadcast: bool, created_at: datetime, _id: int, before_broadcast: bool):
+        if is_broadcast == before_broadcast:
+            return tuple_(entity.created_at, entity.id) < tuple_(created_at, _id)
+
+        # at the same created_at broadcasts sort ahead of personal rows
+        if before_broadcast:
+            return entity.created_at <= created_at
+
+        return entity.created_at < created_at
+
+    @staticmethod
+    def _last_read(user_id: int):
+        return (
+            select(NotificationReadCursorEntity.last_read_broadcast_id)
+            .where(NotificationReadCursorEntity.user_id == user_id)
+            .scalar_subquery()
+        )
+
+    def _broadcast_columns(self, user_id: int) -> list:
+        last_read = self._last_read(user_id)
+
+        return [
+            NotificationBroadcastEntity.id,
+            NotificationBroadcastEntity.title,
+            NotificationBroadcastEntity.content,
+            NotificationBroadcastEntity.link,
+            NotificationBroadcastEntity.type,
+            NotificationBroadcastEntity.entity_id,
+            (NotificationBroadcastEntity.id <= func.coalesce(last_read, 0)).label("is_view"),
+            NotificationBroadcastEntity.created_at,
+            literal(True).label("is_broadcast"),
+            cast(null(), String).label("template"),
+            cast(null(), JSONB).label("params"),
+        ]
+
+    def _broadcast_select(self, user_id: int) -> Select:
+        # a follower only sees broadcasts published after they started following and matching their preferences
+        return select(*self._broadcast_columns(user_id)).join(
+            FollowerRelationshipEntity,
+            and_(
+                FollowerRelationshipEntity.followed_id == NotificationBroadcastEntity.actor_id,
+                FollowerRelationshipEntity.follower_id == user_id,
+                FollowerRelationshipEntity.created_at <= NotificationBroadcastEntity.created_at,
+            ),
+        ).where(
+            NotificationBroadcastEntity.is_enterprise.is_(False),
+            or_(
+                and_(
+                    NotificationBroadcastEntity.type == NotificationTypeEnum.NEW_POST,
+                    FollowerRelationshipEntity.receive_post.is_(True),
+                ),
+                and_(
+                    NotificationBroadcastEntity.type == NotificationTypeEnum.NEW_COMMENT,
+                    FollowerRelationshipEntity.receive_comment.is_(True),
+                ),
+            ),
+        )
+
+    def _enterprise_broadcast_select(self, user_id: int) -> Select:
+        return select(*self._broadcast_columns(user_id)).join(
+            EnterpriseFollowsUserEntity,
+            and_(
+                EnterpriseFollowsUserEntity.enterprise_id == NotificationBroadcastEntity.actor_id,
+                EnterpriseFollowsUserEntity.user_id == user_id,
+                EnterpriseFollowsUserEntity.created_at <= NotificationBroadcastEntity.created_at,
+            ),
+        ).where(
+            NotificationBroadcastEntity.is_enterprise.is_(True),
+            or_(
+                and_(
+                    NotificationBroadcastEntity.type == NotificationTypeEnum.NEW_POST_ENTERPRISE,
+                    EnterpriseFollowsUserEntity.receive_post.is_(True),
+                ),
+                and_(
+                    NotificationBroadcastEntity.type == NotificationTypeEnum.NEW_VACANCY,
+                    EnterpriseFollowsUserEntity.receive_vacancy.is_(True),
+                ),
+            ),
+        )
@@ -1,8 +1,10 @@
+from datetime import datetime
+
 import structlog
-from sqlalchemy import select
+from sqlalchemy import select, update, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from configs.db.database import NotificationEntity, NotificationEnterpriseEntity
+from configs.db.database import NotificationEnterpriseEntity
 from repositories.base.notification_enterprise_repository_base import NotificationEnterpriseRepositoryBase
 from repositories.generics.generic_repository import GenericRepository
 
@@ -18,4 +20,47 @@ class NotificationEnterpriseRepositoryProvider(
     ]
 ):
     def __init__(self, db: AsyncSession):
-        super().__init__(db=db, entity_class=NotificationEnterpriseEntity)
\ No newline at end of file
+        super().__init__(db=db, entity_class=NotificationEnterpriseEntity)
+
+    async def stage(self, notify: NotificationEnterpriseEntity) -> NotificationEnterpriseEntity:
+        self.db.add(notify)
+        await self.db.flush()
+
+        return notify
+
+    async def get_page(self,
+                       enterprise_id: int,
+                       limit: int,
+                       before_created_at: datetime | None = None,
+                       before_id: int | None = None,
+                       ) -> list[NotificationEnterpriseEntity]:
+        stmt = select(NotificationEnterpriseEntity).where(
+            NotificationEnterpriseEntity.enterprise_id == enterprise_id
+        )
+
+        if before_created_at is not None:
+            stmt = stmt.where(
+                tuple_(NotificationEnterpriseEntity.created_at, NotificationEnterpriseEntity.id)
+                < tuple_(before_created_at, before_id)
+            )
+
+        stmt = stmt.order_by(
+            NotificationEnterpriseEntity.created_at.desc(), NotificationEnterpriseEntity.id.desc()
+        ).limit(limit)
+
+        result = await self.db.execute(stmt)
+
+        return list(result.scalars().all())
+
+    async def mark_read(self, enterprise_id: int, ids: list[int] | None = None) -> int:
+        stmt = update(NotificationEnterpriseEntity).where(
+            NotificationEnterpriseEntity.enterprise_id == enterprise_id,
+            NotificationEnterpriseEntity.is_view.is_(False),
+        ).values(is_view=True)
+
+        if ids is not None:
+            stmt = stmt.where(NotificationEnterpriseEntity.id.in_(ids))
+
+        result = await self.db.execute(stmt.execution_options(synchronize_session=False))
+
+        return result.rowcount
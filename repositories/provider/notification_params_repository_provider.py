@@ -0,0 +1,25 @@
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from configs.db.database import NotificationParamsEntity
+from repositories.base.notification_params_repository_base import NotificationParamsRepositoryBase
+
+
+class NotificationParamsRepositoryProvider(NotificationParamsRepositoryBase):
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_or_create(self, event_id: str, params: dict) -> int:
+        stmt = insert(NotificationParamsEntity).values(event_id=event_id, params=params).on_conflict_do_nothing(
+            index_elements=[NotificationParamsEntity.event_id]
+        ).returning(NotificationParamsEntity.id)
+
+        params_id = (await self.db.execute(stmt)).scalar_one_or_none()
+
+        # the record already exists, reading it takes no row lock and leaves no dead tuple behind
+        if params_id is None:
+            stmt = select(NotificationParamsEntity.id).where(NotificationParamsEntity.event_id == event_id)
+            params_id = (await self.db.execute(stmt)).scalar_one()
+
+        return params_id
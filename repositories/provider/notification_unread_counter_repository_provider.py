@@ -0,0 +1,65 @@
+from sqlalchemy import select, update, func, literal, bindparam, BigInteger
+from sqlalchemy.dialects.postgresql import insert, ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from configs.db.database import NotificationUnreadCounterEntity
+from repositories.base.notification_unread_counter_repository_base import NotificationUnreadCounterRepositoryBase
+
+
+class NotificationUnreadCounterRepositoryProvider(NotificationUnreadCounterRepositoryBase):
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def increment(self, owner_ids: list[int], is_enterprise: bool = False) -> None:
+        if not owner_ids:
+            return
+
+        owners = func.unnest(
+            bindparam("owner_ids", owner_ids, type_=ARRAY(BigInteger))
+        ).table_valued("owner_id").render_derived(name="owners")
+
+        # counters are locked in owner_id order so concurrent fan-outs over overlapping audiences don't deadlock
+        rows = select(
+            literal(is_enterprise),
+            owners.c.owner_id,
+            func.count(),
+        ).group_by(owners.c.owner_id).order_by(owners.c.owner_id)
+
+        stmt = insert(NotificationUnreadCounterEntity).from_select(
+            ["is_enterprise", "owner_id", "unread"],
+            rows,
+        )
+
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[NotificationUnreadCounterEntity.is_enterprise, NotificationUnreadCounterEntity.owner_id],
+            set_={
+                "unread": NotificationUnreadCounterEntity.unread + stmt.excluded.unread,
+                "updated_at": func.now(),
+            },
+        )
+
+        await self.db.execute(stmt)
+
+    async def decrement(self, owner_id: int, count: int, is_enterprise: bool = False) -> None:
+        if count <= 0:
+            return
+
+        stmt = update(NotificationUnreadCounterEntity).where(
+            NotificationUnreadCounterEntity.is_enterprise == is_enterprise,
+            NotificationUnreadCounterEntity.owner_id == owner_id,
+        ).values(
+            unread=func.greatest(NotificationUnreadCounterEntity.unread - count, 0),
+            updated_at=func.now(),
+        )
+
+        await self.db.execute(stmt)
+
+    async def get_unread(self, owner_id: int, is_enterprise: bool = False) -> int:
+        stmt = select(NotificationUnreadCounterEntity.unread).where(
+            NotificationUnreadCounterEntity.is_enterprise == is_enterprise,
+            NotificationUnreadCounterEntity.owner_id == owner_id,
+        )
+
+        result = await self.db.execute(stmt)
+
+        return result.scalar_one_or_none() or 0
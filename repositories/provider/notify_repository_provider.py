@@ -1,11 +1,17 @@
-import structlog
-from sqlalchemy import select
+from typing import Final, Iterable
+
+from sqlalchemy import select, update, literal, Select
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from configs.db.database import NotificationEntity
+from configs.db.enums import NotificationTypeEnum
 from repositories.base.notify_repository_base import NotifyRepositoryBase
+from repositories.generics.generic_copy_writer import copy_rows_skip_conflicts
 
-logger = structlog.get_logger()
+NOTIFICATION_COPY_COLUMNS: Final[list[str]] = [
+    "event_id", "user_id", "title", "content", "template", "params_id", "link", "is_view", "type", "entity_id"
+]
 
 class NotifyRepositoryProvider(NotifyRepositoryBase):
     def __init__(self, db: AsyncSession):
@@ -24,16 +30,73 @@ class NotifyRepositoryProvider(NotifyRepositoryBase):
 
         return noti
 
-    async def add_all(self, noti: list[NotificationEntity]):
-        self.db.add_all(noti)
-        await self.db.commit()
+    # the bulk writers return the recipients that were actually inserted, rows skipped on conflict are left out
+
+    async def insert_many(self, rows: list[dict]) -> list[int]:
+        if not rows:
+            return []
+
+        stmt = insert(NotificationEntity).on_conflict_do_nothing(
+            index_elements=[NotificationEntity.event_id, NotificationEntity.user_id]
+        ).returning(NotificationEntity.user_id)
+
+        connection = await self.db.connection()
+        result = await connection.execute(stmt, rows)
+
+        return list(result.scalars().all())
+
+    async def copy_many(self, rows: Iterable[dict]) -> list[int]:
+        return await copy_rows_skip_conflicts(
+            self.db,
+            NotificationEntity,
+            NOTIFICATION_COPY_COLUMNS,
+            ({"is_view": False, **row} for row in rows),
+            returning="user_id",
+        )
+
+    async def insert_from_select(self,
+                                 recipients: Select,
+                                 title: str | None,
+                                 content: str | None,
+                                 type: NotificationTypeEnum,
+                                 entity_id: int | None,
+                                 event_id: str | None = None,
+                                 template: str | None = None,
+                                 params_id: int | None = None,
+                                 ) -> list[int]:
+        recipients = recipients.add_columns(
+            literal(event_id, NotificationEntity.event_id.type),
+            literal(title, NotificationEntity.title.type),
+            literal(content, NotificationEntity.content.type),
+            literal(template, NotificationEntity.template.type),
+            literal(params_id, NotificationEntity.params_id.type),
+            literal(type, NotificationEntity.type.type),
+            literal(entity_id, NotificationEntity.entity_id.type),
+        )
+
+        stmt = insert(NotificationEntity).from_select(
+            ["user_id", "event_id", "title", "content", "template", "params_id", "type", "entity_id"],
+            recipients,
+        ).on_conflict_do_nothing(
+            index_elements=[NotificationEntity.event_id, NotificationEntity.user_id]
+        ).returning(NotificationEntity.user_id)
+
+        result = await self.db.execute(stmt)
+
+        return list(result.scalars().all())
+
+    async def mark_read(self, user_id: int, ids: list[int] | None = None) -> int:
+        stmt = update(NotificationEntity).where(
+            NotificationEntity.user_id == user_id,
+            NotificationEntity.is_view.is_(False),
+        ).values(is_view=True)
+
+        if ids is not None:
+            stmt = stmt.where(NotificationEntity.id.in_(ids))
 
-        log_data = [
-            {"id": n.id, "user_id": n.user_id, "type": n.type.name}
-            for n in noti
-        ]
+        result = await self.db.execute(stmt.execution_options(synchronize_session=False))
 
-        logger.info("Notifications added successfully", count=len(noti), notifications=log_data)
+        return result.rowcount
 
     async def get_by_id(self, _id) -> NotificationEntity | None:
         stmt = select(NotificationEntity).where(
@@ -3,11 +3,15 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from configs.db.database import PostEnterpriseMetricEntity
 from repositories.base.post_enterprise_metric_repository_base import PostEnterpriseMetricRepositoryBase
+from repositories.generics.generic_metric_repository import GenericMetricRepository
 
 
-class PostEnterpriseMetricRepositoryProvider(PostEnterpriseMetricRepositoryBase):
+class PostEnterpriseMetricRepositoryProvider(
+    PostEnterpriseMetricRepositoryBase,
+    GenericMetricRepository[PostEnterpriseMetricEntity]
+):
     def __init__(self, db: AsyncSession):
-        self.db = db
+        super().__init__(db=db, entity_class=PostEnterpriseMetricEntity, key_column=PostEnterpriseMetricEntity.post_id)
 
     async def get_by_id(self, post_id: int) -> PostEnterpriseMetricEntity:
         stmt = select(PostEnterpriseMetricEntity).where(
@@ -3,10 +3,14 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from configs.db.database import PostUserMetricEntity
 from repositories.base.post_user_metric_repository_base import PostUserMetricRepositoryBase
+from repositories.generics.generic_metric_repository import GenericMetricRepository
 
-class PostUserMetricRepositoryProvider(PostUserMetricRepositoryBase):
+class PostUserMetricRepositoryProvider(
+    PostUserMetricRepositoryBase,
+    GenericMetricRepository[PostUserMetricEntity]
+):
     def __init__(self, db: AsyncSession):
-        self.db = db
+        super().__init__(db=db, entity_class=PostUserMetricEntity, key_column=PostUserMetricEntity.post_id)
 
     async def get_by_id(self, post_id: int) -> PostUserMetricEntity:
         stmt = select(PostUserMetricEntity).where(
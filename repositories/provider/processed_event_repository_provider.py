@@ -0,0 +1,53 @@
+from datetime import datetime
+from typing import Final
+
+from sqlalchemy import select, delete
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from configs.db.database import ProcessedEventEntity
+from repositories.base.processed_event_repository_base import ProcessedEventRepositoryBase
+
+CHUNK_SIZE: Final[int] = 10000
+
+
+class ProcessedEventRepositoryProvider(ProcessedEventRepositoryBase):
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_processed_ids(self, topic: str, event_ids: list[str]) -> set[str]:
+        processed: set[str] = set()
+
+        for start in range(0, len(event_ids), CHUNK_SIZE):
+            stmt = select(ProcessedEventEntity.event_id).where(
+                ProcessedEventEntity.topic == topic,
+                ProcessedEventEntity.event_id.in_(event_ids[start:start + CHUNK_SIZE])
+            )
+
+            result = await self.db.execute(stmt)
+            processed.update(result.scalars().all())
+
+        return processed
+
+    async def mark_processed(self, topic: str, event_ids: list[str]) -> list[str]:
+        # only the ids inserted here are returned, a concurrent consumer holding the same event blocks on its
+        # row until that transaction ends and then gets nothing back if it committed
+        inserted: list[str] = []
+
+        for start in range(0, len(event_ids), CHUNK_SIZE):
+            stmt = insert(ProcessedEventEntity).values([
+                {"topic": topic, "event_id": event_id} for event_id in event_ids[start:start + CHUNK_SIZE]
+            ]).on_conflict_do_nothing().returning(ProcessedEventEntity.event_id)
+
+            result = await self.db.execute(stmt)
+            inserted.extend(result.scalars().all())
+
+        return inserted
+
+    async def delete_older_than(self, cutoff: datetime) -> int:
+        stmt = delete(ProcessedEventEntity).where(ProcessedEventEntity.created_at < cutoff)
+
+        result = await self.db.execute(stmt)
+        await self.db.commit()
+
+        return result.rowcount
@@ -3,11 +3,15 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from configs.db.database import UserMetricEntity
 from repositories.base.user_metric_repository_base import UserMetricRepositoryBase
+from repositories.generics.generic_metric_repository import GenericMetricRepository
 
 
-class UserMetricRepositoryProvider(UserMetricRepositoryBase):
+class UserMetricRepositoryProvider(
+    UserMetricRepositoryBase,
+    GenericMetricRepository[UserMetricEntity]
+):
     def __init__(self, db: AsyncSession):
-        self.db = db
+        super().__init__(db=db, entity_class=UserMetricEntity, key_column=UserMetricEntity.user_id)
 
     async def get_by_id(self, user_id: int) -> UserMetricEntity:
         stmt = select(UserMetricEntity).where(
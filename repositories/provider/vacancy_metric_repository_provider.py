@@ -3,11 +3,15 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from configs.db.database import VacancyMetricEntity
 from repositories.base.vacancy_metric_repository_base import VacancyMetricRepositoryBase
+from repositories.generics.generic_metric_repository import GenericMetricRepository
 
 
-class VacancyMetricRepositoryProvider(VacancyMetricRepositoryBase):
+class VacancyMetricRepositoryProvider(
+    VacancyMetricRepositoryBase,
+    GenericMetricRepository[VacancyMetricEntity]
+):
     def __init__(self, db: AsyncSession):
-        self.db = db
+        super().__init__(db=db, entity_class=VacancyMetricEntity, key_column=VacancyMetricEntity.vacancy_id)
 
     async def save(self, metric: VacancyMetricEntity) -> VacancyMetricEntity:
         await self.db.commit()
@@ -0,0 +1,27 @@
+from enum import Enum
+
+from configs.orjson.orjson_config import ORJSONModel
+from schemas.event_notification import EventNotification
+
+
+class FanoutAudienceEnum(str, Enum):
+    FOLLOWERS = "followers"
+    ENTERPRISE_FOLLOWERS = "enterprise_followers"
+
+class FanoutChunk(ORJSONModel):
+    job_id: str
+    chunk_index: int
+    chunks: int
+    audience: FanoutAudienceEnum
+    receive_post: bool | None = None
+    receive_comment: bool | None = None
+    receive_vacancy: bool | None = None
+    start_id: int
+    end_id: int | None
+    event: EventNotification
+    # resolved once when the job is published, so chunks never write the shared parameter record
+    params_id: int | None = None
+
+    @property
+    def chunk_id(self) -> str:
+        return f"{self.job_id}:{self.chunk_index}"
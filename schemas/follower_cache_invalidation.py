@@ -0,0 +1,7 @@
+from configs.orjson.orjson_config import ORJSONModel
+from schemas.fanout_chunk import FanoutAudienceEnum
+
+
+class FollowerCacheInvalidation(ORJSONModel):
+    audience: FanoutAudienceEnum
+    actor_id: int
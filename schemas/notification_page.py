@@ -0,0 +1,45 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import datetime
+
+from configs.db.enums import NotificationTypeEnum
+from configs.orjson.orjson_config import ORJSONModel
+
+class NotificationCursor(ORJSONModel):
+    created_at: datetime
+    id: int
+    is_broadcast: bool = False
+
+    def encode(self) -> str:
+        return urlsafe_b64encode(self.model_dump_json().encode("utf-8")).decode("ascii")
+
+    @classmethod
+    def decode(cls, value: str) -> "NotificationCursor":
+        return cls.model_validate_json(urlsafe_b64decode(value.encode("ascii")))
+
+class NotificationItem(ORJSONModel):
+    id: int
+    title: str
+    content: str
+    link: str | None
+    type: NotificationTypeEnum
+    entity_id: int | None
+    is_view: bool
+    created_at: datetime
+    is_broadcast: bool = False
+
+class NotificationPage(ORJSONModel):
+    items: list[NotificationItem]
+    next_cursor: str | None = None
+
+    @classmethod
+    def build(cls, items: list[NotificationItem], limit: int) -> "NotificationPage":
+        # callers fetch limit + 1 rows, the extra row only tells whether another page exists
+        page = items[:limit]
+
+        if len(items) <= limit:
+            return cls(items=page)
+
+        last = page[-1]
+        cursor = NotificationCursor(created_at=last.created_at, id=last.id, is_broadcast=last.is_broadcast)
+
+        return cls(items=page, next_cursor=cursor.encode())
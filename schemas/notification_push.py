@@ -0,0 +1,19 @@
+from datetime import datetime
+from enum import Enum
+
+from configs.db.enums import NotificationTypeEnum
+from configs.orjson.orjson_config import ORJSONModel
+
+class NotificationPushEventEnum(str, Enum):
+    NOTIFICATION = "notification"
+    # the connection dropped messages, the client should refetch the inbox
+    RESYNC = "resync"
+
+class NotificationPushMessage(ORJSONModel):
+    event: NotificationPushEventEnum = NotificationPushEventEnum.NOTIFICATION
+    type: NotificationTypeEnum | None = None
+    title: str | None = None
+    content: str | None = None
+    entity_id: int | None = None
+    is_broadcast: bool = False
+    created_at: datetime
@@ -0,0 +1,13 @@
+from configs.orjson.orjson_config import ORJSONModel
+
+class NotificationUnreadCount(ORJSONModel):
+    unread: int
+
+class NotificationReadRequest(ORJSONModel):
+    # None marks every unread notification of the owner as read
+    ids: list[int] | None = None
+    # the newest broadcast id the client has seen, every broadcast up to it is marked as read
+    broadcast_id: int | None = None
+
+class NotificationReadResult(ORJSONModel):
+    read: int
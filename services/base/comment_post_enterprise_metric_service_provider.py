@@ -15,20 +15,14 @@ class CommentPostEnterpriseMetricServiceProvider(CommentPostEnterpriseMetricServ
     async def get_by_id(self, comment_id: int) -> CommentPostEnterpriseMetricEntity:
         return await self.repository.get_by_id(comment_id)
 
-    async def save_metric(self, metric: CommentPostEnterpriseMetricEntity, event: EventMessageMetric):
-        column_name = event.column
-        current_value = getattr(metric, column_name, None)
+    async def update_metric(self, event: EventMessageMetric) -> int | None:
+        value = await self.repository.update_metric_value(event.metric_id, event.column, event.action)
 
-        if current_value is None:
-            logger.error(f"Column {column_name} does not exist on VacancyMetricEntity")
-            return
-
-        if event.action == "SUM":
-            setattr(metric, column_name, current_value + 1)
-        elif event.action == "RED":
-            setattr(metric, column_name, max(current_value - 1, 0))
-
-        metric_updated = await self.repository.save(metric)
+        if value is None:
+            logger.warning("Metric not found, event skipped", entity=event.entity.value, metric_id=event.metric_id, event_id=event.event_id)
+            return None
 
         logger.info("Metric updated successfully")
-        logger.info(f"{column_name} before {current_value} after {getattr(metric_updated, column_name)}")
\ No newline at end of file
+        logger.info(f"{event.column} after {value}")
+
+        return value
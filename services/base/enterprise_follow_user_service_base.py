@@ -1,4 +1,9 @@
 from abc import ABC, abstractmethod
+from typing import AsyncIterator
+
+from sqlalchemy import Select
+
+from configs.notification.notification_config import FANOUT_CHUNK_SIZE
 
 
 class EnterpriseFollowUserServiceBase(ABC):
@@ -10,4 +15,41 @@ class EnterpriseFollowUserServiceBase(ABC):
                       receive_comment: bool | None,
                       receive_vacancy: bool | None,
                       ):
-        pass
\ No newline at end of file
+        pass
+
+    @abstractmethod
+    def user_ids_select(self,
+                        enterprise_id: int,
+                        receive_post: bool | None = None,
+                        receive_vacancy: bool | None = None,
+                        start_id: int | None = None,
+                        end_id: int | None = None,
+                        ) -> Select:
+        pass
+
+    @abstractmethod
+    async def user_id_boundaries(self,
+                                 enterprise_id: int,
+                                 chunk_size: int,
+                                 receive_post: bool | None = None,
+                                 receive_vacancy: bool | None = None,
+                                 ) -> list[int]:
+        pass
+
+    @abstractmethod
+    async def count_user_ids(self,
+                             enterprise_id: int,
+                             receive_post: bool | None = None,
+                             receive_vacancy: bool | None = None,
+                             limit: int | None = None,
+                             ) -> int:
+        pass
+
+    @abstractmethod
+    def stream_user_ids(self,
+                        enterprise_id: int,
+                        receive_post: bool | None = None,
+                        receive_vacancy: bool | None = None,
+                        chunk_size: int = FANOUT_CHUNK_SIZE,
+                        ) -> AsyncIterator[list[int]]:
+        pass
@@ -1,16 +1,13 @@
 from abc import ABC, abstractmethod
 
 from configs.db.database import EnterpriseMetricEntity
-from schemas.event_message_metric_schemas import EventMessageMetric, SumRedEnum
+from schemas.event_message_metric_schemas import EventMessageMetric
 
 
 class EnterpriseMetricServiceBase(ABC):
 
     @abstractmethod
-    async def update_metric(self, enterprise_id: int, column_name: str, action: SumRedEnum) -> None:
-        pass
-    @abstractmethod
-    async def save_metric(self, metric: EnterpriseMetricEntity, event: EventMessageMetric):
+    async def update_metric(self, event: EventMessageMetric) -> int | None:
         pass
 
     @abstractmethod
@@ -1,7 +1,11 @@
 from abc import ABC, abstractmethod
+from typing import AsyncIterator
 
-from configs.db.database import NotificationEntity, FollowerRelationshipEntity, EnterpriseFollowsUserEntity
+from sqlalchemy import Select
+
+from configs.db.database import NotificationEntity, NotificationBroadcastEntity
 from schemas.event_notification import EventNotification
+from schemas.notification_page import NotificationCursor, NotificationPage
 
 
 class NotificationServiceBase(ABC):
@@ -11,10 +15,10 @@ class NotificationServiceBase(ABC):
         pass
 
     @abstractmethod
-    async def notify_users_by_event_follow_by_enterprise(self,
-                                                         follows: list[EnterpriseFollowsUserEntity],
-                                                         event: EventNotification
-                                                         ):
+    async def notify_followers_by_event_enterprise(self,
+                                                   user_ids: AsyncIterator[list[int]],
+                                                   event: EventNotification
+                                                   ) -> int:
         pass
 
     @abstractmethod
@@ -22,10 +26,62 @@ class NotificationServiceBase(ABC):
         pass
 
     @abstractmethod
-    async def notify_users_by_event_follow(self,
-                                           follows: list[FollowerRelationshipEntity],
-                                           event: EventNotification
-                                           ):
+    async def notify_followers_by_event(self,
+                                        follower_ids: AsyncIterator[list[int]],
+                                        event: EventNotification
+                                        ) -> int:
+        pass
+
+    @abstractmethod
+    async def notify_followers_from_select(self,
+                                          recipients: Select,
+                                          event: EventNotification,
+                                          params_id: int | None = None,
+                                          ) -> int:
+        pass
+
+    @abstractmethod
+    async def notify_followers_from_select_enterprise(self,
+                                                     recipients: Select,
+                                                     event: EventNotification,
+                                                     params_id: int | None = None,
+                                                     ) -> int:
+        pass
+
+    @abstractmethod
+    async def store_params(self, event: EventNotification, is_enterprise: bool) -> int | None:
+        pass
+
+    @abstractmethod
+    async def broadcast_to_followers(self, event: EventNotification) -> NotificationBroadcastEntity:
+        pass
+
+    @abstractmethod
+    async def broadcast_to_followers_enterprise(self, event: EventNotification) -> NotificationBroadcastEntity:
+        pass
+
+    @abstractmethod
+    async def get_feed(self, user_id: int, limit: int, cursor: NotificationCursor | None = None) -> NotificationPage:
+        pass
+
+    @abstractmethod
+    async def mark_broadcasts_read(self, user_id: int, broadcast_id: int) -> None:
+        pass
+
+    @abstractmethod
+    async def get_unread_count(self, user_id: int) -> int:
+        pass
+
+    @abstractmethod
+    async def mark_read(self, user_id: int, ids: list[int] | None = None, broadcast_id: int | None = None) -> int:
+        pass
+
+    @abstractmethod
+    async def publish_pending(self) -> None:
+        pass
+
+    @abstractmethod
+    def discard_pending(self) -> None:
         pass
 
     @abstractmethod
@@ -10,5 +10,5 @@ class PostEnterpriseMetricServiceBase(ABC):
         pass
 
     @abstractmethod
-    async def save_metric(self, metric: PostEnterpriseMetricEntity, event: EventMessageMetric):
+    async def update_metric(self, event: EventMessageMetric) -> int | None:
         pass
@@ -7,7 +7,7 @@ from schemas.event_message_metric_schemas import EventMessageMetric
 class PostUserMetricServiceBase(ABC):
 
     @abstractmethod
-    async def save_metric(self, metric: PostUserMetricEntity, event: EventMessageMetric):
+    async def update_metric(self, event: EventMessageMetric) -> int | None:
         pass
 
     @abstractmethod
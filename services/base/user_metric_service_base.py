@@ -11,7 +11,7 @@ class UserMetricServiceBase(ABC):
         pass
 
     @abstractmethod
-    async def save_metric(self, metric: UserMetricEntity, event: EventMessageMetric):
+    async def update_metric(self, event: EventMessageMetric) -> int | None:
         pass
 
     @abstractmethod
@@ -7,7 +7,7 @@ from schemas.event_message_metric_schemas import EventMessageMetric
 class VacancyMetricServiceBase(ABC):
 
     @abstractmethod
-    async def save_metric(self, metric: VacancyMetricEntity, event: EventMessageMetric):
+    async def update_metric(self, event: EventMessageMetric) -> int | None:
         pass
 
     @abstractmethod
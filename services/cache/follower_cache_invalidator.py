@@ -0,0 +1,51 @@
+from typing import Final
+
+import structlog
+
+from configs.db.kafka import get_kafka_consumer, producer_manager, FOLLOWER_CACHE_INVALIDATION_TOPIC
+from schemas.fanout_chunk import FanoutAudienceEnum
+from schemas.follower_cache_invalidation import FollowerCacheInvalidation
+from services.cache.follower_id_cache import FollowerIdCache, follower_id_cache
+
+logger = structlog.get_logger()
+
+
+class FollowerCacheInvalidator:
+    def __init__(self, cache: FollowerIdCache):
+        self.cache = cache
+
+    async def publish(self, audience: FanoutAudienceEnum, actor_id: int) -> None:
+        self.cache.invalidate_actor(audience.value, actor_id)
+
+        if not self.cache.enabled:
+            return
+
+        message = FollowerCacheInvalidation(audience=audience, actor_id=actor_id)
+
+        # the other instances fall back to the TTL when the message can't be sent
+        try:
+            await producer_manager.send_and_wait(FOLLOWER_CACHE_INVALIDATION_TOPIC, message.model_dump_json().encode("utf-8"))
+        except Exception as e:
+            logger.warning("Failed to publish follower cache invalidation", error=str(e), actor_id=actor_id)
+
+    async def run(self) -> None:
+        if not self.cache.enabled:
+            return
+
+        # no group: every instance reads every invalidation, starting from the moment it came up
+        consumer = await get_kafka_consumer(
+            FOLLOWER_CACHE_INVALIDATION_TOPIC, group_id=None, enable_auto_commit=False, auto_offset_reset="latest"
+        )
+
+        try:
+            async for msg in consumer:
+                try:
+                    message = FollowerCacheInvalidation.model_validate_json(msg.value.decode("utf-8"))
+                    self.cache.invalidate_actor(message.audience.value, message.actor_id)
+                except Exception as e:
+                    logger.error("Invalid follower cache invalidation", error=str(e), message_value=msg.value.decode("utf-8"))
+        finally:
+            await consumer.stop()
+
+
+follower_cache_invalidator: Final[FollowerCacheInvalidator] = FollowerCacheInvalidator(follower_id_cache)
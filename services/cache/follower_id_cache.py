@@ -0,0 +1,119 @@
+import sys
+import time
+from array import array
+from collections import OrderedDict
+from typing import Final, Hashable
+
+import structlog
+
+from configs.notification.notification_config import FOLLOWER_CACHE_MAX_BYTES, FOLLOWER_CACHE_TTL_SECONDS
+
+logger = structlog.get_logger()
+
+# (audience, actor_id, *preference flags), count entries add ("count", limit)
+FollowerCacheKey = tuple[Hashable, ...]
+FollowerCacheValue = array | int
+
+# actors whose last invalidation is remembered exactly, older ones share the clock of the last one forgotten
+INVALIDATION_LOG_SIZE: Final[int] = 100000
+
+
+class FollowerIdCache:
+    def __init__(self, max_bytes: int = FOLLOWER_CACHE_MAX_BYTES, ttl_seconds: int = FOLLOWER_CACHE_TTL_SECONDS):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[FollowerCacheKey, tuple[FollowerCacheValue, float]] = OrderedDict()
+        self._bytes = 0
+        # every invalidation ticks the clock, a value read before an invalidation of its actor is never stored
+        self._clock = 0
+        self._invalidated_at: OrderedDict[tuple[Hashable, int], int] = OrderedDict()
+        self._forgotten_at = 0
+        self.stale_puts = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def token(self) -> int:
+        return self._clock
+
+    def get(self, key: FollowerCacheKey) -> FollowerCacheValue | None:
+        entry = self._entries.get(key)
+
+        if entry is not None and time.monotonic() - entry[1] > self.ttl_seconds:
+            self._remove(key)
+            entry = None
+
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+
+        return entry[0]
+
+    def put(self, key: FollowerCacheKey, value: FollowerCacheValue, token: int) -> None:
+        size = sys.getsizeof(value)
+
+        # a single set larger than the whole budget would only flush everything else out
+        if not self.enabled or size > self.max_bytes:
+            return
+
+        if self._invalidated_at.get((key[0], key[1]), self._forgotten_at) > token:
+            self.stale_puts += 1
+            return
+
+        if key in self._entries:
+            self._remove(key)
+
+        self._entries[key] = (value, time.monotonic())
+        self._bytes += size
+
+        while self._bytes > self.max_bytes:
+            _, (evicted, _) = self._entries.popitem(last=False)
+            self._bytes -= sys.getsizeof(evicted)
+            self.evictions += 1
+
+    def invalidate_actor(self, audience: str, actor_id: int) -> int:
+        self._clock += 1
+        self._invalidated_at[(audience, actor_id)] = self._clock
+        self._invalidated_at.move_to_end((audience, actor_id))
+
+        while len(self._invalidated_at) > INVALIDATION_LOG_SIZE:
+            _, self._forgotten_at = self._invalidated_at.popitem(last=False)
+
+        keys = [key for key in self._entries if key[0] == audience and key[1] == actor_id]
+
+        for key in keys:
+            self._remove(key)
+
+        self.invalidations += len(keys)
+
+        return len(keys)
+
+    def stats(self) -> dict:
+        requests = self.hits + self.misses
+
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / requests if requests else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "stale_puts": self.stale_puts,
+        }
+
+    def _remove(self, key: FollowerCacheKey) -> None:
+        value, _ = self._entries.pop(key)
+        self._bytes -= sys.getsizeof(value)
+
+
+follower_id_cache: Final[FollowerIdCache] = FollowerIdCache()
@@ -0,0 +1,99 @@
+import heapq
+import time
+from collections import OrderedDict
+from typing import Final
+
+import structlog
+
+from configs.notification.notification_config import (
+    FANOUT_BUDGET_ROWS, FANOUT_BUDGET_WINDOW_SECONDS, FANOUT_BUDGET_MAX_ACTORS
+)
+
+logger = structlog.get_logger()
+
+# (is_enterprise, actor_id)
+FanoutBudgetKey = tuple[bool, int]
+
+
+class FanoutRateLimiter:
+    def __init__(
+        self,
+        capacity: int = FANOUT_BUDGET_ROWS,
+        window_seconds: int = FANOUT_BUDGET_WINDOW_SECONDS,
+        max_actors: int = FANOUT_BUDGET_MAX_ACTORS,
+    ):
+        self.capacity = capacity
+        self.refill_per_second = capacity / max(1, window_seconds)
+        self.max_actors = max_actors
+        # key -> (tokens, last refill), an evicted actor simply starts again with a full bucket
+        self._buckets: OrderedDict[FanoutBudgetKey, tuple[float, float]] = OrderedDict()
+        self.consumed_rows = 0
+        self.allowed = 0
+        self.rejected = 0
+        self.rejected_rows = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.capacity > 0
+
+    def try_consume(self, key: FanoutBudgetKey, rows: int) -> bool:
+        if not self.enabled:
+            return True
+
+        tokens = self._refill(key)
+
+        if rows > tokens:
+            self._buckets[key] = (tokens, time.monotonic())
+            self.rejected += 1
+            self.rejected_rows += rows
+
+            logger.warning("Fan-out budget exhausted", is_enterprise=key[0], actor_id=key[1], rows=rows, tokens=int(tokens))
+
+            return False
+
+        self._buckets[key] = (tokens - rows, time.monotonic())
+        self.allowed += 1
+        self.consumed_rows += rows
+
+        return True
+
+    def remaining(self, key: FanoutBudgetKey) -> int:
+        return int(self._tokens(key))
+
+    def stats(self, top: int = 10) -> dict:
+        usage = heapq.nsmallest(top, ((self.remaining(key), key) for key in self._buckets))
+
+        return {
+            "capacity": self.capacity,
+            "refill_per_second": self.refill_per_second,
+            "actors": len(self._buckets),
+            "allowed": self.allowed,
+            "rejected": self.rejected,
+            "consumed_rows": self.consumed_rows,
+            "rejected_rows": self.rejected_rows,
+            "top_actors": [
+                {"is_enterprise": key[0], "actor_id": key[1], "used": self.capacity - remaining}
+                for remaining, key in usage
+            ],
+        }
+
+    def _tokens(self, key: FanoutBudgetKey) -> float:
+        entry = self._buckets.get(key)
+
+        if entry is None:
+            return float(self.capacity)
+
+        return min(self.capacity, entry[0] + (time.monotonic() - entry[1]) * self.refill_per_second)
+
+    def _refill(self, key: FanoutBudgetKey) -> float:
+        tokens = self._tokens(key)
+
+        if key in self._buckets:
+            self._buckets.move_to_end(key)
+        elif len(self._buckets) >= self.max_actors:
+            self._buckets.popitem(last=False)
+
+        return tokens
+
+
+fanout_rate_limiter: Final[FanoutRateLimiter] = FanoutRateLimiter()
@@ -1,10 +1,19 @@
+from array import array
+from typing import AsyncIterator
+
+from sqlalchemy import Select
+
+from configs.notification.notification_config import FANOUT_CHUNK_SIZE
 from repositories.provider.enterprise_follow_user_repository_provider import EnterpriseFollowUserRepositoryProvider
 from services.base.enterprise_follow_user_service_base import EnterpriseFollowUserServiceBase
+from schemas.fanout_chunk import FanoutAudienceEnum
+from services.cache.follower_id_cache import FollowerIdCache
 
 
 class EnterpriseFollowUserServiceProvider(EnterpriseFollowUserServiceBase):
-    def __init__(self, repository: EnterpriseFollowUserRepositoryProvider):
+    def __init__(self, repository: EnterpriseFollowUserRepositoryProvider, cache: FollowerIdCache | None = None):
         self.repository = repository
+        self.cache = cache
 
     async def get_all(self,
                       enterprise_id: int | None,
@@ -21,3 +30,85 @@ class EnterpriseFollowUserServiceProvider(EnterpriseFollowUserServiceBase):
             receive_vacancy=receive_vacancy,
         )
 
+    def user_ids_select(self,
+                        enterprise_id: int,
+                        receive_post: bool | None = None,
+                        receive_vacancy: bool | None = None,
+                        start_id: int | None = None,
+                        end_id: int | None = None,
+                        ) -> Select:
+        return self.repository.user_ids_select(
+            enterprise_id=enterprise_id,
+            receive_post=receive_post,
+            receive_vacancy=receive_vacancy,
+            start_id=start_id,
+            end_id=end_id,
+        )
+
+    async def user_id_boundaries(self,
+                                 enterprise_id: int,
+                                 chunk_size: int,
+                                 receive_post: bool | None = None,
+                                 receive_vacancy: bool | None = None,
+                                 ) -> list[int]:
+        return await self.repository.user_id_boundaries(
+            enterprise_id=enterprise_id,
+            chunk_size=chunk_size,
+            receive_post=receive_post,
+            receive_vacancy=receive_vacancy,
+        )
+
+    async def count_user_ids(self,
+                             enterprise_id: int,
+                             receive_post: bool | None = None,
+                             receive_vacancy: bool | None = None,
+                             limit: int | None = None,
+                             ) -> int:
+        key = (FanoutAudienceEnum.ENTERPRISE_FOLLOWERS.value, enterprise_id, receive_post, receive_vacancy, "count", limit)
+        token = self.cache.token() if self.cache is not None else 0
+        cached = self.cache.get(key) if self.cache is not None and self.cache.enabled else None
+
+        if cached is not None:
+            return cached
+
+        count = await self.repository.count_user_ids(
+            enterprise_id=enterprise_id,
+            receive_post=receive_post,
+            receive_vacancy=receive_vacancy,
+            limit=limit,
+        )
+
+        if self.cache is not None:
+            self.cache.put(key, count, token)
+
+        return count
+
+    async def stream_user_ids(self,
+                              enterprise_id: int,
+                              receive_post: bool | None = None,
+                              receive_vacancy: bool | None = None,
+                              chunk_size: int = FANOUT_CHUNK_SIZE,
+                              ) -> AsyncIterator[list[int]]:
+        key = (FanoutAudienceEnum.ENTERPRISE_FOLLOWERS.value, enterprise_id, receive_post, receive_vacancy)
+        token = self.cache.token() if self.cache is not None else 0
+        cached = self.cache.get(key) if self.cache is not None and self.cache.enabled else None
+
+        if cached is not None:
+            for start in range(0, len(cached), chunk_size):
+                yield cached[start:start + chunk_size].tolist()
+
+            return
+
+        collected = array("q")
+
+        async for user_ids in self.repository.stream_user_ids(
+            enterprise_id=enterprise_id,
+            receive_post=receive_post,
+            receive_vacancy=receive_vacancy,
+            chunk_size=chunk_size,
+        ):
+            collected.extend(user_ids)
+            yield user_ids
+
+        if self.cache is not None:
+            self.cache.put(key, collected, token)
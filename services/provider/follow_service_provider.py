@@ -1,11 +1,26 @@
+from array import array
+from typing import AsyncIterator
+
+from sqlalchemy import Select
+
 from configs.db.database import FollowerRelationshipEntity
+from configs.notification.notification_config import FANOUT_CHUNK_SIZE
 from repositories.provider.follow_repository_provider import FollowRepositoryProvider
 from services.base.follow_service_base import FollowServiceBase
+from schemas.fanout_chunk import FanoutAudienceEnum
+from services.cache.follower_cache_invalidator import FollowerCacheInvalidator
+from services.cache.follower_id_cache import FollowerIdCache
 
 
 class FollowServiceProvider(FollowServiceBase):
-    def __init__(self, repository: FollowRepositoryProvider):
+    def __init__(self,
+        repository: FollowRepositoryProvider,
+        cache: FollowerIdCache | None = None,
+        invalidator: FollowerCacheInvalidator | None = None,
+    ):
         self.repository = repository
+        self.cache = cache
+        self.invalidator = invalidator
 
     async def get_all(self,
         follower_id: int | None = None,
@@ -18,4 +33,93 @@ class FollowServiceProvider(FollowServiceBase):
             followed_id=followed_id,
             receive_post=receive_post,
             receive_comment=receive_comment,
-        )
\ No newline at end of file
+        )
+
+    def follower_ids_select(self,
+        followed_id: int,
+        receive_post: bool | None = None,
+        receive_comment: bool | None = None,
+        start_id: int | None = None,
+        end_id: int | None = None,
+    ) -> Select:
+        return self.repository.follower_ids_select(
+            followed_id=followed_id,
+            receive_post=receive_post,
+            receive_comment=receive_comment,
+            start_id=start_id,
+            end_id=end_id,
+        )
+
+    async def follower_id_boundaries(self,
+        followed_id: int,
+        chunk_size: int,
+        receive_post: bool | None = None,
+        receive_comment: bool | None = None,
+    ) -> list[int]:
+        return await self.repository.follower_id_boundaries(
+            followed_id=followed_id,
+            chunk_size=chunk_size,
+            receive_post=receive_post,
+            receive_comment=receive_comment,
+        )
+
+    async def count_follower_ids(self,
+        followed_id: int,
+        receive_post: bool | None = None,
+        receive_comment: bool | None = None,
+        limit: int | None = None,
+    ) -> int:
+        key = (FanoutAudienceEnum.FOLLOWERS.value, followed_id, receive_post, receive_comment, "count", limit)
+        token = self.cache.token() if self.cache is not None else 0
+        cached = self.cache.get(key) if self.cache is not None and self.cache.enabled else None
+
+        if cached is not None:
+            return cached
+
+        count = await self.repository.count_follower_ids(
+            followed_id=followed_id,
+            receive_post=receive_post,
+            receive_comment=receive_comment,
+            limit=limit,
+        )
+
+        if self.cache is not None:
+            self.cache.put(key, count, token)
+
+        return count
+
+    async def stream_follower_ids(self,
+        followed_id: int,
+        receive_post: bool | None = None,
+        receive_comment: bool | None = None,
+        chunk_size: int = FANOUT_CHUNK_SIZE,
+    ) -> AsyncIterator[list[int]]:
+        key = (FanoutAudienceEnum.FOLLOWERS.value, followed_id, receive_post, receive_comment)
+        token = self.cache.token() if self.cache is not None else 0
+        cached = self.cache.get(key) if self.cache is not None and self.cache.enabled else None
+
+        if cached is not None:
+            for start in range(0, len(cached), chunk_size):
+                yield cached[start:start + chunk_size].tolist()
+
+            return
+
+        collected = array("q")
+
+        async for follower_ids in self.repository.stream_follower_ids(
+            followed_id=followed_id,
+            receive_post=receive_post,
+            receive_comment=receive_comment,
+            chunk_size=chunk_size,
+        ):
+            collected.extend(follower_ids)
+            yield follower_ids
+
+        if self.cache is not None:
+            self.cache.put(key, collected, token)
+
+    async def invalidate_follower_ids(self, followed_id: int) -> None:
+        if self.invalidator is not None:
+            await self.invalidator.publish(FanoutAudienceEnum.FOLLOWERS, followed_id)
+        elif self.cache is not None:
+            self.cache.invalidate_actor(FanoutAudienceEnum.FOLLOWERS.value, followed_id)
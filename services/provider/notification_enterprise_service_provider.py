@@ -1,13 +1,26 @@
+from datetime import datetime, timezone
+
 from configs.db.database import NotificationEnterpriseEntity
 from configs.db.enums import NotificationTypeEnum
 from repositories.provider.notification_enterprise_repository_provider import NotificationEnterpriseRepositoryProvider
+from repositories.provider.notification_unread_counter_repository_provider import NotificationUnreadCounterRepositoryProvider
 from schemas.event_notification import EventNotification
+from schemas.notification_page import NotificationCursor, NotificationItem, NotificationPage
+from schemas.notification_push import NotificationPushMessage
 from services.base.notification_enterprise_service_base import NotificationEnterpriseServiceBase
+from services.push.notification_push_hub import NotificationPushHub
 
 
 class NotificationEnterpriseServiceProvider(NotificationEnterpriseServiceBase):
-    def __init__(self, repository: NotificationEnterpriseRepositoryProvider):
+    def __init__(self,
+                 repository: NotificationEnterpriseRepositoryProvider,
+                 counter_repository: NotificationUnreadCounterRepositoryProvider,
+                 push_hub: NotificationPushHub | None = None,
+                 ):
         self.repository = repository
+        self.counter_repository = counter_repository
+        self.push_hub = push_hub
+        self._pending_pushes: list[tuple[int, NotificationPushMessage]] = []
 
     async def create_notify(self, event: EventNotification):
         actor_name = event.data.get("actor_name", None)
@@ -33,4 +46,43 @@ class NotificationEnterpriseServiceProvider(NotificationEnterpriseServiceBase):
             entity_id = event.entity_id
         )
 
-        await self.repository.add(notify)
\ No newline at end of file
+        # staged in the unit of work, so the row and the badge commit together
+        await self.repository.stage(notify)
+        await self.counter_repository.increment([event.actor_id], is_enterprise=True)
+
+        if self.push_hub is not None and self.push_hub.connected([event.actor_id], is_enterprise=True):
+            self._pending_pushes.append((event.actor_id, NotificationPushMessage(
+                type=event.event_type,
+                title=notify.title,
+                content=notify.content,
+                entity_id=event.entity_id,
+                created_at=datetime.now(timezone.utc),
+            )))
+
+    async def publish_pending(self) -> None:
+        pushes, self._pending_pushes = self._pending_pushes, []
+
+        for enterprise_id, message in pushes:
+            self.push_hub.publish([enterprise_id], message, is_enterprise=True)
+
+    def discard_pending(self) -> None:
+        self._pending_pushes = []
+
+    async def get_page(self, enterprise_id: int, limit: int, cursor: NotificationCursor | None = None) -> NotificationPage:
+        notifications = await self.repository.get_page(
+            enterprise_id,
+            limit + 1,
+            before_created_at=cursor.created_at if cursor else None,
+            before_id=cursor.id if cursor else None,
+        )
+
+        return NotificationPage.build([NotificationItem.model_validate(n) for n in notifications], limit)
+
+    async def get_unread_count(self, enterprise_id: int) -> int:
+        return await self.counter_repository.get_unread(enterprise_id, is_enterprise=True)
+
+    async def mark_read(self, enterprise_id: int, ids: list[int] | None = None) -> int:
+        count = await self.repository.mark_read(enterprise_id, ids)
+        await self.counter_repository.decrement(enterprise_id, count, is_enterprise=True)
+
+        return count
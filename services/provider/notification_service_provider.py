@@ -1,112 +1,332 @@
-from configs.db.database import NotificationEntity, FollowerRelationshipEntity, UserEntity, EnterpriseFollowsUserEntity
-from configs.db.enums import NotificationTypeEnum
+from datetime import datetime, timezone
+from typing import AsyncIterator
+
+import structlog
+from sqlalchemy import Select, RowMapping
+
+from configs.db.database import NotificationEntity, NotificationBroadcastEntity
+from configs.notification.notification_config import FANOUT_COPY_EVENT_TYPES, UNREAD_BROADCAST_COUNT_LIMIT
+from repositories.provider.notification_broadcast_repository_provider import NotificationBroadcastRepositoryProvider
+from repositories.provider.notification_params_repository_provider import NotificationParamsRepositoryProvider
+from repositories.provider.notification_unread_counter_repository_provider import NotificationUnreadCounterRepositoryProvider
 from repositories.provider.notify_repository_provider import NotifyRepositoryProvider
 from schemas.event_notification import EventNotification
+from schemas.notification_page import NotificationCursor, NotificationItem, NotificationPage
+from schemas.notification_push import NotificationPushMessage
 from services.base.notification_service_base import NotificationServiceBase
+from services.push.notification_push_hub import NotificationPushHub
+from templates.notification_templates import FOLLOW_TEMPLATES, render_notification
+
+logger = structlog.get_logger()
 
 
 class NotificationServiceProvider(NotificationServiceBase):
-    def __init__(self, repository: NotifyRepositoryProvider):
+    def __init__(self,
+                 repository: NotifyRepositoryProvider,
+                 broadcast_repository: NotificationBroadcastRepositoryProvider,
+                 counter_repository: NotificationUnreadCounterRepositoryProvider,
+                 params_repository: NotificationParamsRepositoryProvider,
+                 push_hub: NotificationPushHub | None = None,
+                 ):
         self.repository = repository
+        self.broadcast_repository = broadcast_repository
+        self.counter_repository = counter_repository
+        self.params_repository = params_repository
+        self.push_hub = push_hub
+        self._pending_pushes: list[tuple[list[int], NotificationPushMessage]] = []
+        self._pending_broadcasts: list[tuple[NotificationBroadcastEntity, NotificationPushMessage]] = []
 
     async def notify_about_notification_system(self, event: EventNotification):
-        title = event.data.get("title")
-        content = event.data.get("content")
+        title = event.data.get("title") or ""
+        content = event.data.get("content") or ""
 
-        notify = NotificationEntity(
-            user_id=event.actor_id,
-            title=title,
-            content=content,
-            link=None,
-            type=event.event_type,
-            entity_id=event.entity_id
-        )
+        # staged in the unit of work, so the row and the badge commit together and a replay inserts neither
+        inserted = await self.repository.insert_many([{
+            "event_id": str(event.event_id),
+            "user_id": event.actor_id,
+            "title": title,
+            "content": content,
+            "link": None,
+            "type": event.event_type,
+            "entity_id": event.entity_id,
+        }])
+        await self.counter_repository.increment(inserted)
 
-        await self.repository.add(notify)
+        self._queue_push(inserted, event, title, content)
 
     async def get_by_id(self, _id) -> NotificationEntity | None:
         return await self.repository.get_by_id(_id)
 
     async def notify_about_new_follow(self, event: EventNotification):
         user_name = event.data.get("user_name", None)
-        notify = NotificationEntity(
-            user_id=event.entity_id,
-            title=f"{user_name} started following you!",
-            content="You have a new follower.",
-            link=None,
+        title = f"{user_name} started following you!"
+        content = "You have a new follower."
+
+        inserted = await self.repository.insert_many([{
+            "event_id": str(event.event_id),
+            "user_id": event.entity_id,
+            "title": title,
+            "content": content,
+            "link": None,
+            "type": event.event_type,
+            "entity_id": event.actor_id,
+        }])
+        await self.counter_repository.increment(inserted)
+
+        self._queue_push(inserted, event, title, content)
+
+    async def notify_followers_by_event(self,
+                                        follower_ids: AsyncIterator[list[int]],
+                                        event: EventNotification
+                                        ) -> int:
+        template, params = self._follow_template(event)
+
+        return await self._notify_in_chunks(follower_ids, event, template, params)
+
+    async def notify_followers_by_event_enterprise(self,
+                                                   user_ids: AsyncIterator[list[int]],
+                                                   event: EventNotification
+                                                   ) -> int:
+        template, params = self._enterprise_follow_template(event)
+
+        return await self._notify_in_chunks(user_ids, event, template, params)
+
+    async def notify_followers_from_select(self,
+                                          recipients: Select,
+                                          event: EventNotification,
+                                          params_id: int | None = None,
+                                          ) -> int:
+        template, params = self._follow_template(event)
+
+        return await self._notify_from_select(recipients, event, template, params, params_id)
+
+    async def notify_followers_from_select_enterprise(self,
+                                                     recipients: Select,
+                                                     event: EventNotification,
+                                                     params_id: int | None = None,
+                                                     ) -> int:
+        template, params = self._enterprise_follow_template(event)
+
+        return await self._notify_from_select(recipients, event, template, params, params_id)
+
+    async def store_params(self, event: EventNotification, is_enterprise: bool) -> int | None:
+        template, params = self._enterprise_follow_template(event) if is_enterprise else self._follow_template(event)
+
+        if template is None:
+            return None
+
+        return await self.params_repository.get_or_create(str(event.event_id), params)
+
+    async def broadcast_to_followers(self, event: EventNotification) -> NotificationBroadcastEntity:
+        title, content = render_notification(*self._follow_template(event))
+
+        return await self._broadcast(event, False, title, content)
+
+    async def broadcast_to_followers_enterprise(self, event: EventNotification) -> NotificationBroadcastEntity:
+        title, content = render_notification(*self._enterprise_follow_template(event))
+
+        return await self._broadcast(event, True, title, content)
+
+    async def get_feed(self, user_id: int, limit: int, cursor: NotificationCursor | None = None) -> NotificationPage:
+        rows = await self.broadcast_repository.get_feed(
+            user_id,
+            limit + 1,
+            before_created_at=cursor.created_at if cursor else None,
+            before_id=cursor.id if cursor else None,
+            before_broadcast=cursor.is_broadcast if cursor else False,
+        )
+
+        return NotificationPage.build([NotificationItem.model_validate(self._render(row)) for row in rows], limit)
+
+    async def mark_broadcasts_read(self, user_id: int, broadcast_id: int) -> None:
+        await self.broadcast_repository.mark_read(user_id, broadcast_id)
+
+    async def get_unread_count(self, user_id: int) -> int:
+        unread = await self.counter_repository.get_unread(user_id)
+        unread_broadcasts = await self.broadcast_repository.count_unread(user_id, UNREAD_BROADCAST_COUNT_LIMIT)
+
+        return unread + unread_broadcasts
+
+    async def mark_read(self, user_id: int, ids: list[int] | None = None, broadcast_id: int | None = None) -> int:
+        count = await self.repository.mark_read(user_id, ids)
+        await self.counter_repository.decrement(user_id, count)
+
+        # broadcasts have no per-user row, reading them moves the cursor, to the newest visible one when marking all
+        if ids is None and broadcast_id is None:
+            broadcast_id = await self.broadcast_repository.latest_id(user_id)
+
+        if broadcast_id is not None:
+            await self.mark_broadcasts_read(user_id, broadcast_id)
+
+        return count
+
+    async def publish_pending(self) -> None:
+        pushes, self._pending_pushes = self._pending_pushes, []
+        broadcasts, self._pending_broadcasts = self._pending_broadcasts, []
+
+        for user_ids, message in pushes:
+            self.push_hub.publish(user_ids, message)
+
+        for broadcast, message in broadcasts:
+            try:
+                user_ids = await self.broadcast_repository.audience_among(broadcast, self.push_hub.connected_owner_ids())
+            except Exception as e:
+                logger.warning("Failed to resolve broadcast push audience", error=str(e), id=broadcast.id)
+                continue
+
+            self.push_hub.publish(user_ids, message)
+
+    def discard_pending(self) -> None:
+        self._pending_pushes = []
+        self._pending_broadcasts = []
+
+    def _queue_push(self, user_ids: list[int], event: EventNotification, title: str, content: str) -> None:
+        # only recipients connected to this instance are kept, so a large fan-out costs nothing here
+        user_ids = self.push_hub.connected(user_ids) if self.push_hub is not None else []
+
+        if user_ids:
+            self._pending_pushes.append((user_ids, self._push_message(event, title, content)))
+
+    @staticmethod
+    def _push_message(event: EventNotification, title: str, content: str, is_broadcast: bool = False) -> NotificationPushMessage:
+        return NotificationPushMessage(
             type=event.event_type,
-            entity_id=event.actor_id
+            title=title,
+            content=content,
+            entity_id=event.entity_id,
+            is_broadcast=is_broadcast,
+            created_at=datetime.now(timezone.utc),
         )
 
-        await self.repository.add(notify)
+    async def _broadcast(self,
+                         event: EventNotification,
+                         is_enterprise: bool,
+                         title: str,
+                         content: str
+                         ) -> NotificationBroadcastEntity:
+        broadcast = await self.broadcast_repository.add(NotificationBroadcastEntity(
+            actor_id=event.actor_id,
+            is_enterprise=is_enterprise,
+            title=title,
+            content=content,
+            link=None,
+            type=event.event_type,
+            entity_id=event.entity_id
+        ))
 
-    async def notify_users_by_event_follow(self,
-                                    follows: list[FollowerRelationshipEntity],
-                                    event: EventNotification
-                                    ):
+        logger.info("Notification broadcast added", id=broadcast.id, type=event.event_type.name, actor_id=event.actor_id)
 
-        notifies = []
-        title = ""
-        content = ""
+        if self.push_hub is not None and self.push_hub.connected_owner_ids():
+            self._pending_broadcasts.append((broadcast, self._push_message(event, title, content, is_broadcast=True)))
 
-        user_name = event.data.get("user_name", None)
-        actor_name = event.data.get("actor_name", None)
+        return broadcast
 
-        for follow in follows:
+    @staticmethod
+    def _follow_template(event: EventNotification) -> tuple[str | None, dict]:
+        count = event.data.get("count", 1)
 
-            if event.event_type == NotificationTypeEnum.NEW_COMMENT:
-                title = f"The user {user_name} created a new comment!"
-                content = f"The user you follow, {user_name}, just created a new comment!"
+        return FOLLOW_TEMPLATES.get((event.event_type, count > 1)), {
+            "user_name": event.data.get("user_name", None),
+            "count": count,
+        }
 
-            if event.event_type == NotificationTypeEnum.NEW_POST:
-                title = f"The user {user_name} created a new post!"
-                content = f"The user you follow, {user_name}, just created a new post!"
+    @staticmethod
+    def _enterprise_follow_template(event: EventNotification) -> tuple[str | None, dict]:
+        count = event.data.get("count", 1)
 
-            recipient_user_id = follow.follower_id
+        return FOLLOW_TEMPLATES.get((event.event_type, count > 1)), {
+            "actor_name": event.data.get("actor_name", None),
+            "count": count,
+        }
 
-            notify = NotificationEntity(
-                user_id=recipient_user_id,
-                title=title,
-                content=content,
-                link=None,
-                type=event.event_type,
-                entity_id=event.entity_id
-            )
+    @staticmethod
+    def _render(row: RowMapping) -> dict:
+        item = dict(row)
 
-            notifies.append(notify)
+        if item["template"] is not None:
+            item["title"], item["content"] = render_notification(item["template"], item["params"])
 
-        await self.repository.add_all(notifies)
+        # system rows written before missing text defaulted to "" were stored with NULL title or content
+        item["title"] = item["title"] or ""
+        item["content"] = item["content"] or ""
+
+        return item
+
+    async def _stored_text(self,
+                           event: EventNotification,
+                           template: str | None,
+                           params: dict,
+                           params_id: int | None = None,
+                           ) -> dict:
+        # every recipient of the event points at one parameter record instead of carrying its own rendered copy
+        if template is None:
+            return {"title": "", "content": "", "template": None, "params_id": None}
+
+        if params_id is None:
+            params_id = await self.params_repository.get_or_create(str(event.event_id), params)
+
+        return {"title": None, "content": None, "template": template, "params_id": params_id}
+
+    async def _notify_from_select(self,
+                                  recipients: Select,
+                                  event: EventNotification,
+                                  template: str | None,
+                                  params: dict,
+                                  params_id: int | None = None,
+                                  ) -> int:
+        stored = await self._stored_text(event, template, params, params_id)
+
+        user_ids = await self.repository.insert_from_select(
+            recipients,
+            stored["title"],
+            stored["content"],
+            event.event_type,
+            event.entity_id,
+            str(event.event_id),
+            template=stored["template"],
+            params_id=stored["params_id"],
+        )
+        await self.counter_repository.increment(user_ids)
+        self._queue_push(user_ids, event, *render_notification(template, params))
 
-    async def notify_users_by_event_follow_by_enterprise(self,
-                                    follows: list[EnterpriseFollowsUserEntity],
-                                    event: EventNotification
-                                    ):
+        count = len(user_ids)
 
-        notifies = []
-        title = ""
-        content = ""
+        logger.info("Notifications added successfully", count=count, type=event.event_type.name, entity_id=event.entity_id)
 
-        actor_name = event.data.get("actor_name", None)
+        return count
 
-        for follow in follows:
+    async def _notify_in_chunks(self,
+                                user_ids: AsyncIterator[list[int]],
+                                event: EventNotification,
+                                template: str | None,
+                                params: dict
+                                ) -> int:
+        count = 0
+        stored = None
+        title, content = render_notification(template, params)
+        write = self.repository.copy_many if event.event_type.name in FANOUT_COPY_EVENT_TYPES else self.repository.insert_many
 
-            if event.event_type == NotificationTypeEnum.NEW_POST_ENTERPRISE:
-                title = f"The enterprise {actor_name} created a new post!"
-                content = f"The enterprise you follow, {actor_name}, just created a new post!"
+        async for chunk in user_ids:
+            # the parameter record is only written once the event turns out to have recipients
+            if stored is None:
+                stored = await self._stored_text(event, template, params)
 
-            if event.event_type == NotificationTypeEnum.NEW_VACANCY:
-                title = f"The enterprise {actor_name} created a new vacancy!"
-                content = f"The enterprise you follow, {actor_name}, just created a new vacancy!"
+            inserted = await write([
+                {
+                    **stored,
+                    "event_id": str(event.event_id),
+                    "user_id": user_id,
+                    "link": None,
+                    "type": event.event_type,
+                    "entity_id": event.entity_id,
+                }
+                for user_id in chunk
+            ])
+            await self.counter_repository.increment(inserted)
+            self._queue_push(inserted, event, title, content)
 
-            notify = NotificationEntity(
-                user_id=follow.user_id,
-                title=title,
-                content=content,
-                link=None,
-                type=event.event_type,
-                entity_id=event.entity_id
-            )
+            count += len(inserted)
 
-            notifies.append(notify)
+        logger.info("Notifications added successfully", count=count, type=event.event_type.name, entity_id=event.entity_id)
 
-        await self.repository.add_all(notifies)
\ No newline at end of file
+        return count
@@ -0,0 +1,108 @@
+import asyncio
+from datetime import datetime, timezone
+from typing import Final, Iterable
+
+import structlog
+
+from configs.notification.notification_config import PUSH_BUFFER_SIZE
+from schemas.notification_push import NotificationPushMessage, NotificationPushEventEnum
+
+logger = structlog.get_logger()
+
+# (is_enterprise, owner_id)
+PushKey = tuple[bool, int]
+
+
+class NotificationSubscription:
+    def __init__(self, key: PushKey, buffer_size: int):
+        self.key = key
+        self.dropped = 0
+        self._queue: asyncio.Queue[NotificationPushMessage] = asyncio.Queue(buffer_size)
+        self._overflowed = False
+
+    def offer(self, message: NotificationPushMessage) -> bool:
+        # publishing never waits on a client, a full buffer is thrown away and replaced by a resync
+        if self._overflowed:
+            self.dropped += 1
+            return False
+
+        try:
+            self._queue.put_nowait(message)
+            return True
+        except asyncio.QueueFull:
+            self.dropped += self._queue.qsize() + 1
+            self._overflowed = True
+
+            while not self._queue.empty():
+                self._queue.get_nowait()
+
+            return False
+
+    async def next(self, timeout: float) -> NotificationPushMessage | None:
+        if self._overflowed:
+            self._overflowed = False
+
+            return NotificationPushMessage(
+                event=NotificationPushEventEnum.RESYNC,
+                created_at=datetime.now(timezone.utc),
+            )
+
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class NotificationPushHub:
+    def __init__(self, buffer_size: int = PUSH_BUFFER_SIZE):
+        self.buffer_size = buffer_size
+        self._subscriptions: dict[PushKey, set[NotificationSubscription]] = {}
+        self.published = 0
+        self.dropped = 0
+
+    def subscribe(self, owner_id: int, is_enterprise: bool = False) -> NotificationSubscription:
+        subscription = NotificationSubscription((is_enterprise, owner_id), self.buffer_size)
+        self._subscriptions.setdefault(subscription.key, set()).add(subscription)
+
+        return subscription
+
+    def unsubscribe(self, subscription: NotificationSubscription) -> None:
+        subscriptions = self._subscriptions.get(subscription.key)
+
+        if subscriptions is None:
+            return
+
+        subscriptions.discard(subscription)
+        self.dropped += subscription.dropped
+
+        if not subscriptions:
+            del self._subscriptions[subscription.key]
+
+    def connected(self, owner_ids: Iterable[int], is_enterprise: bool = False) -> list[int]:
+        if not self._subscriptions:
+            return []
+
+        return [owner_id for owner_id in owner_ids if (is_enterprise, owner_id) in self._subscriptions]
+
+    def connected_owner_ids(self, is_enterprise: bool = False) -> list[int]:
+        return [owner_id for enterprise, owner_id in self._subscriptions if enterprise == is_enterprise]
+
+    def publish(self, owner_ids: Iterable[int], message: NotificationPushMessage, is_enterprise: bool = False) -> None:
+        for owner_id in owner_ids:
+            for subscription in self._subscriptions.get((is_enterprise, owner_id), ()):
+                if subscription.offer(message):
+                    self.published += 1
+
+    def stats(self) -> dict:
+        subscriptions = [s for group in self._subscriptions.values() for s in group]
+
+        return {
+            "connections": len(subscriptions),
+            "owners": len(self._subscriptions),
+            "buffer_size": self.buffer_size,
+            "published": self.published,
+            "dropped": self.dropped + sum(s.dropped for s in subscriptions),
+        }
+
+
+notification_push_hub: Final[NotificationPushHub] = NotificationPushHub()
@@ -0,0 +1,67 @@
+from typing import Final
+
+from configs.db.enums import NotificationTypeEnum
+
+# template code -> (title, content), rendered with the event parameters shared by every recipient
+NOTIFICATION_TEMPLATES: Final[dict[str, tuple[str, str]]] = {
+    "user_new_comment": (
+        "The user {user_name} created a new comment!",
+        "The user you follow, {user_name}, just created a new comment!",
+    ),
+    "user_new_comments": (
+        "The user {user_name} created {count} new comments!",
+        "The user you follow, {user_name}, just created {count} new comments!",
+    ),
+    "user_new_post": (
+        "The user {user_name} created a new post!",
+        "The user you follow, {user_name}, just created a new post!",
+    ),
+    "user_new_posts": (
+        "The user {user_name} created {count} new posts!",
+        "The user you follow, {user_name}, just created {count} new posts!",
+    ),
+    "enterprise_new_post": (
+        "The enterprise {actor_name} created a new post!",
+        "The enterprise you follow, {actor_name}, just created a new post!",
+    ),
+    "enterprise_new_posts": (
+        "The enterprise {actor_name} created {count} new posts!",
+        "The enterprise you follow, {actor_name}, just created {count} new posts!",
+    ),
+    "enterprise_new_vacancy": (
+        "The enterprise {actor_name} created a new vacancy!",
+        "The enterprise you follow, {actor_name}, just created a new vacancy!",
+    ),
+    "enterprise_new_vacancies": (
+        "The enterprise {actor_name} created {count} new vacancies!",
+        "The enterprise you follow, {actor_name}, just created {count} new vacancies!",
+    ),
+}
+
+# (event type, digest of several events) -> template code
+FOLLOW_TEMPLATES: Final[dict[tuple[NotificationTypeEnum, bool], str]] = {
+    (NotificationTypeEnum.NEW_COMMENT, False): "user_new_comment",
+    (NotificationTypeEnum.NEW_COMMENT, True): "user_new_comments",
+    (NotificationTypeEnum.NEW_POST, False): "user_new_post",
+    (NotificationTypeEnum.NEW_POST, True): "user_new_posts",
+    (NotificationTypeEnum.NEW_POST_ENTERPRISE, False): "enterprise_new_post",
+    (NotificationTypeEnum.NEW_POST_ENTERPRISE, True): "enterprise_new_posts",
+    (NotificationTypeEnum.NEW_VACANCY, False): "enterprise_new_vacancy",
+    (NotificationTypeEnum.NEW_VACANCY, True): "enterprise_new_vacancies",
+}
+
+
+class _Params(dict):
+    # parameters missing from an older record render the way the f-strings did
+    def __missing__(self, key):
+        return None
+
+
+def render_notification(template: str | None, params: dict | None) -> tuple[str, str]:
+    if template not in NOTIFICATION_TEMPLATES:
+        return "", ""
+
+    title, content = NOTIFICATION_TEMPLATES[template]
+    params = _Params(params or {})
+
+    return title.format_map(params), content.format_map(params)
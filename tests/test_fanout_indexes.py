@@ -0,0 +1,97 @@
+import os
+import uuid
+
+import pytest
+import pytest_asyncio
+from dotenv import load_dotenv
+from sqlalchemy import Select, make_url, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.pool import NullPool
+
+load_dotenv()
+
+if not os.getenv("DATABASE_URL"):
+    pytest.skip("DATABASE_URL is not set", allow_module_level=True)
+
+from configs.db.database import DATABASE_URL, Base
+from repositories.provider.enterprise_follow_user_repository_provider import EnterpriseFollowUserRepositoryProvider
+from repositories.provider.follow_repository_provider import FollowRepositoryProvider
+
+pytestmark = pytest.mark.asyncio(loop_scope="module")
+
+
+@pytest_asyncio.fixture(scope="module", loop_scope="module")
+async def database_url():
+    # a throwaway database with the full schema, so the test neither needs nor touches a migrated one
+    name = f"test_fanout_indexes_{uuid.uuid4().hex}"
+    admin = create_async_engine(DATABASE_URL, poolclass=NullPool, isolation_level="AUTOCOMMIT")
+
+    try:
+        async with admin.connect() as connection:
+            await connection.execute(text(f'CREATE DATABASE "{name}"'))
+    except (OSError, DBAPIError) as e:
+        await admin.dispose()
+        pytest.skip(f"no database reachable at DATABASE_URL: {e}")
+
+    url = make_url(DATABASE_URL).set(database=name)
+    engine = create_async_engine(url, poolclass=NullPool)
+
+    try:
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+
+        yield url
+    finally:
+        await engine.dispose()
+
+        async with admin.connect() as connection:
+            await connection.execute(text(f'DROP DATABASE IF EXISTS "{name}"'))
+
+        await admin.dispose()
+
+
+@pytest_asyncio.fixture(loop_scope="module")
+async def db(database_url):
+    engine = create_async_engine(database_url, poolclass=NullPool)
+
+    async with AsyncSession(engine) as session:
+        # the test tables are empty, without this the planner prefers a sequential scan
+        await session.execute(text("SET LOCAL enable_seqscan = off"))
+        await session.execute(text("SET LOCAL enable_bitmapscan = off"))
+        yield session
+        await session.rollback()
+
+    await engine.dispose()
+
+
+async def explain(db: AsyncSession, stmt: Select) -> str:
+    sql = stmt.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True})
+    rows = await db.execute(text(f"EXPLAIN {sql}"))
+
+    return "\n".join(rows.scalars().all())
+
+
+@pytest.mark.parametrize("flags, index", [
+    ({"receive_post": True}, "ix_follower_relationships_followed_post"),
+    ({"receive_comment": True}, "ix_follower_relationships_followed_comment"),
+])
+async def test_follower_ids_select_uses_partial_index(db, flags, index):
+    stmt = FollowRepositoryProvider(db).follower_ids_select(1, start_id=1, end_id=1000, **flags)
+
+    plan = await explain(db, stmt)
+
+    assert f"Index Only Scan using {index}" in plan, plan
+
+
+@pytest.mark.parametrize("flags, index", [
+    ({"receive_post": True}, "ix_enterprise_follows_user_enterprise_post"),
+    ({"receive_vacancy": True}, "ix_enterprise_follows_user_enterprise_vacancy"),
+])
+async def test_user_ids_select_uses_partial_index(db, flags, index):
+    stmt = EnterpriseFollowUserRepositoryProvider(db).user_ids_select(1, start_id=1, end_id=1000, **flags)
+
+    plan = await explain(db, stmt)
+
+    assert f"Index Only Scan using {index}" in plan, plan
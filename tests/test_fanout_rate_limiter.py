@@ -0,0 +1,70 @@
+import pytest
+
+import services.limit.fanout_rate_limiter as rate_limiter_module
+from services.limit.fanout_rate_limiter import FanoutRateLimiter
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch) -> Clock:
+    clock = Clock()
+    monkeypatch.setattr(rate_limiter_module, "time", clock)
+
+    return clock
+
+
+def test_budget_is_consumed_then_rejected(clock):
+    limiter = FanoutRateLimiter(capacity=100, window_seconds=10, max_actors=10)
+
+    assert limiter.try_consume((False, 1), 60)
+    assert not limiter.try_consume((False, 1), 60)
+    assert limiter.try_consume((False, 1), 40)
+    assert limiter.remaining((False, 1)) == 0
+    assert (limiter.allowed, limiter.rejected, limiter.consumed_rows, limiter.rejected_rows) == (2, 1, 100, 60)
+
+
+def test_budget_refills_over_the_window(clock):
+    limiter = FanoutRateLimiter(capacity=100, window_seconds=10, max_actors=10)
+    limiter.try_consume((False, 1), 100)
+
+    clock.now += 3
+
+    assert limiter.remaining((False, 1)) == 30
+
+    clock.now += 60
+
+    assert limiter.remaining((False, 1)) == 100
+
+
+def test_actors_and_actor_kinds_have_separate_budgets(clock):
+    limiter = FanoutRateLimiter(capacity=100, window_seconds=10, max_actors=10)
+    limiter.try_consume((False, 1), 100)
+
+    assert limiter.try_consume((True, 1), 100)
+    assert limiter.try_consume((False, 2), 100)
+
+
+def test_least_recently_used_actor_is_evicted(clock):
+    limiter = FanoutRateLimiter(capacity=100, window_seconds=10, max_actors=2)
+    limiter.try_consume((False, 1), 100)
+    limiter.try_consume((False, 2), 100)
+    limiter.try_consume((False, 1), 0)
+    limiter.try_consume((False, 3), 100)
+
+    assert limiter.remaining((False, 1)) == 0
+    assert limiter.remaining((False, 2)) == 100
+    assert limiter.stats()["actors"] == 2
+
+
+def test_zero_capacity_disables_the_limit(clock):
+    limiter = FanoutRateLimiter(capacity=0, window_seconds=10, max_actors=10)
+
+    assert limiter.try_consume((False, 1), 10 ** 9)
+    assert limiter.stats()["actors"] == 0
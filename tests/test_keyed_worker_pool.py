@@ -0,0 +1,85 @@
+import asyncio
+
+import pytest
+
+from consumers.keyed_worker_pool import KeyedWorkerPool, partition_for, run_partitioned
+
+
+@pytest.mark.asyncio
+async def test_items_of_one_key_run_in_order():
+    seen: list[tuple[str, int]] = []
+
+    async def handler(item: tuple[str, int]):
+        await asyncio.sleep(0.001 * (3 - item[1]))
+        seen.append(item)
+
+    pool = KeyedWorkerPool("test", handler, workers=4, max_in_flight=16)
+    pool.start()
+
+    for key in ("a", "b", "c"):
+        for index in range(3):
+            await pool.submit(key, (key, index))
+
+    await pool.stop()
+
+    for key in ("a", "b", "c"):
+        assert [index for item_key, index in seen if item_key == key] == [0, 1, 2]
+
+
+@pytest.mark.asyncio
+async def test_failed_item_is_retried_in_place_before_it_is_acknowledged():
+    attempts = []
+    acknowledged = []
+
+    async def handler(item: int):
+        attempts.append(item)
+
+        if item == 0 and attempts.count(0) < 3:
+            raise RuntimeError("retry topic unavailable")
+
+    pool = KeyedWorkerPool("test", handler, workers=1, max_in_flight=4, retry_backoff_ms=1, retry_max_backoff_ms=2)
+    pool.start()
+
+    await pool.submit("key", 0, lambda: acknowledged.append(0))
+    await pool.submit("key", 1, lambda: acknowledged.append(1))
+    await asyncio.wait_for(pool.join(), 1)
+    await pool.stop()
+
+    assert attempts == [0, 0, 0, 1]
+    assert acknowledged == [0, 1]
+
+
+@pytest.mark.asyncio
+async def test_stop_gives_up_a_failing_item_without_acknowledging_it():
+    acknowledged = []
+
+    async def handler(item: int):
+        raise RuntimeError("retry topic unavailable")
+
+    pool = KeyedWorkerPool("test", handler, workers=1, max_in_flight=4, retry_backoff_ms=60000, retry_max_backoff_ms=60000)
+    pool.start()
+
+    await pool.submit("key", 0, lambda: acknowledged.append(0))
+    await asyncio.wait_for(pool.stop(), 1)
+
+    assert acknowledged == []
+
+
+@pytest.mark.asyncio
+async def test_run_partitioned_keeps_a_key_in_one_lane():
+    lanes: list[list[tuple[str, int]]] = []
+
+    async def lane_handler(items: list[tuple[str, int]]):
+        lanes.append(items)
+
+    items = [(key, (key, index)) for index in range(3) for key in ("a", "b", "c", "d")]
+    await run_partitioned(items, lane_handler, partitions=3)
+
+    for key in ("a", "b", "c", "d"):
+        holding = [lane for lane in lanes if any(item_key == key for item_key, _ in lane)]
+
+        assert len(holding) == 1
+        assert [index for item_key, index in holding[0] if item_key == key] == [0, 1, 2]
+
+    assert sum(len(lane) for lane in lanes) == len(items)
+    assert len(lanes) == len({partition_for(key, 3) for key in ("a", "b", "c", "d")})
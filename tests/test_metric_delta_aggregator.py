@@ -0,0 +1,188 @@
+import asyncio
+import os
+from datetime import datetime, timezone
+
+import pytest
+
+# the aggregator only reaches the database through the session it is given, the engine is never connected
+os.environ.setdefault("DATABASE_URL", "postgresql+asyncpg://localhost/unused")
+
+import consumers.metric_delta_aggregator as aggregator_module
+from consumers.event_deduplicator import EventDeduplicator
+from consumers.metric_delta_aggregator import MetricDeltaAggregator, METRIC_REPOSITORIES
+from repositories.generics.generic_metric_repository import BulkDeltaResult, MetricDelta
+from schemas.event_message_metric_schemas import EntityEnum, EventMessageMetric, SumRedEnum
+
+
+class FakeSession:
+    def __init__(self, error: Exception | None = None):
+        self.error = error
+        self.applied: list[MetricDelta] = []
+        self.commits = 0
+
+    async def commit(self) -> None:
+        if self.error is not None:
+            raise self.error
+
+        self.commits += 1
+
+    async def __aenter__(self) -> "FakeSession":
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        pass
+
+
+class FakeMetricRepository:
+    def __init__(self, db: FakeSession):
+        self.db = db
+
+    async def add_deltas(self, deltas: list[MetricDelta]) -> BulkDeltaResult:
+        self.db.applied.extend(deltas)
+
+        return BulkDeltaResult(requested=len(deltas), matched=len(deltas))
+
+
+class FakeDeduplicator(EventDeduplicator):
+    def __init__(self, claimed_elsewhere: set[str] | None = None):
+        super().__init__("metric")
+        self.claimed_elsewhere = claimed_elsewhere or set()
+
+    async def mark(self, repository, event_ids: list[str]) -> list[str]:
+        return [event_id for event_id in event_ids if event_id not in self.claimed_elsewhere]
+
+
+@pytest.fixture(autouse=True)
+def fake_repository(monkeypatch):
+    monkeypatch.setitem(METRIC_REPOSITORIES, EntityEnum.USER_METRIC, FakeMetricRepository)
+
+
+def event(event_id: str, metric_id: int = 1, action: SumRedEnum = SumRedEnum.SUM, column: str = "post_count") -> EventMessageMetric:
+    return EventMessageMetric(
+        event_id=event_id,
+        metric_id=metric_id,
+        column=column,
+        action=action,
+        entity=EntityEnum.USER_METRIC,
+        created_at=datetime.now(timezone.utc),
+        source="test",
+        metadata={},
+    )
+
+
+async def until(condition) -> None:
+    while not condition():
+        await asyncio.sleep(0.005)
+
+
+@pytest.mark.asyncio
+async def test_flush_applies_one_summed_delta_per_key():
+    aggregator = MetricDeltaAggregator(window_ms=1000, max_keys=10)
+    db = FakeSession()
+
+    for index, action in enumerate([SumRedEnum.SUM, SumRedEnum.SUM, SumRedEnum.SUM, SumRedEnum.RED]):
+        assert aggregator.add(event(f"e{index}", action=action))
+
+    aggregator.add(event("e4", metric_id=2))
+    await aggregator.flush(db)
+
+    assert sorted(db.applied) == [(1, "post_count", 2), (2, "post_count", 1)]
+    assert db.commits == 1
+
+
+@pytest.mark.asyncio
+async def test_unknown_column_is_rejected():
+    aggregator = MetricDeltaAggregator(window_ms=1000, max_keys=10)
+
+    assert not aggregator.add(event("e0", column="user_id"))
+    assert not aggregator.add(event("e1", column="missing"))
+
+
+def test_aggregator_is_full_at_max_keys():
+    aggregator = MetricDeltaAggregator(window_ms=1000, max_keys=2)
+
+    aggregator.add(event("e0", metric_id=1))
+    aggregator.add(event("e1", metric_id=1))
+
+    assert not aggregator.is_full
+
+    aggregator.add(event("e2", metric_id=2))
+
+    assert aggregator.is_full
+
+
+@pytest.mark.asyncio
+async def test_run_flushes_every_window(monkeypatch):
+    sessions: list[FakeSession] = []
+
+    def session_factory() -> FakeSession:
+        sessions.append(FakeSession())
+        return sessions[-1]
+
+    monkeypatch.setattr(aggregator_module, "AsyncSessionLocal", session_factory)
+
+    aggregator = MetricDeltaAggregator(window_ms=10, max_keys=10)
+    flushed = []
+    aggregator.add(event("e0"), lambda: flushed.append("e0"))
+
+    task = asyncio.create_task(aggregator.run())
+
+    try:
+        await asyncio.wait_for(until(lambda: flushed), 1)
+    finally:
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    assert flushed == ["e0"]
+    assert sessions[0].applied == [(1, "post_count", 1)]
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_restores_deltas_and_callbacks():
+    aggregator = MetricDeltaAggregator(window_ms=1000, max_keys=10, deduplicator=FakeDeduplicator())
+    flushed = []
+
+    aggregator.add(event("e0"), lambda: flushed.append("e0"))
+    aggregator.add(event("e1"), lambda: flushed.append("e1"))
+    await aggregator.flush(FakeSession(error=RuntimeError("connection lost")))
+
+    assert flushed == []
+    assert not aggregator.add(event("e0"))
+
+    aggregator.add(event("e2"), lambda: flushed.append("e2"))
+    db = FakeSession()
+    await aggregator.flush(db)
+
+    assert db.applied == [(1, "post_count", 3)]
+    assert flushed == ["e0", "e1", "e2"]
+
+
+@pytest.mark.asyncio
+async def test_events_claimed_by_another_consumer_are_backed_out():
+    deduplicator = FakeDeduplicator(claimed_elsewhere={"e1", "e2"})
+    aggregator = MetricDeltaAggregator(window_ms=1000, max_keys=10, deduplicator=deduplicator)
+    db = FakeSession()
+
+    aggregator.add(event("e0"))
+    aggregator.add(event("e1"))
+    aggregator.add(event("e2", metric_id=2))
+    await aggregator.flush(db)
+
+    assert db.applied == [(1, "post_count", 1)]
+    assert deduplicator.is_known("e0")
+    assert not deduplicator.is_known("e1")
+    assert not aggregator.add(event("e0"))
+
+
+@pytest.mark.asyncio
+async def test_on_flushed_runs_when_the_deltas_cancel_out():
+    aggregator = MetricDeltaAggregator(window_ms=1000, max_keys=10)
+    db = FakeSession()
+    flushed = []
+
+    aggregator.add(event("e0"), lambda: flushed.append("e0"))
+    aggregator.add(event("e1", action=SumRedEnum.RED), lambda: flushed.append("e1"))
+    await aggregator.flush(db)
+
+    assert db.applied == []
+    assert flushed == ["e0", "e1"]
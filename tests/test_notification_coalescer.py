@@ -0,0 +1,95 @@
+import asyncio
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+
+from configs.db.enums import NotificationTypeEnum
+from consumers.notification_coalescer import NotificationCoalescer, build_digest, coalesce
+from schemas.event_notification import EventNotification
+
+
+def event(event_type: NotificationTypeEnum, actor_id: int | None = 1, **data) -> EventNotification:
+    return EventNotification(
+        event_id=uuid.uuid4(),
+        event_type=event_type,
+        actor_id=actor_id,
+        entity_id=None,
+        created_at=datetime.now(timezone.utc),
+        source_service="test",
+        data=data,
+        metadata={},
+    )
+
+
+def test_coalesce_groups_by_actor_and_type_in_arrival_order():
+    first = event(NotificationTypeEnum.NEW_POST, 1)
+    follower = event(NotificationTypeEnum.NEW_FOLLOWER, 1)
+    other_actor = event(NotificationTypeEnum.NEW_POST, 2)
+    second = event(NotificationTypeEnum.NEW_POST, 1)
+    comment = event(NotificationTypeEnum.NEW_COMMENT, 1)
+
+    groups = coalesce([first, follower, other_actor, second, comment])
+
+    assert groups == [[first, second], [follower], [other_actor], [comment]]
+
+
+def test_digest_keeps_the_latest_event_and_counts_the_group():
+    events = [event(NotificationTypeEnum.NEW_POST, post_id=index) for index in range(3)]
+
+    digest = build_digest(events)
+
+    assert digest.event_id == events[-1].event_id
+    assert digest.data == {"post_id": 2, "count": 3}
+    assert events[-1].data == {"post_id": 2}
+
+
+@pytest.mark.asyncio
+async def test_coalescer_flushes_when_max_events_is_reached():
+    emitted: list[list[EventNotification]] = []
+
+    async def emit(events: list[EventNotification]):
+        emitted.append(events)
+
+    coalescer = NotificationCoalescer(emit, window_ms=60000, max_events=3)
+    events = [event(NotificationTypeEnum.NEW_POST, 1), event(NotificationTypeEnum.NEW_VACANCY, 1), event(NotificationTypeEnum.NEW_POST, 1)]
+
+    for item in events[:2]:
+        await coalescer.add(item)
+
+    assert emitted == []
+
+    await coalescer.add(events[2])
+
+    assert emitted == [[events[0], events[2]], [events[1]]]
+
+
+@pytest.mark.asyncio
+async def test_due_flush_only_emits_groups_older_than_the_window():
+    emitted: list[list[EventNotification]] = []
+
+    async def emit(events: list[EventNotification]):
+        emitted.append(events)
+
+    coalescer = NotificationCoalescer(emit, window_ms=50, max_events=100)
+    old = event(NotificationTypeEnum.NEW_POST, 1)
+    await coalescer.add(old)
+    await asyncio.sleep(0.06)
+
+    young = event(NotificationTypeEnum.NEW_POST, 2)
+    await coalescer.add(young)
+    await coalescer.flush(due_only=True)
+
+    assert emitted == [[old]]
+
+    await coalescer.flush()
+
+    assert emitted == [[old], [young]]
+
+
+def test_only_actor_events_of_coalescable_types_are_accepted():
+    coalescer = NotificationCoalescer(None, window_ms=1000, max_events=10)
+
+    assert coalescer.accepts(event(NotificationTypeEnum.NEW_COMMENT))
+    assert not coalescer.accepts(event(NotificationTypeEnum.NEW_COMMENT, actor_id=None))
+    assert not coalescer.accepts(event(NotificationTypeEnum.SYSTEM))
@@ -0,0 +1,57 @@
+from datetime import datetime, timedelta, timezone
+
+from configs.db.enums import NotificationTypeEnum
+from schemas.notification_page import NotificationCursor, NotificationItem, NotificationPage
+from templates.notification_templates import render_notification
+
+NOW = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def item(index: int, is_broadcast: bool = False) -> NotificationItem:
+    return NotificationItem(
+        id=index,
+        title=f"title {index}",
+        content="",
+        link=None,
+        type=NotificationTypeEnum.NEW_POST,
+        entity_id=None,
+        is_view=False,
+        created_at=NOW - timedelta(minutes=index),
+        is_broadcast=is_broadcast,
+    )
+
+
+def test_cursor_round_trips_through_its_encoding():
+    cursor = NotificationCursor(created_at=NOW, id=42, is_broadcast=True)
+
+    assert NotificationCursor.decode(cursor.encode()) == cursor
+
+
+def test_page_with_an_extra_row_points_at_its_last_item():
+    items = [item(index) for index in range(4)]
+    items[2].is_broadcast = True
+
+    page = NotificationPage.build(items, limit=3)
+
+    assert page.items == items[:3]
+    assert NotificationCursor.decode(page.next_cursor) == NotificationCursor(created_at=items[2].created_at, id=2, is_broadcast=True)
+
+
+def test_last_page_has_no_cursor():
+    items = [item(index) for index in range(3)]
+
+    assert NotificationPage.build(items, limit=3) == NotificationPage(items=items)
+    assert NotificationPage.build([], limit=3).next_cursor is None
+
+
+def test_render_notification_fills_the_template():
+    title, content = render_notification("user_new_posts", {"user_name": "ana", "count": 3})
+
+    assert title == "The user ana created 3 new posts!"
+    assert content == "The user you follow, ana, just created 3 new posts!"
+
+
+def test_render_notification_tolerates_missing_params_and_templates():
+    assert render_notification("enterprise_new_vacancy", None)[0] == "The enterprise None created a new vacancy!"
+    assert render_notification("unknown", {"user_name": "ana"}) == ("", "")
+    assert render_notification(None, None) == ("", "")
@@ -0,0 +1,115 @@
+import pytest
+from aiokafka import ConsumerRecord, TopicPartition
+from aiokafka.errors import CommitFailedError, RequestTimedOutError
+
+from consumers.offset_tracker import OffsetTracker
+
+TOPIC = "topic"
+
+
+class FakeConsumer:
+    def __init__(self, partitions: set[int]):
+        self._enable_auto_commit = False
+        self.assigned = {TopicPartition(TOPIC, partition) for partition in partitions}
+        self.committed: dict[TopicPartition, int] = {}
+        self.error: Exception | None = None
+
+    def assignment(self) -> set[TopicPartition]:
+        return set(self.assigned)
+
+    async def commit(self, offsets: dict[TopicPartition, int]) -> None:
+        if self.error is not None:
+            raise self.error
+
+        unassigned = set(offsets) - self.assigned
+
+        if unassigned:
+            raise CommitFailedError(f"partitions {unassigned} are not assigned")
+
+        self.committed.update(offsets)
+
+
+def record(partition: int, offset: int) -> ConsumerRecord:
+    return ConsumerRecord(TOPIC, partition, offset, 0, 0, None, b"", None, 0, 0, [])
+
+
+def tp(partition: int) -> TopicPartition:
+    return TopicPartition(TOPIC, partition)
+
+
+@pytest.mark.asyncio
+async def test_commit_stops_at_the_oldest_unfinished_record():
+    consumer = FakeConsumer({0})
+    offsets = OffsetTracker(consumer)
+    done = [offsets.track(record(0, offset)) for offset in range(3)]
+
+    done[0]()
+    done[2]()
+    await offsets.commit()
+
+    assert consumer.committed == {tp(0): 1}
+
+    done[1]()
+    await offsets.commit()
+
+    assert consumer.committed == {tp(0): 3}
+
+
+@pytest.mark.asyncio
+async def test_revoked_partition_does_not_block_the_others():
+    consumer = FakeConsumer({0, 1})
+    offsets = OffsetTracker(consumer)
+    offsets.track(record(0, 0))()
+    consumer.assigned = {tp(1)}
+
+    offsets.track(record(1, 0))()
+    await offsets.commit()
+    offsets.track(record(1, 1))()
+    await offsets.commit()
+
+    assert consumer.committed == {tp(1): 2}
+
+
+@pytest.mark.asyncio
+async def test_revoke_commits_and_forgets_the_partition():
+    consumer = FakeConsumer({0, 1})
+    offsets = OffsetTracker(consumer)
+    offsets.track(record(0, 0))()
+    stale = offsets.track(record(0, 1))
+
+    await offsets.revoke({tp(0)})
+    consumer.assigned = {tp(1)}
+    stale()
+    await offsets.commit()
+
+    assert consumer.committed == {tp(0): 1}
+
+
+@pytest.mark.asyncio
+async def test_only_retriable_errors_are_retried():
+    consumer = FakeConsumer({0})
+    offsets = OffsetTracker(consumer)
+    offsets.track(record(0, 0))()
+
+    consumer.error = RequestTimedOutError()
+    await offsets.commit()
+    consumer.error = None
+    await offsets.commit()
+
+    assert consumer.committed == {tp(0): 1}
+
+    offsets.track(record(0, 1))()
+    consumer.error = CommitFailedError()
+    await offsets.commit()
+    consumer.error = None
+    await offsets.commit()
+
+    assert consumer.committed == {tp(0): 1}
+
+
+def test_auto_commit_consumer_is_rejected():
+    consumer = FakeConsumer({0})
+    consumer._enable_auto_commit = True
+
+    with pytest.raises(ValueError):
+        OffsetTracker(consumer)
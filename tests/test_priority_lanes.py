@@ -0,0 +1,99 @@
+import asyncio
+import time
+
+import pytest
+
+from consumers.priority_lanes import Lane, PriorityLaneScheduler, WeightedSlots
+
+
+async def point_latency(bulk_items: int, backlog: int) -> float:
+    handled: dict[str, float] = {}
+
+    async def handler(item: str):
+        if item.startswith("bulk"):
+            await asyncio.sleep(0.02)
+
+        handled[item] = time.monotonic()
+
+    scheduler = PriorityLaneScheduler(
+        "test",
+        handler,
+        [Lane("point", 4, 4), Lane("bulk", 1, 1, backlog)],
+        slots=4,
+        max_in_flight=8,
+    )
+    scheduler.start()
+
+    # the caller plays the shared poll loop, every bulk event is read before the point event
+    started = time.monotonic()
+
+    for index in range(bulk_items):
+        await scheduler.submit("bulk", f"actor-{index}", f"bulk-{index}")
+
+    await scheduler.submit("point", "user", "point")
+
+    while "point" not in handled:
+        await asyncio.sleep(0.001)
+
+    latency = handled["point"] - started
+
+    await scheduler.stop()
+
+    return latency
+
+
+@pytest.mark.asyncio
+async def test_point_latency_does_not_grow_with_the_bulk_backlog():
+    short = await point_latency(bulk_items=10, backlog=1000)
+    long = await point_latency(bulk_items=100, backlog=1000)
+
+    assert long < 0.1
+    assert long < short + 0.05
+
+
+@pytest.mark.asyncio
+async def test_without_a_backlog_the_poll_loop_waits_behind_bulk_events():
+    assert await point_latency(bulk_items=60, backlog=0) > 0.5
+
+
+@pytest.mark.asyncio
+async def test_lane_never_exceeds_its_concurrency():
+    running = {"bulk": 0}
+    peak = {"bulk": 0}
+
+    async def handler(item: str):
+        running["bulk"] += 1
+        peak["bulk"] = max(peak["bulk"], running["bulk"])
+        await asyncio.sleep(0.005)
+        running["bulk"] -= 1
+
+    scheduler = PriorityLaneScheduler("test", handler, [Lane("point", 4, 8), Lane("bulk", 1, 2, 100)], slots=8, max_in_flight=64)
+    scheduler.start()
+
+    for index in range(20):
+        await scheduler.submit("bulk", index, f"bulk-{index}")
+
+    await scheduler.stop()
+
+    assert peak["bulk"] == 2
+
+
+@pytest.mark.asyncio
+async def test_waiting_lanes_share_slots_by_weight():
+    slots = WeightedSlots(1, {"point": 4, "bulk": 1})
+    granted: list[str] = []
+
+    await slots.acquire("bulk")
+
+    async def take(lane: str):
+        async with slots.slot(lane):
+            granted.append(lane)
+
+    waiters = [asyncio.create_task(take(lane)) for lane in ["bulk"] * 5 + ["point"] * 5]
+    await asyncio.sleep(0)
+
+    slots.release("bulk")
+    await asyncio.gather(*waiters)
+
+    assert granted[:5].count("point") >= 4
+    assert sorted(granted) == ["bulk"] * 5 + ["point"] * 5